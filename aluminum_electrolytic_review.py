@@ -4,29 +4,30 @@ Generate Aluminum Electrolytic Production Intelligent Optimization Manufacturing
 铝电解生产智能优化制造研究综述
 """
 
-import os
 import asyncio
+import argparse
 from dotenv import load_dotenv
-from gpt_researcher import GPTResearcher
+from research_config import ResearchJobConfig, GEMINI_FLASH, create_researcher
+from research_cache import research_cache_key, run_cached_research
+from pipeline_stages import stage
+from report_templates import ReportPage, render_report
+from tracing import traced_job
+from cost_meter import TokenBudgetExceeded, metered_run
 
 # Load environment variables
 load_dotenv()
 
-async def generate_aluminum_review():
+async def generate_aluminum_review(refresh=False, job_config=None):
     """Generate comprehensive literature review on aluminum electrolytic production intelligent optimization"""
 
     print("🔬 生成铝电解生产智能优化制造研究综述")
     print("=" * 80)
 
-    # Configure API keys
-    os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-    os.environ["OPENAI_API_KEY"] = os.getenv("KIMI_API_KEY")  # Use KIMI key for OpenAI-compatible access
-    os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")
-
-    # LLM Configuration
-    os.environ["FAST_LLM"] = "google_genai:gemini-2.0-flash-exp"
-    os.environ["SMART_LLM"] = "google_genai:gemini-2.0-flash-exp"  # Use Gemini 2.0 Flash for both
-    os.environ["EMBEDDING"] = "openai:text-embedding-3-small"
+    # Job-scoped LLM configuration (API keys from .env)
+    if job_config is None:
+        job_config = ResearchJobConfig.from_env(
+            smart_llm=GEMINI_FLASH  # Use Gemini 2.0 Flash for both
+        )
 
     research_query = """
     铝电解生产智能优化制造研究综述
@@ -93,33 +94,38 @@ async def generate_aluminum_review():
 
     try:
         print("🔍 正在进行铝电解智能优化研究...")
-        researcher = GPTResearcher(
+        researcher = create_researcher(
+            job_config,
             query=research_query,
             report_type="research_report",
             report_format="markdown",
             tone="Objective"
         )
 
-        print("🌐 搜索相关文献和研究...")
-        await researcher.conduct_research()
-
-        print("📝 生成综述报告...")
-        report = await researcher.write_report()
+        # Reuse a cached result for the same query and LLM configuration
+        cache_key = research_cache_key(
+            research_query, "research_report", "Objective", llm_settings=job_config.llm_settings()
+        )
+        report = await run_cached_research(researcher, cache_key, refresh=refresh)
 
         # Save the comprehensive review
         output_file = "aluminum_electrolytic_review.md"
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with stage("markdown_assembly"), open(output_file, 'w', encoding='utf-8') as f:
             f.write(report)
 
         print(f"✅ 铝电解综述已生成: {output_file}")
 
         # Generate Chinese HTML version
-        await generate_chinese_html_aluminum(report)
+        with stage("html_rendering"):
+            await generate_chinese_html_aluminum(report)
 
         return report
 
+    except TokenBudgetExceeded:
+        raise
     except Exception as e:
         print(f"❌ AI研究失败: {e}")
+        print("💾 若研究阶段已完成，其检查点已保存，重新运行将从检查点继续")
         print("🔄 切换到手动生成模式...")
         # Fallback to manual generation if GPT-Researcher fails
         return await generate_manual_aluminum_review()
@@ -336,374 +342,20 @@ async def generate_chinese_html_aluminum(markdown_content):
 
     print("🌐 生成中文HTML版本...")
 
-    html_content = """<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>铝电解生产智能优化制造研究综述</title>
-    <style>
-        body {
-            font-family: 'Microsoft YaHei', 'SimSun', Arial, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            padding: 30px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        h1 {
-            color: #2c3e50;
-            text-align: center;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }
-        h2 {
-            color: #34495e;
-            border-left: 4px solid #3498db;
-            padding-left: 15px;
-            margin-top: 30px;
-        }
-        h3 {
-            color: #7f8c8d;
-            margin-top: 25px;
-        }
-        .summary {
-            background: #ecf0f1;
-            padding: 20px;
-            border-radius: 5px;
-            margin: 20px 0;
-        }
-        .highlight {
-            background: #e8f4f8;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #3498db;
-            margin: 20px 0;
-        }
-        .stats {
-            display: flex;
-            justify-content: space-around;
-            margin: 20px 0;
-        }
-        .stat-box {
-            background: #3498db;
-            color: white;
-            padding: 20px;
-            border-radius: 5px;
-            text-align: center;
-            flex: 1;
-            margin: 0 10px;
-        }
-        .tech-specs {
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 5px;
-            margin: 20px 0;
-        }
-        .process-flow {
-            background: #fff3cd;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #ffc107;
-            margin: 20px 0;
-        }
-        .challenges {
-            background: #f8d7da;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #dc3545;
-            margin: 20px 0;
-        }
-        .opportunities {
-            background: #d1ecf1;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #17a2b8;
-            margin: 20px 0;
-        }
-        .code-block {
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 5px;
-            font-family: 'Courier New', monospace;
-            margin: 10px 0;
-            border-left: 4px solid #6c757d;
-        }
-        .references {
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 5px;
-            margin-top: 30px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>铝电解生产智能优化制造研究综述</h1>
-
-        <div class="stats">
-            <div class="stat-box">
-                <h3>研究领域</h3>
-                <div style="font-size: 2em; font-weight: bold;">8</div>
-                <small>个核心方向</small>
-            </div>
-            <div class="stat-box">
-                <h3>技术方法</h3>
-                <div style="font-size: 2em; font-weight: bold;">AI</div>
-                <small>驱动优化</small>
-            </div>
-            <div class="stat-box">
-                <h3>节能潜力</h3>
-                <div style="font-size: 2em; font-weight: bold;">15%</div>
-                <small>能耗降低</small>
-            </div>
-        </div>
-
-        <div class="summary">
-            <h2>摘要</h2>
-            <p>铝电解生产是铝工业的核心环节，其能耗高、工艺复杂、控制难度大。智能优化制造技术的发展为铝电解生产带来了革命性变革。本综述系统分析了铝电解生产智能优化的最新进展、技术应用和未来发展趋势。</p>
-        </div>
-
-        <div class="tech-specs">
-            <h3>🔬 霍尔-埃鲁工艺基本参数</h3>
-            <ul>
-                <li><strong>电解温度：</strong>940-980°C</li>
-                <li><strong>槽电压：</strong>4.0-4.5V</li>
-                <li><strong>电流密度：</strong>0.7-1.0 A/cm²</li>
-                <li><strong>理论能耗：</strong>6.34 kWh/kg Al</li>
-                <li><strong>实际能耗：</strong>12-14 kWh/kg Al</li>
-            </ul>
-        </div>
-
-        <div class="process-flow">
-            <h3>⚡ 铝电解基本反应</h3>
-            <div class="code-block">
-                2Al₂O₃ + 3C → 4Al + 3CO₂
-            </div>
-            <p><strong>工艺特点：</strong>高温熔盐电解，消耗大量电能，产生CO₂排放</p>
-        </div>
-
-        <h2>智能优化技术应用</h2>
-
-        <h3>人工智能算法</h3>
-        <ul>
-            <li><strong>遗传算法：</strong> 参数优化，能耗降低2-5%</li>
-            <li><strong>神经网络：</strong> 预测控制，温度和质量预测</li>
-            <li><strong>强化学习：</strong> 动态优化，实时参数调整</li>
-        </ul>
-
-        <h3>智能控制系统</h3>
-        <ul>
-            <li><strong>DCS系统：</strong> 分布式控制，实时数据采集</li>
-            <li><strong>APC系统：</strong> 先进过程控制，模型预测控制</li>
-            <li><strong>智能加料：</strong> 阳极效应预测和预防</li>
-        </ul>
-
-        <h2>生产过程优化</h2>
-
-        <h3>关键控制参数</h3>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 15px; margin: 20px 0;">
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; text-align: center;">
-                <h4>温度控制</h4>
-                <div style="font-size: 1.5em; color: #3498db;">945-965°C</div>
-                <small>控制精度 ±5°C</small>
-            </div>
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; text-align: center;">
-                <h4>铝水平</h4>
-                <div style="font-size: 1.5em; color: #3498db;">20-30cm</div>
-                <small>超声波测量</small>
-            </div>
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; text-align: center;">
-                <h4>阳极效应</h4>
-                <div style="font-size: 1.5em; color: #3498db;"><1 次/天</div>
-                <small>AI预测预防</small>
-            </div>
-        </div>
-
-        <h2>数据驱动的智能制造</h2>
-
-        <h3>工业大数据应用</h3>
-        <ul>
-            <li><strong>数据采集：</strong> 传感器、PLC、实验室分析</li>
-            <li><strong>分析方法：</strong> 机器学习、深度学习</li>
-            <li><strong>应用场景：</strong> 过程优化、质量预测、故障诊断</li>
-        </ul>
-
-        <h3>预测性维护</h3>
-        <ul>
-            <li><strong>状态监测：</strong> 振动、温度、电流分析</li>
-            <li><strong>故障预测：</strong> 剩余寿命预测模型</li>
-            <li><strong>维护策略：</strong> 基于状态的主动维护</li>
-        </ul>
-
-        <h2>新兴技术应用</h2>
-
-        <h3>数字孪生技术</h3>
-        <p>创建虚拟电解槽模型，实现虚拟调试、优化仿真和操作员培训。</p>
-
-        <h3>物联网(IIoT)</h3>
-        <p>传感器网络全面感知电解过程，边缘计算实现本地智能控制。</p>
-
-        <h3>人工智能决策</h3>
-        <p>智能调度、生产优化、异常检测和参数推荐系统。</p>
-
-        <div class="challenges">
-            <h3>⚠️ 技术挑战</h3>
-            <ul>
-                <li><strong>数据质量：</strong> 传感器精度和数据完整性</li>
-                <li><strong>模型精度：</strong> 复杂工业过程的精确建模</li>
-                <li><strong>系统集成：</strong> 多系统协同工作难度</li>
-                <li><strong>投资回报：</strong> 智能化改造的经济效益评估</li>
-            </ul>
-        </div>
-
-        <div class="opportunities">
-            <h3>🚀 发展机遇</h3>
-            <ul>
-                <li><strong>节能减排：</strong> 能耗降低15%，碳排放显著减少</li>
-                <li><strong>质量提升：</strong> 产品品质稳定性和一致性提高</li>
-                <li><strong>成本控制：</strong> 生产效率提升，运营成本降低</li>
-                <li><strong>可持续发展：</strong> 推动铝工业绿色转型</li>
-            </ul>
-        </div>
-
-        <h2>案例研究</h2>
-
-        <h3>国内典型案例</h3>
-        <ul>
-            <li><strong>中国铝业智能工厂：</strong> AI优化，能耗降低15%</li>
-            <li><strong>山东魏桥铝电解厂：</strong> 大数据平台，日产量优化5%</li>
-            <li><strong>河南神火铝业：</strong> 数字孪生应用，故障率降低40%</li>
-        </ul>
-
-        <h3>国际先进案例</h3>
-        <ul>
-            <li><strong>挪威海德鲁：</strong> 世界领先的智能电解技术</li>
-            <li><strong>加拿大铝厂：</strong> 预测性维护，维护成本降低30%</li>
-            <li><strong>澳大利亚Alcoa：</strong> 绿色制造示范项目</li>
-        </ul>
-
-        <h2>未来发展展望</h2>
-
-        <h3>技术发展趋势</h3>
-        <ul>
-            <li><strong>深度学习：</strong> 更先进的AI算法和模型</li>
-            <li><strong>多尺度建模：</strong> 从分子到工厂的全面建模</li>
-            <li><strong>人机协作：</strong> AI与专家经验的有机结合</li>
-            <li><strong>自主工厂：</strong> 全自主控制和优化系统</li>
-        </ul>
-
-        <h3>产业化前景</h3>
-        <ul>
-            <li><strong>技术成熟：</strong> 从试点到规模化应用</li>
-            <li><strong>标准制定：</strong> 智能制造标准和规范建立</li>
-            <li><strong>人才培养：</strong> 复合型技术人才队伍建设</li>
-            <li><strong>产业生态：</strong> 上下游产业链协同发展</li>
-        </ul>
-
-        <h2>结论</h2>
-        <p>铝电解生产智能优化制造是铝工业转型升级的重要方向。通过人工智能、大数据、物联网等技术的应用，可以显著提高生产效率、降低能耗、改善产品质量，实现铝工业的绿色可持续发展。</p>
-        <p>未来随着技术的不断进步和产业化应用的深入，智能优化将成为铝电解生产的标准配置，推动铝工业向高效、绿色、智能方向全面转型。</p>
-
-        <div class="references">
-            <h2>参考文献</h2>
-
-            <h3>中文文献</h3>
-            <ol>
-                <li>李建华, 王志强, 张晓明. 铝电解生产过程智能优化控制研究[J]. 轻金属, 2018, (6): 12-18.</li>
-                <li>陈伟, 刘洋, 李明. 基于神经网络的铝电解槽温度预测模型[J]. 中国有色金属学报, 2019, 29(3): 789-796.</li>
-                <li>张宏, 王磊, 赵阳. 铝电解过程大数据分析与智能优化[J]. 铝加工, 2020, (4): 25-32.</li>
-                <li>孙杰, 李娜, 王鹏. 铝电解槽阳极效应预测与控制研究[J]. 冶金自动化, 2021, 45(2): 15-22.</li>
-                <li>刘强, 陈明, 张伟. 基于数字孪生的铝电解生产优化[J]. 计算机集成制造系统, 2022, 28(5): 1456-1464.</li>
-            </ol>
-
-            <h3>英文文献</h3>
-            <ol>
-                <li>Taylor M P, Chen J J J, Gao X. Intelligent control of aluminum reduction cells[J]. Light Metals, 2016: 547-552.</li>
-                <li>Jassim A, Gao X, Taylor M P. Application of artificial neural networks to aluminum electrolysis process[J]. Metallurgical and Materials Transactions B, 2017, 48(4): 2365-2374.</li>
-                <li>Jassim A, Gao X, Taylor M P. Prediction of anode effect duration in aluminum reduction cells using artificial neural networks[J]. Light Metals, 2018: 1267-1272.</li>
-                <li>Zhang H, Xia X, Chen X. Data-driven modeling and optimization of aluminum electrolysis process[J]. IEEE Transactions on Industrial Electronics, 2019, 66(7): 5678-5686.</li>
-                <li>Wang Z, Li Y, Chen J. Machine learning-based anomaly detection in aluminum electrolysis[J]. Journal of Process Control, 2020, 85: 78-87.</li>
-                <li>Gao X, Jassim A, Taylor M P. Digital twin for aluminum electrolysis process monitoring and control[J]. Computers & Chemical Engineering, 2021, 144: 107119.</li>
-                <li>Li H, Wang Z, Chen X. Intelligent optimization of aluminum electrolysis based on reinforcement learning[J]. Control Engineering Practice, 2022, 118: 104945.</li>
-                <li>Zhang L, Liu Y, Wang J. Big data analytics for aluminum smelting process optimization[J]. IEEE Access, 2023, 11: 12345-12356.</li>
-            </ol>
-        </div>
-
-        <div class="citation-analysis">
-            <h2>引用分析 (Citation Analysis)</h2>
-
-            <h3>引用分布统计</h3>
-            <ul>
-                <li><strong>总引用次数:</strong> 8次</li>
-                <li><strong>中文文献引用:</strong> 5篇 (62.5%)</li>
-                <li><strong>英文文献引用:</strong> 8篇 (100%)</li>
-                <li><strong>引用集中度:</strong> 主要集中在第2-4章核心技术内容</li>
-            </ul>
-
-            <h3>引用内容关系分析</h3>
-
-            <h4>核心技术方法引用 [1-4]</h4>
-            <ul>
-                <li><strong>[1] 李建华等(2018):</strong> 支持遗传算法在铝电解优化中的应用，验证了能耗降低2-5%的效果</li>
-                <li><strong>[2] 陈伟等(2019):</strong> 为神经网络温度预测模型提供理论基础，支撑智能控制策略</li>
-                <li><strong>[3] Jassim等(2018):</strong> 验证阳极效应预测技术的可行性，支持AI预防控制方法</li>
-                <li><strong>[4] Zhang等(2019):</strong> 提供数据驱动建模方法论，支撑先进过程控制技术</li>
-            </ul>
-
-            <h4>数据驱动技术引用 [5-6]</h4>
-            <ul>
-                <li><strong>[5] Wang等(2020):</strong> 支持机器学习异常检测技术在预测性维护中的应用</li>
-                <li><strong>[6] Gao等(2021):</strong> 为数字孪生技术在铝电解中的应用提供工程实现案例</li>
-            </ul>
-
-            <h4>先进优化技术引用 [7-8]</h4>
-            <ul>
-                <li><strong>[7] Li等(2022):</strong> 验证强化学习在铝电解智能优化中的应用效果</li>
-                <li><strong>[8] Zhang等(2023):</strong> 支持大数据分析在铝冶炼过程优化中的技术方法</li>
-            </ul>
-
-            <h3>引用质量评估</h3>
-            <ul>
-                <li><strong>学术权威性:</strong> 所有引用均来自SCI/EI收录期刊和国际会议</li>
-                <li><strong>时间跨度:</strong> 2016-2023年，覆盖最新研究进展</li>
-                <li><strong>地域平衡:</strong> 中英文文献并重，体现国际视野</li>
-                <li><strong>技术相关性:</strong> 100%引用直接支持文中技术内容和数据</li>
-            </ul>
-
-            <h3>引用对综述内容的支撑作用</h3>
-            <ol>
-                <li><strong>理论基础:</strong> 引用[1-2]为AI算法应用提供理论支撑</li>
-                <li><strong>技术验证:</strong> 引用[3-4]验证控制技术的实际效果</li>
-                <li><strong>方法论支持:</strong> 引用[5-8]为新兴技术应用提供方法论依据</li>
-                <li><strong>数据支撑:</strong> 所有引用共同验证文中量化指标和案例数据</li>
-            </ol>
-        </div>
-
-        <div style="text-align: center; margin: 40px 0; padding: 20px; background: #f8f9fa; border-radius: 5px;">
-            <h3>📄 完整报告</h3>
-            <p>详细的Markdown格式完整报告已保存为：</p>
-            <p><code>aluminum_electrolytic_review.md</code></p>
-            <p>包含完整的综述内容、技术分析和参考文献</p>
-        </div>
-
-    </div>
-</body>
-</html>"""
-
-    # Save HTML file
     html_file = "aluminum_electrolytic_review_chinese.html"
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    render_report(ReportPage(
+        title="铝电解生产智能优化制造研究综述",
+        markdown=markdown_content,
+        report_file="aluminum_electrolytic_review.md",
+        report_file_note="包含完整的综述内容、技术分析和参考文献",
+    ), html_file)
 
     print(f"✅ 中文HTML综述已生成: {html_file}")
 
 if __name__ == "__main__":
-    asyncio.run(generate_aluminum_review())
+    parser = argparse.ArgumentParser(description="铝电解生产智能优化制造研究综述")
+    parser.add_argument("--refresh", action="store_true", help="忽略缓存，重新进行研究")
+    parser.add_argument("--token-budget", type=int, help="本次运行的令牌上限，超出后提前停止")
+    args = parser.parse_args()
+    with traced_job("aluminum_review"), metered_run("aluminum_electrolytic_review.md", args.token_budget):
+        asyncio.run(generate_aluminum_review(refresh=args.refresh))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Batch review runner
+Reads one review spec per JSONL line and runs the specs through a shared
+asyncio scheduler with a concurrency cap and per-job status tracking
+
+Spec fields:
+    id            optional job name (defaults to the line number)
+    query         research query (required)
+    report_type   GPT-Researcher report type (default "research_report")
+    tone          report tone (default "Objective")
+    documents     directory (or list of directories) of local PDFs to include
+    output        markdown output path (default "<id>.md")
+    html_output   optional HTML output path
+    title         optional HTML page title
+    models        {"fast_llm": ..., "smart_llm": ..., "embedding": ...}
+    token_budget  optional hard token limit for the job (usage goes to <output>.metrics.json)
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from dotenv import load_dotenv
+from research_config import ResearchJobConfig, create_researcher
+from research_cache import research_cache_key, run_cached_research
+from paper_manifest import scan_papers, paper_documents
+from pdf_extraction import extract_papers
+from pipeline_stages import stage
+from report_templates import ReportPage, render_report
+from tracing import span, traced_job
+from cost_meter import metered_run
+
+# Load environment variables
+load_dotenv()
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_STATUS_FILE = "batch_status.json"
+
+def load_specs(specs_path):
+    """Read review specs from a JSONL file, skipping blank lines"""
+    specs = []
+    with open(specs_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            spec = json.loads(line)
+            spec.setdefault("id", f"review-{line_number}")
+            specs.append(spec)
+    return specs
+
+def validate_spec(spec):
+    """Return an error message for an unusable spec, or None"""
+    if not isinstance(spec.get("query"), str) or not spec["query"].strip():
+        return "missing 'query'"
+    models = spec.get("models", {})
+    for name in ("fast_llm", "smart_llm", "embedding"):
+        value = models.get(name)
+        if value is not None and ":" not in value:
+            return f"models.{name} must look like 'provider:model'"
+    return None
+
+def spec_job_config(spec, base_config):
+    """Job configuration for one spec"""
+    models = spec.get("models", {})
+    return base_config.with_models(
+        fast_llm=models.get("fast_llm"),
+        smart_llm=models.get("smart_llm"),
+        embedding=models.get("embedding"),
+    )
+
+def write_html_page(markdown_content, title, html_file):
+    """Render the report markdown as an HTML page with a table of contents"""
+    render_report(ReportPage(title=title, markdown=markdown_content), html_file)
+
+class BatchStatus:
+    """Per-job status table, persisted to JSON on every transition"""
+
+    def __init__(self, specs, status_file):
+        self.status_file = status_file
+        self.jobs = {spec["id"]: {"state": "pending"} for spec in specs}
+        self.save()
+
+    def update(self, job_id, **fields):
+        self.jobs[job_id].update(fields)
+        self.save()
+
+    def save(self):
+        if not self.status_file:
+            return
+        tmp_path = self.status_file + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.jobs, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.status_file)
+
+    def summary(self):
+        counts = {}
+        for job in self.jobs.values():
+            counts[job["state"]] = counts.get(job["state"], 0) + 1
+        return counts
+
+async def run_review(spec, job_config, refresh=False):
+    """Research and write one review described by a spec"""
+    report_type = spec.get("report_type", "research_report")
+    tone = spec.get("tone", "Objective")
+
+    researcher_kwargs = {}
+    papers = []
+    documents = spec.get("documents")
+    if documents:
+        for paper_dir in ([documents] if isinstance(documents, str) else documents):
+            papers.extend(scan_papers(paper_dir, verbose=False))
+        await extract_papers(papers)
+        researcher_kwargs = {"report_source": "langchain_documents", "documents": paper_documents(papers)}
+
+    researcher = create_researcher(
+        job_config,
+        query=spec["query"],
+        report_type=report_type,
+        report_format="markdown",
+        tone=tone,
+        **researcher_kwargs
+    )
+
+    cache_key = research_cache_key(
+        spec["query"], report_type, tone, documents=papers, llm_settings=job_config.llm_settings()
+    )
+    report = await run_cached_research(researcher, cache_key, refresh=refresh)
+
+    output_file = spec.get("output") or f"{spec['id']}.md"
+    with stage("markdown_assembly"), open(output_file, 'w', encoding='utf-8') as f:
+        f.write(report)
+
+    if spec.get("html_output"):
+        with stage("html_rendering"):
+            write_html_page(report, spec.get("title", spec["id"]), spec["html_output"])
+
+    return output_file
+
+async def run_batch(specs, concurrency=DEFAULT_CONCURRENCY, status_file=DEFAULT_STATUS_FILE,
+                    refresh=False, base_config=None):
+    """Run all specs with at most `concurrency` jobs in flight"""
+    base_config = base_config or ResearchJobConfig.from_env()
+    status = BatchStatus(specs, status_file)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_job(spec):
+        job_id = spec["id"]
+        error = validate_spec(spec)
+        if error:
+            print(f"❌ [{job_id}] Invalid spec: {error}")
+            status.update(job_id, state="invalid", error=error)
+            return
+
+        async with semaphore:
+            started = time.time()
+            status.update(job_id, state="running", started=started)
+            print(f"🔍 [{job_id}] Started")
+            try:
+                with span(job_id, "job", query=spec["query"]), \
+                        metered_run(spec.get("output") or f"{job_id}.md", spec.get("token_budget")):
+                    output_file = await run_review(spec, spec_job_config(spec, base_config), refresh)
+            except Exception as e:
+                status.update(job_id, state="failed", error=str(e), elapsed=time.time() - started)
+                print(f"❌ [{job_id}] Failed: {e}")
+                return
+
+            elapsed = time.time() - started
+            status.update(job_id, state="done", output=output_file, elapsed=elapsed)
+            print(f"✅ [{job_id}] Done in {elapsed:.1f}s: {output_file}")
+
+    await asyncio.gather(*(run_job(spec) for spec in specs))
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a batch of research reviews from a JSONL spec file")
+    parser.add_argument("specs", nargs="?", default="requests.jsonl", help="JSONL file with one review spec per line")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="maximum reviews in flight")
+    parser.add_argument("--status-file", default=DEFAULT_STATUS_FILE, help="where per-job status is written")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached research results")
+    args = parser.parse_args()
+
+    specs = load_specs(args.specs)
+    if not specs:
+        print(f"❌ No review specs found in {args.specs}")
+        return
+
+    print(f"📋 Running {len(specs)} review(s) with concurrency {args.concurrency}")
+    with traced_job("batch_review", specs=len(specs), concurrency=args.concurrency):
+        status = asyncio.run(run_batch(specs, args.concurrency, args.status_file, args.refresh))
+    print(f"\n📊 Batch finished: {status.summary()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Stage-level benchmark for the research pipelines
+Runs each entry point against mock_provider_server in a fresh working
+directory and reports wall time per pipeline stage, peak RSS and provider
+call counts. Results are saved as JSON and compared to a stored baseline,
+so latency regressions are caught before they reach the nightly batch.
+
+    python benchmark_pipelines.py --save-baseline   # record the baseline
+    python benchmark_pipelines.py                   # compare, exit 1 on regression
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import resource
+import tempfile
+import importlib
+import statistics
+import subprocess
+import urllib.request
+from collections import Counter
+from datetime import datetime
+from mock_provider_server import MockSettings, start_mock_server
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_OUTPUT = "benchmark_results.json"
+STAGES = ("corpus_scan", "extraction", "conduct_research", "write_report", "markdown_assembly", "html_rendering")
+
+# name -> (module, coroutine function, keyword arguments, report file, fallback functions)
+# A run only counts when the report file was written by the pipeline itself:
+# the module's fallback functions are replaced by ones that fail the run.
+ENTRY_POINTS = {
+    "simple_test": ("simple_test", "main", {}, None, ()),
+    "tmt_literature_review": ("tmt_literature_review", "generate_tmt_literature_review", {},
+                              "tmt_literature_review.md", ()),
+    "tmt_comprehensive_review": ("tmt_comprehensive_review", "generate_comprehensive_review", {},
+                                 "tmt_comprehensive_review.md", ("generate_fallback_web_report",)),
+    "aluminum_review": ("aluminum_electrolytic_review", "generate_aluminum_review", {"refresh": True},
+                        "aluminum_electrolytic_review.md", ("generate_manual_aluminum_review",)),
+    "llm_knowledge_review": ("llm_ai_knowledge_engineering_manufacturing",
+                             "generate_llm_knowledge_engineering_review", {"refresh": True},
+                             "llm_ai_knowledge_engineering_manufacturing.md",
+                             ("generate_manual_llm_knowledge_review",)),
+}
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its workers (e.g. PDF extraction) in MB"""
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def mock_stats(mock_url):
+    """Request counts served so far by mock_provider_server"""
+    with urllib.request.urlopen(mock_url.rstrip("/") + "/stats", timeout=10) as response:
+        return json.load(response)
+
+def run_one(name, output_path):
+    """Run one entry point in this process and write its measurements to output_path"""
+    from pipeline_stages import add_stage_listener
+    from provider_hooks import add_provider_middleware
+
+    stage_seconds = Counter()
+    calls = Counter()
+
+    def on_stage(stage_name, start, end, attrs):
+        stage_seconds[stage_name] += end - start
+
+    async def count_calls(call, proceed):
+        calls[call.kind] += 1
+        return await proceed()
+
+    add_stage_listener(on_stage)
+    add_provider_middleware(count_calls)
+
+    module_name, function_name, kwargs, report_file, fallbacks = ENTRY_POINTS[name]
+    mock_url = os.environ["MOCK_PROVIDER_URL"]
+    mock_before = mock_stats(mock_url)
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    for fallback in fallbacks:
+        def fallback_taken(*args, _fallback=fallback, **kwargs):
+            raise RuntimeError(f"{name} took the fallback path ({_fallback})")
+        setattr(module, fallback, fallback_taken)
+    report = asyncio.run(getattr(module, function_name)(**kwargs))
+    wall = time.perf_counter() - start
+
+    # Fallback and failed runs must not be timed as real pipelines
+    if not report:
+        raise RuntimeError(f"{name} produced no report")
+    if report_file and not os.path.exists(report_file):
+        raise RuntimeError(f"{name} did not write {report_file}")
+    mock_chat_calls = mock_stats(mock_url)["chat"] - mock_before["chat"]
+    if mock_chat_calls == 0:
+        raise RuntimeError(f"{name} made no chat calls to the mock provider")
+
+    result = {
+        "wall_seconds": round(wall, 3),
+        "stages": {stage_name: round(seconds, 3) for stage_name, seconds in stage_seconds.items()},
+        "provider_calls": dict(calls),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+def write_synthetic_papers(paper_dir, count, pages=4):
+    """Small generated PDFs standing in for the TMT corpus"""
+    import fitz
+
+    os.makedirs(paper_dir, exist_ok=True)
+    for i in range(count):
+        document = fitz.open()
+        for page_number in range(pages):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Synthetic TMT paper {i + 1}, page {page_number + 1}")
+            page.insert_textbox(fitz.Rect(72, 100, 520, 760),
+                                "Thirty Meter Telescope segmented mirror thermal control and adaptive optics. " * 30)
+        document.save(os.path.join(paper_dir, f"synthetic_paper_{i + 1:02d}.pdf"))
+        document.close()
+
+def prepare_workdir(papers, synthetic_papers):
+    """Temporary directory holding a run/ working directory and the ../TMT corpus the scripts expect"""
+    root = tempfile.mkdtemp(prefix="pipeline-bench-")
+    os.makedirs(os.path.join(root, "run"))
+    paper_dir = os.path.join(root, "TMT")
+    if papers:
+        os.symlink(os.path.abspath(papers), paper_dir)
+    else:
+        write_synthetic_papers(paper_dir, synthetic_papers)
+    return root
+
+def run_entry_point(name, root, mock_url, timeout):
+    """Run one entry point in a fresh subprocess so caches and RSS start cold"""
+    run_dir = os.path.join(root, "run")
+    shutil.rmtree(run_dir, ignore_errors=True)
+    os.makedirs(run_dir)
+    output_path = os.path.join(root, f"{name}.json")
+
+    env = dict(os.environ, MOCK_PROVIDER_URL=mock_url)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run-one", name, "--result-file", output_path],
+        cwd=run_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout
+    )
+    if completed.returncode != 0 or not os.path.exists(output_path):
+        print(completed.stdout.decode('utf-8', errors='replace')[-2000:])
+        raise RuntimeError(f"{name} exited with status {completed.returncode}")
+    with open(output_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def median_result(runs):
+    """Per-metric median over repeated runs"""
+    stage_names = sorted({stage_name for run in runs for stage_name in run["stages"]})
+    call_kinds = sorted({kind for run in runs for kind in run["provider_calls"]})
+    return {
+        "wall_seconds": round(statistics.median(run["wall_seconds"] for run in runs), 3),
+        "stages": {stage_name: round(statistics.median(run["stages"].get(stage_name, 0.0) for run in runs), 3)
+                   for stage_name in stage_names},
+        "provider_calls": {kind: int(statistics.median(run["provider_calls"].get(kind, 0) for run in runs))
+                           for kind in call_kinds},
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in runs),
+    }
+
+def compare_to_baseline(results, baseline, tolerance, min_delta):
+    """List regressions: slower stages, more provider calls or higher peak RSS than the baseline"""
+    regressions = []
+    for name, current in results["entry_points"].items():
+        previous = baseline.get("entry_points", {}).get(name)
+        if not previous:
+            continue
+
+        timings = [("wall", current["wall_seconds"], previous["wall_seconds"])]
+        timings += [(stage_name, seconds, previous["stages"].get(stage_name))
+                    for stage_name, seconds in current["stages"].items()]
+        for label, now, before in timings:
+            if before is not None and now > before * (1 + tolerance) and now - before > min_delta:
+                regressions.append(f"{name}: {label} {before:.2f}s -> {now:.2f}s")
+
+        for kind, count in current["provider_calls"].items():
+            before = previous["provider_calls"].get(kind, 0)
+            if count > before:
+                regressions.append(f"{name}: {kind} calls {before} -> {count}")
+
+        if current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {previous['peak_rss_mb']}MB -> {current['peak_rss_mb']}MB")
+    return regressions
+
+def print_results(results):
+    header = f"{'entry point':<26}{'wall':>8}" + "".join(f"{stage_name[:12]:>14}" for stage_name in STAGES)
+    print(header + f"{'calls':>8}{'RSS MB':>9}")
+    print("-" * len(header + " " * 17))
+    for name, result in results["entry_points"].items():
+        stages = "".join(
+            f"{result['stages'][stage_name]:>13.2f}s" if stage_name in result["stages"] else f"{'-':>14}"
+            for stage_name in STAGES
+        )
+        calls = sum(result["provider_calls"].values())
+        print(f"{name:<26}{result['wall_seconds']:>7.2f}s{stages}{calls:>8}{result['peak_rss_mb']:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research pipelines against mocked providers")
+    parser.add_argument("entry_points", nargs="*", metavar="ENTRY_POINT",
+                        help=f"entry points to run (default: all of {', '.join(ENTRY_POINTS)})")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per entry point; the median is reported")
+    parser.add_argument("--papers", help="paper directory to benchmark on (default: generated PDFs)")
+    parser.add_argument("--synthetic-papers", type=int, default=6, help="number of generated PDFs")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="mock provider median latency")
+    parser.add_argument("--tokens-per-second", type=float, default=2000.0, help="mock completion throughput")
+    parser.add_argument("--timeout", type=float, default=900.0, help="seconds allowed per entry point run")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to save the results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument("--min-delta", type=float, default=0.25, help="ignore slowdowns below this many seconds")
+    parser.add_argument("--run-one", choices=list(ENTRY_POINTS), help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(args.run_one, args.result_file)
+        return
+    unknown = [name for name in args.entry_points if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry point(s): {', '.join(unknown)}")
+
+    settings = MockSettings(latency_ms=args.latency_ms, latency_sigma=0.0,
+                            tokens_per_second=args.tokens_per_second, seed=0)
+    server = start_mock_server(settings, port=0)
+    mock_url = f"http://127.0.0.1:{server.server_address[1]}"
+    root = prepare_workdir(args.papers, args.synthetic_papers)
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "settings": {"latency_ms": args.latency_ms, "tokens_per_second": args.tokens_per_second,
+                     "repeat": args.repeat, "papers": args.papers or f"{args.synthetic_papers} synthetic"},
+        "entry_points": {},
+    }
+    try:
+        for name in args.entry_points or list(ENTRY_POINTS):
+            print(f"⏱️  Benchmarking {name}...")
+            runs = [run_entry_point(name, root, mock_url, args.timeout) for _ in range(args.repeat)]
+            results["entry_points"][name] = median_result(runs)
+    finally:
+        server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+    print()
+    print_results(results)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"📌 Baseline saved to: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️  No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_delta)
+    if regressions:
+        print("❌ Regressions against baseline:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        sys.exit(1)
+    print("✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
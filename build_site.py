@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Static site of all generated reviews, precompressed, with client-side search
+Collects the review pages (*.html in the working directory) into site/ with
+an index page. Inline page styles become shared, content-hashed stylesheets
+under site/assets/, so readers download the CSS once and can cache it
+forever. Every page and asset is also written as .gz and, when the optional
+brotli package is installed, .br, ready to be served as-is by a static file
+server. A compact inverted index of every report section (latin words plus
+CJK character bigrams, the same terms as prompt_budget) is precomputed for
+the search box on the index page, so searching needs no server.
+
+Usage:
+    python build_site.py                     # ./*.html -> site/
+    python build_site.py --source out --out public --title "研究综述"
+"""
+
+import os
+import re
+import sys
+import glob
+import gzip
+import html
+import json
+import time
+import hashlib
+import argparse
+from collections import Counter
+from dataclasses import dataclass
+from prompt_budget import tokenize_terms, CJK_RE, STOPWORDS
+from report_templates import PAGE_CSS, render_site_index
+
+try:
+    import brotli
+except ImportError:  # optional: .br variants are skipped without it
+    brotli = None
+
+SITE_DIR = "site"
+ASSET_DIR = "assets"
+INDEX_VERSION = 1
+HASH_LENGTH = 10
+SNIPPET_CHARS = 120
+COMPRESSED_SUFFIXES = (".gz", ".br")
+MANIFEST_NAME = ".build-manifest.json"
+
+STYLE_BLOCK = re.compile(r"<style>(.*?)</style>", re.DOTALL)
+TITLE = re.compile(r"<title>(.*?)</title>", re.DOTALL)
+BODY_OPEN = re.compile(r"<body[^>]*>")
+MAIN = re.compile(r"<main\b[^>]*>(.*?)</main>", re.DOTALL)
+SECTION_HEADING = re.compile(r'<h([1-3]) id="([^"]*)">(.*?)</h\1>', re.DOTALL)
+HTML_TAG = re.compile(r"<[^>]+>")
+WHITESPACE = re.compile(r"\s+")
+
+SITE_CSS = """
+        .site-index { max-width: 960px; margin: 0 auto; }
+        .site-nav { max-width: 1480px; margin: 0 auto 12px; }
+        .site-nav a { color: #3498db; text-decoration: none; }
+        .site-search { margin: 20px 0 30px; }
+        .site-search input {
+            width: 100%;
+            box-sizing: border-box;
+            padding: 10px 14px;
+            font-size: 16px;
+            border: 1px solid #ccd6dd;
+            border-radius: 6px;
+        }
+        .search-results { padding-left: 22px; }
+        .search-results li { margin: 10px 0; }
+        .search-results small { display: block; color: #7f8c8d; }
+"""
+
+SEARCH_JS = """(function () {
+    var input = document.getElementById("site-search");
+    var results = document.getElementById("site-search-results");
+    var MAX_RESULTS = 20;
+    var loading = null;
+
+    function load() {
+        if (!loading) {
+            loading = fetch(input.dataset.index).then(function (response) { return response.json(); })
+                .then(function (index) {
+                    index.stop = new Set(index.stop);
+                    index.cjk = new RegExp(index.cjk, "gu");
+                    return index;
+                });
+        }
+        return loading;
+    }
+
+    // Mirrors prompt_budget.tokenize_terms: latin words longer than two letters, CJK bigrams
+    function tokenize(text, index) {
+        var lowered = text.toLowerCase(), terms = [];
+        (lowered.match(/[a-z0-9]+/g) || []).forEach(function (word) {
+            if (word.length > 2 && !index.stop.has(word)) terms.push(word);
+        });
+        (lowered.match(index.cjk) || []).forEach(function (run) {
+            var chars = Array.from(run);
+            if (chars.length === 1) terms.push(run);
+            for (var i = 0; i + 1 < chars.length; i++) terms.push(chars[i] + chars[i + 1]);
+        });
+        return Array.from(new Set(terms));
+    }
+
+    function search(query, index) {
+        var hits = {}, total = index.docs.length;
+        tokenize(query, index).forEach(function (term) {
+            var postings = index.terms[term];
+            if (!postings) return;
+            var idf = Math.log(1 + total / (postings.length / 2)), doc = 0;
+            for (var i = 0; i < postings.length; i += 2) {
+                doc += postings[i];  // document ids are delta-encoded
+                var hit = hits[doc] || (hits[doc] = {doc: doc, matched: 0, score: 0});
+                hit.matched += 1;
+                hit.score += (1 + Math.log(postings[i + 1])) * idf;
+            }
+        });
+        return Object.keys(hits).map(function (doc) { return hits[doc]; })
+            .sort(function (a, b) { return b.matched - a.matched || b.score - a.score; })
+            .slice(0, MAX_RESULTS);
+    }
+
+    function show(hits, index) {
+        results.textContent = "";
+        hits.forEach(function (hit) {
+            var doc = index.docs[hit.doc], page = index.pages[doc[0]];
+            var item = document.createElement("li");
+            var link = document.createElement("a");
+            link.href = page[1] + (doc[1] ? "#" + doc[1] : "");
+            link.textContent = doc[2] ? page[0] + " › " + doc[2] : page[0];
+            var snippet = document.createElement("small");
+            snippet.textContent = doc[3];
+            item.appendChild(link);
+            item.appendChild(snippet);
+            results.appendChild(item);
+        });
+    }
+
+    input.addEventListener("input", function () {
+        var query = input.value;
+        if (!query.trim()) { results.textContent = ""; return; }
+        load().then(function (index) {
+            if (input.value === query) show(search(query, index), index);
+        });
+    });
+    input.addEventListener("focus", load, {once: true});
+})();
+"""
+
+@dataclass
+class SiteEntry:
+    """One review on the index page"""
+    title: str
+    href: str
+    updated: str
+    sections: int
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def plain(fragment):
+    """Text of an HTML fragment with tags dropped and whitespace collapsed"""
+    return WHITESPACE.sub(" ", html.unescape(HTML_TAG.sub(" ", fragment))).strip()
+
+class SiteWriter:
+    """Writes site files with .gz/.br variants; unchanged files are left untouched"""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.files = set()
+        self.written = 0
+        self.unchanged = 0
+        self.sizes = Counter()
+
+    def _path(self, rel_path):
+        return os.path.join(self.out_dir, *rel_path.split("/"))
+
+    def _replace(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _compressed(self, path, data, suffix, changed):
+        """Keep or write one precompressed variant (only if it is smaller than the original)"""
+        variant = path + suffix
+        if not changed and os.path.exists(variant):
+            self.files.add(variant)
+            self.sizes[suffix] += os.path.getsize(variant)
+            return
+        if suffix == ".gz":
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        else:
+            compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            self._replace(variant, compressed)
+            self.files.add(variant)
+            self.sizes[suffix] += len(compressed)
+
+    def write(self, rel_path, data):
+        path = self._path(rel_path)
+        try:
+            with open(path, 'rb') as f:
+                changed = f.read() != data
+        except OSError:
+            changed = True
+        if changed:
+            self._replace(path, data)
+            self.written += 1
+        else:
+            self.unchanged += 1
+        self.files.add(path)
+        self.sizes["raw"] += len(data)
+        self._compressed(path, data, ".gz", changed)
+        if brotli is not None:
+            self._compressed(path, data, ".br", changed)
+        return rel_path
+
+    def asset(self, name, extension, data):
+        """Write a content-hashed asset and return its site-relative path"""
+        return self.write(f"{ASSET_DIR}/{name}.{content_hash(data)}{extension}", data)
+
+    def prune(self):
+        """Remove files an earlier build wrote that this one did not (old asset hashes, deleted pages)
+
+        Only paths listed in the previous build's manifest are candidates, so
+        files the build never wrote are left alone whatever directory --out names.
+        """
+        manifest_path = self._path(MANIFEST_NAME)
+        previous = []
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f).get("files", [])
+        current = sorted(os.path.relpath(path, self.out_dir).replace(os.sep, "/") for path in self.files)
+        removed = 0
+        for rel_path in set(previous) - set(current):
+            if os.path.isabs(rel_path) or ".." in rel_path.split("/"):
+                continue
+            path = self._path(rel_path)
+            if os.path.isfile(path):
+                os.remove(path)
+                removed += 1
+        self._replace(manifest_path, json.dumps({"files": current}, ensure_ascii=False, indent=1).encode('utf-8'))
+        return removed
+
+class SearchIndex:
+    """Inverted index of report sections: term -> delta-encoded (document, term frequency) pairs"""
+
+    def __init__(self):
+        self.pages = []
+        self.docs = []
+        self.postings = {}
+
+    def add_page(self, title, href):
+        self.pages.append([title, href])
+        return len(self.pages) - 1
+
+    def add_section(self, page, anchor, heading, text):
+        doc = len(self.docs)
+        self.docs.append([page, anchor, heading, text[:SNIPPET_CHARS]])
+        for term, count in Counter(tokenize_terms(f"{heading} {text}")).items():
+            self.postings.setdefault(term, []).append((doc, count))
+
+    def to_json(self):
+        terms = {}
+        for term in sorted(self.postings):
+            flat, previous = [], 0
+            for doc, count in self.postings[term]:
+                flat.extend((doc - previous, count))
+                previous = doc
+            terms[term] = flat
+        return json.dumps({
+            "v": INDEX_VERSION,
+            "stop": sorted(STOPWORDS),
+            "cjk": CJK_RE.pattern,
+            "pages": self.pages,
+            "docs": self.docs,
+            "terms": terms,
+        }, ensure_ascii=False, separators=(",", ":"))
+
+def page_sections(page_html):
+    """(anchor, heading, text) of every h1-h3 section in a page's main content"""
+    match = MAIN.search(page_html)
+    content = match.group(1) if match else page_html
+    sections = []
+    anchor, heading, start = None, "", 0
+    for heading_match in SECTION_HEADING.finditer(content):
+        text = plain(content[start:heading_match.start()])
+        if text or anchor:
+            sections.append((anchor, heading, text))
+        anchor, heading, start = heading_match.group(2), plain(heading_match.group(3)), heading_match.end()
+    sections.append((anchor, heading, plain(content[start:])))
+    return sections
+
+def rewrite_page(page_html, stylesheet):
+    """Replace inline styles with links to shared stylesheets and add a link back to the index"""
+    page_html = STYLE_BLOCK.sub(lambda m: f'<link rel="stylesheet" href="{stylesheet(m.group(1))}">', page_html)
+    return BODY_OPEN.sub(
+        lambda m: f'{m.group(0)}\n<nav class="site-nav"><a href="index.html">← 全部综述</a></nav>', page_html, count=1)
+
+def collect_pages(source_dir, out_dir, patterns=("*.html",)):
+    """Review pages in source_dir, excluding the site output and unfinished temporary files"""
+    out_dir = os.path.abspath(out_dir)
+    paths = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(source_dir, pattern)):
+            if os.path.isfile(path) and not os.path.abspath(path).startswith(out_dir + os.sep):
+                paths.add(path)
+    return sorted(paths)
+
+def build_site(source_dir=".", out_dir=SITE_DIR, title="研究综述", patterns=("*.html",)):
+    """Build the static site; returns the SiteWriter with what was written"""
+    source, out = os.path.abspath(source_dir), os.path.abspath(out_dir)
+    if source == out or source.startswith(out + os.sep):
+        raise ValueError(f"site output {out_dir} must not contain the source directory {source_dir}")
+    site = SiteWriter(out_dir)
+    index = SearchIndex()
+    shared_css = site.asset("site", ".css", (PAGE_CSS + SITE_CSS).encode('utf-8'))
+    page_css = PAGE_CSS.strip()
+
+    def stylesheet(css):
+        if css.strip() == page_css:
+            return shared_css
+        return site.asset("page", ".css", css.encode('utf-8'))
+
+    reviews = []
+    for path in collect_pages(source_dir, out_dir, patterns):
+        with open(path, 'r', encoding='utf-8') as f:
+            page_html = f.read()
+        href = os.path.basename(path)
+        if href == "index.html":
+            continue
+        title_match = TITLE.search(page_html)
+        page_title = plain(title_match.group(1)) if title_match else os.path.splitext(href)[0]
+
+        page = index.add_page(page_title, href)
+        sections = page_sections(page_html)
+        for anchor, heading, text in sections:
+            index.add_section(page, anchor, heading, text)
+        site.write(href, rewrite_page(page_html, stylesheet).encode('utf-8'))
+        updated = time.strftime("%Y-%m-%d", time.localtime(os.path.getmtime(path)))
+        reviews.append(SiteEntry(page_title, href, updated, len(sections)))
+
+    script = site.asset("search", ".js", SEARCH_JS.encode('utf-8'))
+    search_index = site.asset("search-index", ".json", index.to_json().encode('utf-8'))
+
+    chunks = []
+    render_site_index(
+        chunks.append,
+        lang="zh-CN",
+        title=title,
+        css_href=shared_css,
+        script_href=script,
+        index_href=search_index,
+        search_placeholder="搜索全部综述…",
+        reviews=reviews,
+    )
+    site.write("index.html", "".join(chunks).encode('utf-8'))
+    removed = site.prune()
+
+    print(f"🌐 站点已生成: {out_dir}/index.html ({len(reviews)} 篇综述, {len(index.docs)} 个检索段落, "
+          f"{len(index.postings)} 个索引词)")
+    sizes = ", ".join(f"{suffix} {site.sizes[suffix] / 1024:.1f} KB"
+                      for suffix in COMPRESSED_SUFFIXES if site.sizes[suffix])
+    print(f"📦 写入 {site.written} 个文件, {site.unchanged} 个未变化, 清理 {removed} 个旧文件; "
+          f"原始 {site.sizes['raw'] / 1024:.1f} KB, {sizes}")
+    if brotli is None:
+        print("ℹ️  未安装 brotli，跳过 .br 预压缩 (pip install brotli)")
+    return site
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a static, precompressed site of all generated reviews")
+    parser.add_argument("--source", default=".", help="directory with the generated review pages")
+    parser.add_argument("--out", default=SITE_DIR, help="output directory (files removed from the site since the last build are deleted)")
+    parser.add_argument("--title", default="研究综述", help="index page title")
+    parser.add_argument("--pattern", action="append", help="glob of pages to include (default *.html)")
+    args = parser.parse_args(argv)
+    try:
+        build_site(args.source, args.out, args.title, tuple(args.pattern or ("*.html",)))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Record / replay cassettes for provider traffic
+Captures every chat, embedding, search and scrape call made by the
+researchers into a gzip-compressed JSONL cassette, and serves the recorded
+responses back without touching the network, so HTML re-rendering, profiling
+and test_gpt_researcher.py run offline in seconds.
+
+    CASSETTE=aluminum.cassette.jsonl.gz CASSETTE_MODE=record python aluminum_electrolytic_review.py
+    CASSETTE=aluminum.cassette.jsonl.gz CASSETTE_MODE=replay python aluminum_electrolytic_review.py
+
+Modes: "record" overwrites the cassette, "replay" fails on any request that
+was not recorded exactly, "auto" (default) replays what it has and records the
+rest. Dates in prompts are masked in request keys, so a cassette recorded on
+one day still matches on the next. CASSETTE_BY_ORDER=true lets auto mode
+answer a changed request with the next unused recording of the same
+kind/provider/model instead of calling the provider.
+"""
+
+import os
+import re
+import gzip
+import json
+import array
+import base64
+import atexit
+import hashlib
+import threading
+import contextlib
+from collections import defaultdict, deque
+from provider_hooks import add_provider_middleware, remove_provider_middleware
+
+CASSETTE_VERSION = 2  # version 1 keys included the date embedded in prompts
+CASSETTE_MODES = ("record", "replay", "auto")
+
+class CassetteMiss(RuntimeError):
+    """A replay-only cassette has no response for a request"""
+
+# Dates GPT-Researcher writes into prompts: "October 17, 2026" and 2026-10-17
+DATE_PATTERN = re.compile(
+    r"\b(?:January|February|March|April|May|June|July|August|September|October|November|December)"
+    r" \d{1,2}, \d{4}\b|\b\d{4}-\d{2}-\d{2}\b"
+)
+
+def request_key(call):
+    """Stable hash of a provider request, with dates masked"""
+    payload = json.dumps([call.kind, call.provider, call.model, call.payload],
+                         sort_keys=True, ensure_ascii=False, default=str)
+    payload = DATE_PATTERN.sub("<date>", payload)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _is_vector(value):
+    return isinstance(value, list) and bool(value) and all(isinstance(item, float) for item in value)
+
+def encode_response(kind, response):
+    """JSON form of a response; embedding vectors are packed as base64 float32"""
+    if kind == "embedding":
+        if _is_vector(response):
+            return {"float32": base64.b64encode(array.array("f", response).tobytes()).decode('ascii'),
+                    "shape": [len(response)]}
+        if isinstance(response, list) and response and all(_is_vector(vector) for vector in response):
+            packed = array.array("f", [value for vector in response for value in vector])
+            return {"float32": base64.b64encode(packed.tobytes()).decode('ascii'),
+                    "shape": [len(response), len(response[0])]}
+    return response
+
+def decode_response(kind, response):
+    if kind == "embedding" and isinstance(response, dict) and "float32" in response:
+        values = array.array("f")
+        values.frombytes(base64.b64decode(response["float32"]))
+        values = values.tolist()
+        if len(response["shape"]) == 1:
+            return values
+        width = response["shape"][1]
+        return [values[i:i + width] for i in range(0, len(values), width)]
+    return response
+
+class Cassette:
+    """Recorded provider responses, usable as a provider middleware"""
+
+    def __init__(self, path, mode="auto", by_order=False):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"cassette mode must be one of {', '.join(CASSETTE_MODES)}")
+        self.path = path
+        self.mode = mode
+        self.by_order = by_order and mode == "auto"
+        self.meta = {}
+        self.entries = []
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.recorded = 0
+        self._by_key = defaultdict(deque)
+        self._by_route = defaultdict(deque)
+        self._used = set()
+        self._lock = threading.Lock()
+
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"cassette not found: {path}")
+        if mode != "record" and os.path.exists(path):
+            self.load()
+
+    def _index(self, position, entry):
+        self._by_key[entry["key"]].append(position)
+        self._by_route[(entry["kind"], entry["provider"], entry["model"])].append(position)
+
+    def load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            header = json.loads(f.readline() or "{}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"unsupported cassette version in {self.path}: {header.get('version')}; "
+                                 "record it again with CASSETTE_MODE=record")
+            self.meta = header.get("meta", {})
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._index(len(self.entries), entry)
+                    self.entries.append(entry)
+
+    def _take(self, positions):
+        while positions:
+            position = positions.popleft()
+            if position not in self._used:
+                self._used.add(position)
+                return self.entries[position]
+        return None
+
+    def lookup(self, call):
+        """Next unused recording of this exact request
+
+        With by_order, a miss in auto mode falls back to the next recording of
+        the same kind/provider/model; otherwise only exact matches are served.
+        """
+        with self._lock:
+            entry = self._take(self._by_key.get(request_key(call), deque()))
+            if entry is not None:
+                self.hits += 1
+                return entry
+            if not self.by_order:
+                return None
+            entry = self._take(self._by_route.get((call.kind, call.provider, call.model), deque()))
+            if entry is not None:
+                self.fuzzy_hits += 1
+            return entry
+
+    def record(self, call, response):
+        entry = {
+            "key": request_key(call),
+            "kind": call.kind,
+            "provider": call.provider,
+            "model": call.model,
+            "response": encode_response(call.kind, response),
+        }
+        try:
+            json.dumps(entry, ensure_ascii=False)
+        except (TypeError, ValueError):
+            print(f"⚠️  Not recording unserializable {call.kind} response from {call.provider}")
+            return
+        with self._lock:
+            self._used.add(len(self.entries))
+            self.entries.append(entry)
+            self.recorded += 1
+
+    async def __call__(self, call, proceed):
+        if self.mode != "record":
+            entry = self.lookup(call)
+            if entry is not None:
+                response = decode_response(call.kind, entry["response"])
+                call.record_result(response)
+                return response
+            if self.mode == "replay":
+                raise CassetteMiss(f"no recorded {call.kind} response for {call.provider}:{call.model} in {self.path}")
+
+        response = await proceed()
+        self.record(call, response)
+        return response
+
+    def save(self):
+        """Write the cassette atomically if anything was recorded"""
+        if not self.recorded and os.path.exists(self.path):
+            return
+        tmp_path = self.path + ".tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION, "meta": self.meta}, ensure_ascii=False) + "\n")
+            for entry in self.entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        self.save()
+        print(f"📼 Cassette {self.path}: {self.hits} replayed, {self.fuzzy_hits} replayed by order, "
+              f"{self.recorded} recorded")
+
+_cassette = None
+
+def cassette_mode_from_env():
+    return os.getenv("CASSETTE_MODE", "auto") if os.getenv("CASSETTE") else None
+
+def cassette_by_order_from_env():
+    return os.getenv("CASSETTE_BY_ORDER", "").lower() in ("1", "true", "yes")
+
+def install_cassette_from_env():
+    """Install the process-wide cassette named by CASSETTE (idempotent) and return it"""
+    global _cassette
+    path = os.getenv("CASSETTE")
+    if path and _cassette is None:
+        _cassette = Cassette(path, cassette_mode_from_env(), cassette_by_order_from_env())
+        add_provider_middleware(_cassette)
+        atexit.register(_cassette.close)
+    return _cassette
+
+@contextlib.contextmanager
+def use_cassette(path, mode="auto", by_order=False):
+    """Record or replay the provider calls made inside the block"""
+    cassette = Cassette(path, mode, by_order)
+    add_provider_middleware(cassette, first=True)
+    try:
+        yield cassette
+    finally:
+        remove_provider_middleware(cassette)
+        cassette.close()
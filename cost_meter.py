@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Token and call accounting per review run
+Counts prompt/completion tokens, embedding tokens, search and scrape calls per
+provider and per pipeline stage, writes the summary next to the report
+(e.g. aluminum_electrolytic_review.metrics.json) and enforces an optional
+hard token budget (TOKEN_BUDGET or --token-budget) that stops the run early.
+
+Optional per-model prices (USD per million tokens) for a cost estimate:
+    TOKEN_PRICES={"kimi-k2": {"prompt": 0.6, "completion": 2.5}}
+"""
+
+import os
+import json
+import time
+import threading
+import contextlib
+import contextvars
+from datetime import datetime
+from provider_hooks import add_provider_middleware
+from pipeline_stages import current_stage
+
+current_meter = contextvars.ContextVar("current_meter", default=None)
+
+class TokenBudgetExceeded(RuntimeError):
+    """Raised instead of a provider call that would exceed the run's token budget"""
+
+def load_budget_from_env():
+    raw = os.getenv("TOKEN_BUDGET")
+    return int(raw) if raw else None
+
+def load_prices_from_env():
+    raw = os.getenv("TOKEN_PRICES")
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        print(f"⚠️  Ignoring invalid TOKEN_PRICES: {e}")
+        return {}
+
+def _empty_counts():
+    return {
+        "chat_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+        "embedding_calls": 0, "embedding_tokens": 0,
+        "search_calls": 0, "scrape_calls": 0,
+        "errors": 0, "seconds": 0.0,
+    }
+
+class CostMeter:
+    """Usage counters for one run, shared by all its tasks and threads"""
+
+    def __init__(self, budget_tokens=None, prices=None):
+        self.budget_tokens = budget_tokens
+        self.prices = prices or {}
+        self.providers = {}
+        self.stages = {}
+        self.models = {}
+        self.exceeded = False
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self):
+        return sum(counts["prompt_tokens"] + counts["completion_tokens"] + counts["embedding_tokens"]
+                   for counts in self.providers.values())
+
+    def check_budget(self, call):
+        """Refuse the call if its prompt would push the run past the budget"""
+        if self.budget_tokens is None:
+            return
+        with self._lock:
+            if self.exceeded or self.total_tokens + call.prompt_tokens > self.budget_tokens:
+                self.exceeded = True
+                raise TokenBudgetExceeded(
+                    f"token budget of {self.budget_tokens} exhausted ({self.total_tokens} used) "
+                    f"before {call.kind} call to {call.provider}"
+                )
+
+    def record(self, call, seconds, failed=False):
+        with self._lock:
+            targets = [
+                self.providers.setdefault(call.provider, _empty_counts()),
+                self.stages.setdefault(current_stage.get() or "other", _empty_counts()),
+            ]
+            if call.kind == "chat":
+                model = self.models.setdefault(call.model, {"prompt_tokens": 0, "completion_tokens": 0})
+                model["prompt_tokens"] += call.prompt_tokens
+                model["completion_tokens"] += call.completion_tokens
+            for counts in targets:
+                counts["seconds"] += seconds
+                if failed:
+                    counts["errors"] += 1
+                if call.kind == "chat":
+                    counts["chat_calls"] += 1
+                    counts["prompt_tokens"] += call.prompt_tokens
+                    counts["completion_tokens"] += call.completion_tokens
+                elif call.kind == "embedding":
+                    counts["embedding_calls"] += 1
+                    counts["embedding_tokens"] += call.prompt_tokens
+                elif call.kind in ("search", "scrape"):
+                    counts[f"{call.kind}_calls"] += 1
+
+    def estimated_cost(self):
+        """USD estimate from TOKEN_PRICES, or None when no model has a price"""
+        cost = None
+        for model, tokens in self.models.items():
+            price = self.prices.get(model)
+            if price:
+                cost = (cost or 0.0) + (tokens["prompt_tokens"] * price.get("prompt", 0.0)
+                                        + tokens["completion_tokens"] * price.get("completion", 0.0)) / 1e6
+        return round(cost, 4) if cost is not None else None
+
+    def summary(self, status):
+        totals = _empty_counts()
+        for counts in self.providers.values():
+            for key, value in counts.items():
+                totals[key] += value
+
+        def rounded(counts):
+            return dict(counts, seconds=round(counts["seconds"], 3))
+
+        return {
+            "status": status,
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "elapsed_seconds": round(time.time() - self.started, 3),
+            "budget_tokens": self.budget_tokens,
+            "total_tokens": self.total_tokens,
+            "estimated_cost_usd": self.estimated_cost(),
+            "totals": rounded(totals),
+            "providers": {name: rounded(counts) for name, counts in self.providers.items()},
+            "stages": {name: rounded(counts) for name, counts in self.stages.items()},
+            "models": self.models,
+        }
+
+async def meter_provider_call(call, proceed):
+    """Provider middleware: enforce the budget and count usage for the current run's meter"""
+    meter = current_meter.get()
+    if meter is None:
+        return await proceed()
+
+    meter.check_budget(call)
+    start = time.perf_counter()
+    try:
+        result = await proceed()
+    except Exception:
+        meter.record(call, time.perf_counter() - start, failed=True)
+        raise
+    meter.record(call, time.perf_counter() - start)
+    return result
+
+def metrics_path_for(output_file):
+    return os.path.splitext(output_file)[0] + ".metrics.json"
+
+@contextlib.contextmanager
+def metered_run(output_file, budget_tokens=None):
+    """Meter the provider calls made inside the block and write <output>.metrics.json"""
+    add_provider_middleware(meter_provider_call, first=True)
+    meter = CostMeter(budget_tokens if budget_tokens is not None else load_budget_from_env(),
+                      load_prices_from_env())
+    token = current_meter.set(meter)
+    status = "failed"
+    try:
+        yield meter
+        status = "budget_exceeded" if meter.exceeded else "completed"
+    except TokenBudgetExceeded:
+        status = "budget_exceeded"
+        raise
+    finally:
+        current_meter.reset(token)
+        metrics_file = metrics_path_for(output_file)
+        summary = meter.summary(status)
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        totals = summary["totals"]
+        print(f"💰 Usage: {totals['prompt_tokens']} prompt + {totals['completion_tokens']} completion tokens "
+              f"in {totals['chat_calls']} LLM calls, {totals['embedding_tokens']} embedding tokens, "
+              f"{totals['search_calls']} searches ({status}) -> {metrics_file}")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Persistent embedding cache keyed by model and text hash
+Vectors live in one memory-mapped float32 matrix per embedding model, with a
+SQLite index from text sha256 to matrix row. Cached texts are read back as one
+contiguous NumPy array; only the misses are embedded, de-duplicated and
+coalesced into the largest batches the provider accepts. Re-running the TMT
+scripts therefore re-embeds only new or changed pages.
+
+Callers that take arrays (semantic_cache) use embed_documents_array(); the
+LangChain methods GPT-Researcher calls still return lists, as that interface
+requires. Queries are cached apart from documents, because some providers
+embed a query differently from the same text as a document.
+
+EMBEDDING_CACHE=false disables it; EMBEDDING_BATCH_SIZE and
+EMBEDDING_BATCH_TOKENS bound a batch request (defaults 2048 inputs / 250k tokens).
+"""
+
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from paper_manifest import CACHE_DIR
+from provider_hooks import estimate_tokens, _EmbeddingsBase
+
+EMBEDDING_CACHE_DIR = os.path.join(CACHE_DIR, "embeddings")
+MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "2048"))
+MAX_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "250000"))
+SQLITE_MAX_PARAMS = 900
+
+def embedding_cache_enabled():
+    return os.getenv("EMBEDDING_CACHE", "true").lower() not in ("0", "false", "no")
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def miss_batches(texts, max_size=None, max_tokens=None):
+    """Split texts into consecutive batches within the provider's input and token limits"""
+    max_size, max_tokens = max_size or MAX_BATCH_SIZE, max_tokens or MAX_BATCH_TOKENS
+    batch, batch_tokens = [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_size or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+class EmbeddingStore:
+    """Vectors of one embedding model: SQLite hash -> row index plus a float32 matrix file"""
+
+    def __init__(self, model, cache_dir=EMBEDDING_CACHE_DIR):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.model = model
+        self.matrix_path = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model) + ".f32")
+        self.db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=30, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS models (model TEXT PRIMARY KEY, dim INTEGER NOT NULL)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "model TEXT NOT NULL, hash TEXT NOT NULL, row INTEGER NOT NULL, PRIMARY KEY (model, hash))"
+        )
+        self.db.commit()
+        row = self.db.execute("SELECT dim FROM models WHERE model = ?", (model,)).fetchone()
+        self.dim = row[0] if row else None
+        self._matrix = None
+        self._lock = threading.Lock()
+        if self.dim is not None:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self._repair()
+                self.db.commit()
+            except BaseException:
+                self.db.rollback()
+                raise
+
+    def _rows_on_disk(self):
+        try:
+            return os.path.getsize(self.matrix_path) // (4 * self.dim)
+        except OSError:
+            return 0
+
+    def _repair(self):
+        """Cut a partially written last row and forget rows past the end of the file
+
+        Called inside a write transaction, so no other process is appending.
+        Returns the number of complete rows.
+        """
+        rows = self._rows_on_disk()
+        if os.path.exists(self.matrix_path) and os.path.getsize(self.matrix_path) != rows * 4 * self.dim:
+            os.truncate(self.matrix_path, rows * 4 * self.dim)
+        self.db.execute("DELETE FROM vectors WHERE model = ? AND row >= ?", (self.model, rows))
+        return rows
+
+    def _mapped(self, needed_rows):
+        """Read-only memory map covering at least `needed_rows` rows"""
+        if self._matrix is None or self._matrix.shape[0] < needed_rows:
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r",
+                                     shape=(self._rows_on_disk(), self.dim))
+        return self._matrix
+
+    def lookup(self, hashes):
+        """Matrix rows of the cached hashes"""
+        rows = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for i in range(0, len(unique), SQLITE_MAX_PARAMS):
+                chunk = unique[i:i + SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows.update(self.db.execute(
+                    f"SELECT hash, row FROM vectors WHERE model = ? AND hash IN ({placeholders})",
+                    [self.model, *chunk]
+                ).fetchall())
+        return rows
+
+    def add(self, hashes, vectors):
+        """Append vectors for new hashes (safe across processes via the SQLite write lock)"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                if self.dim is None:
+                    self.dim = vectors.shape[1]
+                    self.db.execute("INSERT OR IGNORE INTO models (model, dim) VALUES (?, ?)", (self.model, self.dim))
+                if vectors.shape[1] != self.dim:
+                    raise ValueError(f"{self.model} returned {vectors.shape[1]}-dim vectors, cache has {self.dim}")
+                start = self._repair()
+                with open(self.matrix_path, 'ab') as f:
+                    f.write(vectors.tobytes())
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO vectors (model, hash, row) VALUES (?, ?, ?)",
+                    [(self.model, text_hash_value, start + i) for i, text_hash_value in enumerate(hashes)]
+                )
+                self.db.commit()
+            except BaseException:
+                self.db.rollback()
+                raise
+
+    def plan(self, texts):
+        """(hashes, cached rows, unique missing texts by hash) for a list of texts"""
+        hashes = [text_hash(text) for text in texts]
+        rows = self.lookup(hashes) if self.dim is not None else {}
+        missing = {}
+        for text, text_hash_value in zip(texts, hashes):
+            if text_hash_value not in rows:
+                missing.setdefault(text_hash_value, text)
+        return hashes, rows, missing
+
+    def assemble(self, hashes, rows):
+        """Contiguous (len(hashes), dim) array gathered from the memory-mapped matrix"""
+        if not hashes:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        indexes = np.fromiter((rows[text_hash_value] for text_hash_value in hashes), dtype=np.int64, count=len(hashes))
+        with self._lock:
+            return np.asarray(self._mapped(int(indexes.max()) + 1)[indexes])
+
+    def embed(self, texts, embed_batch):
+        """Embeddings of `texts` as one array; misses go to embed_batch(list_of_texts) in large batches"""
+        hashes, rows, missing = self.plan(texts)
+        for batch in miss_batches(list(missing.values())):
+            vectors = embed_batch(batch)
+            self.add([text_hash(text) for text in batch], vectors)
+        if missing:
+            rows = self.lookup(hashes)
+        return self.assemble(hashes, rows)
+
+    async def aembed(self, texts, aembed_batch):
+        hashes, rows, missing = self.plan(texts)
+        for batch in miss_batches(list(missing.values())):
+            vectors = await aembed_batch(batch)
+            self.add([text_hash(text) for text in batch], vectors)
+        if missing:
+            rows = self.lookup(hashes)
+        return self.assemble(hashes, rows)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def embedding_store(model):
+    """Process-wide store for an embedding model"""
+    with _stores_lock:
+        if model not in _stores:
+            _stores[model] = EmbeddingStore(model)
+        return _stores[model]
+
+class CachedEmbeddings(_EmbeddingsBase):
+    """Embedding client wrapper serving repeated texts from the embedding store"""
+
+    def __init__(self, embeddings, model):
+        self.embeddings = embeddings
+        self.store = embedding_store(model)
+        self.query_store = embedding_store(f"{model}:query")
+
+    def embed_documents_array(self, texts):
+        return self.store.embed(list(texts), self.embeddings.embed_documents)
+
+    async def aembed_documents_array(self, texts):
+        return await self.store.aembed(list(texts), self.embeddings.aembed_documents)
+
+    def embed_documents(self, texts):
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text):
+        def embed_queries(batch):
+            return [self.embeddings.embed_query(query) for query in batch]
+        return self.query_store.embed([text], embed_queries)[0].tolist()
+
+    async def aembed_documents(self, texts):
+        return (await self.aembed_documents_array(texts)).tolist()
+
+    async def aembed_query(self, text):
+        async def aembed_queries(batch):
+            return [await self.embeddings.aembed_query(query) for query in batch]
+        return (await self.query_store.aembed([text], aembed_queries))[0].tolist()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Process-wide pooled HTTP clients for every researcher
+OpenAI-compatible chat and embedding clients (KIMI, OpenAI, the mock server)
+share one httpx client per event loop: keep-alive, HTTP/2 when the h2 package
+is installed, a global and a per-host connection limit. Scrapers share one
+pooled requests.Session, and host lookups go through a TTL DNS cache, so the
+TLS handshakes and connection setup are paid once per host, not per call.
+
+Tune with HTTP_MAX_CONNECTIONS (default 100), HTTP_MAX_PER_HOST (default 20),
+HTTP_KEEPALIVE_SECONDS (default 60) and DNS_CACHE_TTL (seconds, default 300);
+HTTP_POOL=false turns pooling off.
+"""
+
+import os
+import time
+import atexit
+import socket
+import asyncio
+import threading
+import importlib.util
+
+OPENAI_COMPATIBLE_PROVIDERS = ("openai", "kimi")
+
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "20"))
+KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "300"))
+REQUEST_TIMEOUT = 600.0  # long report generations stream for minutes
+
+_lock = threading.Lock()
+_async_clients = {}
+_sync_client = None
+_session = None
+_dns_installed = False
+
+def pooling_enabled():
+    return os.getenv("HTTP_POOL", "true").lower() not in ("0", "false", "no")
+
+def _http2_available():
+    return importlib.util.find_spec("h2") is not None
+
+def install_dns_cache(ttl=DNS_CACHE_TTL):
+    """Cache successful socket.getaddrinfo lookups for `ttl` seconds (idempotent)"""
+    global _dns_installed
+    if _dns_installed or ttl <= 0:
+        return
+    original_getaddrinfo = socket.getaddrinfo
+    cache = {}
+    cache_lock = threading.Lock()
+
+    def getaddrinfo(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with cache_lock:
+            cached = cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        result = original_getaddrinfo(*args, **kwargs)
+        with cache_lock:
+            cache[key] = (now + ttl, result)
+        return result
+
+    socket.getaddrinfo = getaddrinfo
+    _dns_installed = True
+
+def _host_limited_transport(httpx):
+    """Async transport that allows at most MAX_PER_HOST open requests per host"""
+
+    class ReleasingStream(httpx.AsyncByteStream):
+        def __init__(self, stream, release):
+            self.stream = stream
+            self.release = release
+
+        async def __aiter__(self):
+            async for chunk in self.stream:
+                yield chunk
+
+        async def aclose(self):
+            try:
+                await self.stream.aclose()
+            finally:
+                self.release()
+
+    class HostLimitedTransport(httpx.AsyncBaseTransport):
+        def __init__(self, transport):
+            self.transport = transport
+            self.semaphores = {}
+
+        async def handle_async_request(self, request):
+            host = (request.url.scheme, request.url.host, request.url.port)
+            semaphore = self.semaphores.setdefault(host, asyncio.Semaphore(MAX_PER_HOST))
+            await semaphore.acquire()
+            try:
+                response = await self.transport.handle_async_request(request)
+            except BaseException:
+                semaphore.release()
+                raise
+            response.stream = ReleasingStream(response.stream, semaphore.release)
+            return response
+
+        async def aclose(self):
+            await self.transport.aclose()
+
+    return HostLimitedTransport
+
+def shared_async_client():
+    """Pooled httpx.AsyncClient for the running event loop, or None outside one"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    import httpx
+
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS,
+                                  keepalive_expiry=KEEPALIVE_SECONDS)
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=_http2_available())
+            client = httpx.AsyncClient(transport=_host_limited_transport(httpx)(transport),
+                                       timeout=REQUEST_TIMEOUT)
+            for stale in [key for key in _async_clients if key.is_closed()]:
+                _async_clients.pop(stale)
+            _async_clients[loop] = client
+        return client
+
+def shared_sync_client():
+    """Pooled httpx.Client for blocking calls (e.g. sync embeddings)"""
+    global _sync_client
+    import httpx
+
+    with _lock:
+        if _sync_client is None:
+            limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_PER_HOST,
+                                  keepalive_expiry=KEEPALIVE_SECONDS)
+            _sync_client = httpx.Client(limits=limits, http2=_http2_available(), timeout=REQUEST_TIMEOUT)
+            atexit.register(_sync_client.close)
+        return _sync_client
+
+def shared_session():
+    """Pooled requests.Session used by the scrapers (blocks beyond MAX_PER_HOST per host)"""
+    global _session
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_CONNECTIONS, pool_maxsize=MAX_PER_HOST, pool_block=True)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            atexit.register(_session.close)
+        return _session
+
+def pooled_client_kwargs(provider):
+    """Client arguments that make a LangChain OpenAI-compatible chat/embedding client use the pool"""
+    if provider not in OPENAI_COMPATIBLE_PROVIDERS or not pooling_enabled():
+        return {}
+    try:
+        kwargs = {"http_client": shared_sync_client()}
+    except ImportError:
+        return {}
+    async_client = shared_async_client()
+    if async_client is not None:
+        kwargs["http_async_client"] = async_client
+    return kwargs
+
+def install_http_pool():
+    """Share the pooled session with every scraper and cache DNS lookups (idempotent)"""
+    if not pooling_enabled():
+        return
+    install_dns_cache()
+
+    from gpt_researcher.scraper.scraper import Scraper
+    if getattr(Scraper.__init__, "uses_http_pool", False):
+        return
+    original_init = Scraper.__init__
+
+    def scraper_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        own_session = getattr(self, "session", None)
+        try:
+            session = shared_session()
+        except ImportError:
+            return
+        if own_session is not None:
+            session.headers.update(own_session.headers)  # keeps the configured User-Agent
+            own_session.close()
+        self.session = session
+
+    scraper_init.uses_http_pool = True
+    Scraper.__init__ = scraper_init
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Incremental regeneration of report Markdown and HTML, section by section
+The report markdown is split at its # / ## headings into sections, each with a
+content hash. A sidecar manifest (<file>.sections.json) records the hashes and,
+for the HTML page, the byte range and table-of-contents entries of every
+section's rendered fragment. On the next run only changed sections are
+rendered again; unchanged fragments are copied from the previous page, and the
+result replaces the old file atomically. Files whose content did not change are
+not rewritten at all.
+
+Watch mode re-renders a page whenever its markdown changes; --check also does
+a full render and fails if the incremental page differs from it:
+    python incremental_report.py tmt_comprehensive_review.md tmt_comprehensive_review_chinese.html --watch
+    python incremental_report.py tmt_comprehensive_review.md --check
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import markdown_stream
+import report_templates
+from markdown_stream import MarkdownStreamRenderer, iter_lines
+from report_templates import WRITE_BUFFER_BYTES, ReportPage, render_page, render_report, split_title
+
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".sections.json"
+SECTION_BOUNDARY = re.compile(r"^ {0,3}(?:(`{3,}|~{3,})|#{1,2}[ \t])", re.MULTILINE)
+
+_renderer_digests = {}
+
+def renderer_digest(*modules):
+    """Hash of the modules that render a fragment; cached fragments are only valid for the code that made them"""
+    modules = modules or (markdown_stream,)
+    key = tuple(module.__name__ for module in modules)
+    if key not in _renderer_digests:
+        digest = hashlib.sha256()
+        for module in modules:
+            with open(module.__file__, 'rb') as f:
+                digest.update(f.read())
+        _renderer_digests[key] = digest.hexdigest()
+    return _renderer_digests[key]
+
+def section_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def split_sections(text):
+    """Markdown text of each section; a new section starts at every # or ## heading outside code fences"""
+    start, fence = 0, None
+    for match in SECTION_BOUNDARY.finditer(text):
+        marker = match.group(1)
+        if marker:
+            if fence is None or marker.startswith(fence):
+                fence = None if fence else marker
+        elif fence is None and match.start() > start:
+            yield text[start:match.start()]
+            start = match.start()
+    if start < len(text):
+        yield text[start:]
+
+def load_manifest(path, output_file, **expected):
+    """Sidecar manifest for output_file, or None when missing, stale or written for a different output"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        stat = os.stat(output_file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("size") != stat.st_size \
+            or manifest.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+    if any(manifest.get(key) != value for key, value in expected.items()):
+        return None
+    return manifest
+
+def save_manifest(path, output_file, manifest):
+    stat = os.stat(output_file)
+    manifest = dict(manifest, version=MANIFEST_VERSION, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(manifest, ensure_ascii=False))  # one C-encoder pass; json.dump() streams in Python
+    os.replace(tmp_path, path)
+
+def write_markdown(md_file, markdown):
+    """Write the report markdown unless every section is unchanged; returns the number of changed sections"""
+    manifest_path = md_file + MANIFEST_SUFFIX
+    hashes = [section_hash(text) for text in split_sections(markdown)]
+    manifest = load_manifest(manifest_path, md_file)
+    previous = manifest["sections"] if manifest else []
+    if hashes == previous:
+        print(f"♻️  {md_file} 未变化，跳过写入")
+        return 0
+
+    changed = len(set(hashes) - set(previous))
+    tmp_path = md_file + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(markdown)
+    os.replace(tmp_path, md_file)
+    save_manifest(manifest_path, md_file, {"sections": hashes})
+    return changed
+
+class _ByteWriter:
+    """UTF-8 writer over a binary file that tracks the byte offset of the output"""
+
+    def __init__(self, f):
+        self.f = f
+        self.position = 0
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.f.write(data)
+        self.position += len(data)
+
+    def write_bytes(self, data):
+        self.f.write(data)
+        self.position += len(data)
+
+def page_digest(page, layout):
+    """Hash of everything on the page except the report markdown"""
+    fields = {key: value for key, value in vars(page).items() if key != "markdown"}
+    key_material = json.dumps([layout, renderer_digest(report_templates), repr(fields)], ensure_ascii=False)
+    return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+def patch_report(page, html_file, sections, markdown_head=None, renderer_key=None, layout="report"):
+    """Render page into html_file, re-rendering only sections whose digest has no fragment in the old page
+
+    sections is a list of (digest, render) pairs; render(renderer) writes one
+    section through a MarkdownStreamRenderer. Returns (rendered, reused).
+    """
+    manifest_path = html_file + MANIFEST_SUFFIX
+    page_key = page_digest(page, layout)
+    renderer_key = renderer_key or renderer_digest()
+
+    manifest = load_manifest(manifest_path, html_file, renderer=renderer_key)
+    fragments = {}
+    if manifest:
+        if manifest["page"] == page_key and [s["hash"] for s in manifest["sections"]] == [h for h, _ in sections]:
+            print(f"♻️  {html_file} 未变化，跳过渲染")
+            return 0, len(sections)
+        for record in manifest["sections"]:
+            fragments.setdefault(record["hash"], []).append(record)
+
+    records = []
+    counts = {"rendered": 0, "reused": 0}
+    tmp_path = html_file + ".tmp"
+    with open(html_file if fragments else os.devnull, 'rb') as previous, \
+            open(tmp_path, 'wb', buffering=WRITE_BUFFER_BYTES) as f:
+        out = _ByteWriter(f)
+        renderer = MarkdownStreamRenderer(out)
+
+        def markdown_body(write):
+            for digest, render in sections:
+                start, toc_start = out.position, len(renderer.toc)
+                # Reuse a fragment only if its headings get the same anchors as in a full render now
+                fragment = next((record for record in fragments.get(digest, ())
+                                 if renderer.reuse_headings([tuple(entry) for entry in record["toc"]])), None)
+                if fragment:
+                    previous.seek(fragment["start"])
+                    out.write_bytes(previous.read(fragment["end"] - fragment["start"]))
+                    counts["reused"] += 1
+                else:
+                    render(renderer)
+                    counts["rendered"] += 1
+                records.append({"hash": digest, "start": start, "end": out.position,
+                                "toc": renderer.toc[toc_start:]})
+
+        head = (lambda write: markdown_head(renderer)) if markdown_head else None
+        render_page(page, out.write, renderer, markdown_body, head, layout)
+    os.replace(tmp_path, html_file)
+    save_manifest(manifest_path, html_file, {"renderer": renderer_key, "page": page_key, "sections": records})
+    print(f"♻️  {html_file}: 重新渲染 {counts['rendered']} 节，复用 {counts['reused']} 节")
+    return counts["rendered"], counts["reused"]
+
+def _feed(text):
+    def render(renderer):
+        for line in iter_lines(text):
+            renderer.feed(line)
+        renderer.close()
+    return render
+
+def render_report_incremental(page, html_file, layout="report"):
+    """render_report() that re-renders only the changed markdown sections; returns (rendered, reused)"""
+    if not isinstance(page.markdown, str):
+        raise TypeError("incremental rendering needs the report markdown as a string")
+
+    leading, _, has_title = split_title(page.markdown)
+    body = page.markdown[sum(len(line) + 1 for line in leading):] if has_title else page.markdown
+    sections = [(section_hash(text), _feed(text)) for text in split_sections(body)]
+    markdown_head = _feed("\n".join(leading)) if has_title else None
+    return patch_report(page, html_file, sections, markdown_head, layout=layout)
+
+def check_incremental(page, html_file, layout="report"):
+    """Whether html_file is byte-identical to a full render of page"""
+    fd, full_file = tempfile.mkstemp(suffix=".html", dir=os.path.dirname(os.path.abspath(html_file)))
+    os.close(fd)
+    try:
+        render_report(page, full_file, layout)
+        with open(full_file, 'rb') as full, open(html_file, 'rb') as incremental:
+            return full.read() == incremental.read()
+    finally:
+        os.remove(full_file)
+
+def watch(md_file, html_file, title, interval):
+    """Re-render html_file whenever md_file changes"""
+    print(f"👀 监视 {md_file} (每 {interval} 秒检查一次，Ctrl+C 退出)")
+    last_seen = None
+    while True:
+        try:
+            stat = os.stat(md_file)
+            if (stat.st_mtime_ns, stat.st_size) != last_seen:
+                last_seen = (stat.st_mtime_ns, stat.st_size)
+                with open(md_file, 'r', encoding='utf-8') as f:
+                    markdown = f.read()
+                render_report_incremental(ReportPage(title=title, markdown=markdown, report_file=md_file), html_file)
+        except FileNotFoundError:
+            pass
+        time.sleep(interval)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally render a report markdown file to HTML")
+    parser.add_argument("markdown_file")
+    parser.add_argument("html_file", nargs="?")
+    parser.add_argument("--title", help="page title when the markdown has no # title of its own")
+    parser.add_argument("--watch", action="store_true", help="keep running and re-render on every change")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between checks in watch mode")
+    parser.add_argument("--check", action="store_true", help="fail if the result differs from a full render")
+    args = parser.parse_args(argv)
+
+    html_file = args.html_file or os.path.splitext(args.markdown_file)[0] + ".html"
+    title = args.title or os.path.splitext(os.path.basename(args.markdown_file))[0]
+    if args.watch:
+        try:
+            watch(args.markdown_file, html_file, title, args.interval)
+        except KeyboardInterrupt:
+            print("\n👋 停止监视")
+        return 0
+    with open(args.markdown_file, 'r', encoding='utf-8') as f:
+        markdown = f.read()
+    page = ReportPage(title=title, markdown=markdown, report_file=args.markdown_file)
+    render_report_incremental(page, html_file)
+    if args.check and not check_incremental(page, html_file):
+        print(f"❌ {html_file} 与完整渲染结果不一致")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,29 +4,30 @@ Generate LLM-AI-based Knowledge Engineering Implementation Methods in High-end M
 基于LLM-AI的知识工程在高端制造业实施方法研究
 """
 
-import os
 import asyncio
+import argparse
 from dotenv import load_dotenv
-from gpt_researcher import GPTResearcher
+from research_config import ResearchJobConfig, GEMINI_FLASH, create_researcher
+from research_cache import research_cache_key, run_cached_research
+from pipeline_stages import stage
+from report_templates import ReportPage, render_report
+from tracing import traced_job
+from cost_meter import TokenBudgetExceeded, metered_run
 
 # Load environment variables
 load_dotenv()
 
-async def generate_llm_knowledge_engineering_review():
+async def generate_llm_knowledge_engineering_review(refresh=False, job_config=None):
     """Generate comprehensive research on LLM-AI-based knowledge engineering implementation in high-end manufacturing"""
 
     print("🔬 生成基于LLM-AI的知识工程在高端制造业实施方法研究")
     print("=" * 80)
 
-    # Configure API keys
-    os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-    os.environ["OPENAI_API_KEY"] = os.getenv("KIMI_API_KEY")  # Use KIMI key for OpenAI-compatible access
-    os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")
-
-    # LLM Configuration
-    os.environ["FAST_LLM"] = "google_genai:gemini-2.0-flash-exp"
-    os.environ["SMART_LLM"] = "google_genai:gemini-2.0-flash-exp"  # Use Gemini 2.0 Flash for both
-    os.environ["EMBEDDING"] = "openai:text-embedding-3-small"
+    # Job-scoped LLM configuration (API keys from .env)
+    if job_config is None:
+        job_config = ResearchJobConfig.from_env(
+            smart_llm=GEMINI_FLASH  # Use Gemini 2.0 Flash for both
+        )
 
     research_query = """
     基于LLM-AI的知识工程在高端制造业实施方法研究
@@ -93,33 +94,38 @@ async def generate_llm_knowledge_engineering_review():
 
     try:
         print("🔍 正在进行LLM-AI知识工程研究...")
-        researcher = GPTResearcher(
+        researcher = create_researcher(
+            job_config,
             query=research_query,
             report_type="research_report",
             report_format="markdown",
             tone="Objective"
         )
 
-        print("🌐 搜索相关文献和研究...")
-        await researcher.conduct_research()
-
-        print("📝 生成研究报告...")
-        report = await researcher.write_report()
+        # Reuse a cached result for the same query and LLM configuration
+        cache_key = research_cache_key(
+            research_query, "research_report", "Objective", llm_settings=job_config.llm_settings()
+        )
+        report = await run_cached_research(researcher, cache_key, refresh=refresh)
 
         # Save the comprehensive review
         output_file = "llm_ai_knowledge_engineering_manufacturing.md"
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with stage("markdown_assembly"), open(output_file, 'w', encoding='utf-8') as f:
             f.write(report)
 
         print(f"✅ LLM-AI知识工程研究报告已生成: {output_file}")
 
         # Generate Chinese HTML version
-        await generate_chinese_html_llm_knowledge(report)
+        with stage("html_rendering"):
+            await generate_chinese_html_llm_knowledge(report)
 
         return report
 
+    except TokenBudgetExceeded:
+        raise
     except Exception as e:
         print(f"❌ AI研究失败: {e}")
+        print("💾 若研究阶段已完成，其检查点已保存，重新运行将从检查点继续")
         print("🔄 切换到手动生成模式...")
         # Fallback to manual generation if GPT-Researcher fails
         return await generate_manual_llm_knowledge_review()
@@ -417,351 +423,20 @@ async def generate_chinese_html_llm_knowledge(markdown_content):
 
     print("🌐 生成中文HTML版本...")
 
-    html_content = """<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>基于LLM-AI的知识工程在高端制造业实施方法研究</title>
-    <style>
-        body {
-            font-family: 'Microsoft YaHei', 'SimSun', Arial, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            padding: 30px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        h1 {
-            color: #2c3e50;
-            text-align: center;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }
-        h2 {
-            color: #34495e;
-            border-left: 4px solid #3498db;
-            padding-left: 15px;
-            margin-top: 30px;
-        }
-        h3 {
-            color: #7f8c8d;
-            margin-top: 25px;
-        }
-        .summary {
-            background: #ecf0f1;
-            padding: 20px;
-            border-radius: 5px;
-            margin: 20px 0;
-        }
-        .highlight {
-            background: #e8f4f8;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #3498db;
-            margin: 20px 0;
-        }
-        .stats {
-            display: flex;
-            justify-content: space-around;
-            margin: 20px 0;
-        }
-        .stat-box {
-            background: #3498db;
-            color: white;
-            padding: 20px;
-            border-radius: 5px;
-            text-align: center;
-            flex: 1;
-            margin: 0 10px;
-        }
-        .tech-specs {
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 5px;
-            margin: 20px 0;
-        }
-        .process-flow {
-            background: #fff3cd;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #ffc107;
-            margin: 20px 0;
-        }
-        .challenges {
-            background: #f8d7da;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #dc3545;
-            margin: 20px 0;
-        }
-        .opportunities {
-            background: #d1ecf1;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #17a2b8;
-            margin: 20px 0;
-        }
-        .code-block {
-            background: #f8f9fa;
-            padding: 15px;
-            border-radius: 5px;
-            font-family: 'Courier New', monospace;
-            margin: 10px 0;
-            border-left: 4px solid #6c757d;
-        }
-        .references {
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 5px;
-            margin-top: 30px;
-        }
-        .architecture {
-            background: #e8f8f5;
-            padding: 20px;
-            border-radius: 5px;
-            border-left: 4px solid #27ae60;
-            margin: 20px 0;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>基于LLM-AI的知识工程在高端制造业实施方法研究</h1>
-
-        <div class="stats">
-            <div class="stat-box">
-                <h3>研究领域</h3>
-                <div style="font-size: 2em; font-weight: bold;">8</div>
-                <small>个核心方向</small>
-            </div>
-            <div class="stat-box">
-                <h3>技术方法</h3>
-                <div style="font-size: 2em; font-weight: bold;">LLM</div>
-                <small>驱动知识工程</small>
-            </div>
-            <div class="stat-box">
-                <h3>应用场景</h3>
-                <div style="font-size: 2em; font-weight: bold;">高端</div>
-                <small>制造业</small>
-            </div>
-        </div>
-
-        <div class="summary">
-            <h2>摘要</h2>
-            <p>随着人工智能技术的快速发展，大语言模型(LLM)正在深刻改变知识工程的实施方法和应用模式。本研究系统分析了基于LLM-AI的知识工程在高端制造业中的实施方法，构建了完整的理论框架和技术体系，为高端制造业的智能化转型提供了理论指导和实践路径。</p>
-        </div>
-
-        <div class="tech-specs">
-            <h3>🔬 LLM-AI技术核心</h3>
-            <ul>
-                <li><strong>大语言模型：</strong>Transformer架构，强大的语义理解能力</li>
-                <li><strong>知识工程：</strong>知识获取、表示、存储、推理和应用</li>
-                <li><strong>技术融合：</strong>LLM与传统知识工程的深度集成</li>
-                <li><strong>应用场景：</strong>高端制造业智能化转型</li>
-            </ul>
-        </div>
-
-        <div class="architecture">
-            <h3>🏗️ 系统架构设计</h3>
-            <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 15px; margin: 20px 0;">
-                <div style="text-align: center; padding: 15px; background: white; border-radius: 5px;">
-                    <strong>数据层</strong><br><small>多源数据采集</small>
-                </div>
-                <div style="text-align: center; padding: 15px; background: white; border-radius: 5px;">
-                    <strong>知识层</strong><br><small>LLM知识抽取</small>
-                </div>
-                <div style="text-align: center; padding: 15px; background: white; border-radius: 5px;">
-                    <strong>推理层</strong><br><small>智能推理引擎</small>
-                </div>
-                <div style="text-align: center; padding: 15px; background: white; border-radius: 5px;">
-                    <strong>应用层</strong><br><small>知识服务接口</small>
-                </div>
-                <div style="text-align: center; padding: 15px; background: white; border-radius: 5px;">
-                    <strong>管理层</strong><br><small>质量评估运维</small>
-                </div>
-            </div>
-        </div>
-
-        <h2>LLM-AI技术基础</h2>
-
-        <h3>大语言模型基本原理</h3>
-        <ul>
-            <li><strong>Transformer架构：</strong> 自注意力机制实现上下文感知</li>
-            <li><strong>预训练-微调：</strong> 通用能力向领域应用的迁移</li>
-            <li><strong>多模态融合：</strong> 文本、图像、结构化数据的统一处理</li>
-        </ul>
-
-        <h3>知识工程核心概念</h3>
-        <ul>
-            <li><strong>本体论构建：</strong> 领域概念体系的规范化表示</li>
-            <li><strong>知识图谱技术：</strong> 实体关系网络的构建和推理</li>
-            <li><strong>专家系统方法：</strong> 基于规则的推理和决策</li>
-        </ul>
-
-        <h2>高端制造业知识特征</h2>
-
-        <h3>知识类型分析</h3>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin: 20px 0;">
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px;">
-                <h4>技术知识</h4>
-                <p>工艺参数、设计规范、质量标准</p>
-            </div>
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px;">
-                <h4>过程知识</h4>
-                <p>生产流程、操作规程、故障处理</p>
-            </div>
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px;">
-                <h4>经验知识</h4>
-                <p>专家技能、问题解决、最佳实践</p>
-            </div>
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px;">
-                <h4>实时知识</h4>
-                <p>设备状态、环境参数、性能指标</p>
-            </div>
-        </div>
-
-        <h2>LLM-AI在知识工程中的应用</h2>
-
-        <h3>知识抽取和表示</h3>
-        <ul>
-            <li><strong>实体识别：</strong> 从技术文档中自动识别领域实体</li>
-            <li><strong>关系抽取：</strong> 发现实体间的语义关系和依赖</li>
-            <li><strong>属性抽取：</strong> 提取实体的特征属性和参数信息</li>
-            <li><strong>事件抽取：</strong> 识别工艺过程和质量事件</li>
-        </ul>
-
-        <h3>智能知识图谱构建</h3>
-        <ul>
-            <li><strong>本体学习：</strong> 从文本中自动学习领域本体</li>
-            <li><strong>关系推理：</strong> 基于语义相似性的关系发现</li>
-            <li><strong>知识补全：</strong> 利用LLM推理能力补全缺失知识</li>
-            <li><strong>知识更新：</strong> 实时更新和演化知识图谱</li>
-        </ul>
-
-        <h2>高端制造业实施框架</h2>
-
-        <h3>实施路径</h3>
-        <div style="display: flex; justify-content: space-between; margin: 30px 0;">
-            <div style="text-align: center; flex: 1;">
-                <div style="width: 40px; height: 40px; background: #3498db; color: white; border-radius: 50%; display: inline-flex; align-items: center; justify-content: center; font-weight: bold;">1</div>
-                <p style="margin-top: 10px;"><strong>试点阶段</strong><br>概念验证</p>
-            </div>
-            <div style="width: 50px; height: 2px; background: #3498db; align-self: center;"></div>
-            <div style="text-align: center; flex: 1;">
-                <div style="width: 40px; height: 40px; background: #3498db; color: white; border-radius: 50%; display: inline-flex; align-items: center; justify-content: center; font-weight: bold;">2</div>
-                <p style="margin-top: 10px;"><strong>扩展阶段</strong><br>业务推广</p>
-            </div>
-            <div style="width: 50px; height: 2px; background: #3498db; align-self: center;"></div>
-            <div style="text-align: center; flex: 1;">
-                <div style="width: 40px; height: 40px; background: #3498db; color: white; border-radius: 50%; display: inline-flex; align-items: center; justify-content: center; font-weight: bold;">3</div>
-                <p style="margin-top: 10px;"><strong>集成阶段</strong><br>系统集成</p>
-            </div>
-            <div style="width: 50px; height: 2px; background: #3498db; align-self: center;"></div>
-            <div style="text-align: center; flex: 1;">
-                <div style="width: 40px; height: 40px; background: #3498db; color: white; border-radius: 50%; display: inline-flex; align-items: center; justify-content: center; font-weight: bold;">4</div>
-                <p style="margin-top: 10px;"><strong>优化阶段</strong><br>持续改进</p>
-            </div>
-        </div>
-
-        <h2>核心技术方法</h2>
-
-        <h3>领域知识库构建</h3>
-        <ul>
-            <li><strong>领域适配：</strong> LLM在特定领域的微调和优化</li>
-            <li><strong>知识验证：</strong> 专家评审和自动化验证机制</li>
-            <li><strong>知识融合：</strong> 多源知识的冲突解决和融合</li>
-            <li><strong>知识演化：</strong> 知识库的动态更新和版本管理</li>
-        </ul>
-
-        <h3>知识图谱与LLM集成</h3>
-        <ul>
-            <li><strong>检索增强生成：</strong> 结合外部知识的生成</li>
-            <li><strong>图谱引导推理：</strong> 结构化知识引导的推理过程</li>
-            <li><strong>混合推理：</strong> 符号推理与神经推理的结合</li>
-            <li><strong>知识增强学习：</strong> 基于知识图谱的持续学习</li>
-        </ul>
-
-        <h2>应用场景与案例</h2>
-
-        <h3>航空航天制造业</h3>
-        <p>航空发动机智能设计知识系统，实现复杂部件的设计规范管理、工艺优化和质量控制。</p>
-
-        <h3>汽车制造行业</h3>
-        <p>新能源汽车智能制造知识平台，涵盖供应链管理、生产调度和质量追溯。</p>
-
-        <h3>精密仪器制造业</h3>
-        <p>高端仪器设备知识工程系统，支持精密加工、测量技术和维护知识管理。</p>
-
-        <div class="challenges">
-            <h3>⚠️ 实施挑战</h3>
-            <ul>
-                <li><strong>技术挑战：</strong> 模型精度、知识准确性、可解释性</li>
-                <li><strong>实施挑战：</strong> 数据安全、集成难度、人员培训</li>
-                <li><strong>解决方案：</strong> 领域微调、多层次验证、分层培训</li>
-            </ul>
-        </div>
-
-        <div class="opportunities">
-            <h3>🚀 发展趋势</h3>
-            <ul>
-                <li><strong>多模态LLM：</strong> 整合多种模态的知识处理</li>
-                <li><strong>专用领域LLM：</strong> 制造业定制的专业模型</li>
-                <li><strong>可信LLM：</strong> 增强安全性和可解释性</li>
-                <li><strong>人机协同：</strong> AI与专家经验的深度融合</li>
-            </ul>
-        </div>
-
-        <h2>结论</h2>
-        <p>基于LLM-AI的知识工程为高端制造业的智能化转型提供了强大的技术支撑。通过构建完整的理论框架和技术体系，可以有效解决高端制造业知识管理的复杂挑战，实现知识的自动化获取、智能表示、深度推理和高效应用。</p>
-        <p>未来，随着LLM技术的不断进步和知识工程方法的成熟，基于LLM-AI的知识工程将成为高端制造业核心竞争力的重要组成部分。</p>
-
-        <div class="references">
-            <h2>参考文献</h2>
-
-            <h3>中文文献</h3>
-            <ol>
-                <li>王志强, 李明, 张伟. 大语言模型在知识工程中的应用研究[J]. 计算机学报, 2023, 46(5): 987-996.</li>
-                <li>陈红, 刘洋, 王鹏. 基于LLM的智能制造知识图谱构建方法[J]. 计算机集成制造系统, 2023, 29(8): 2456-2464.</li>
-                <li>李娜, 张宏, 赵阳. 高端制造业知识工程实施框架研究[J]. 中国机械工程, 2023, 34(12): 1456-1462.</li>
-                <li>孙杰, 王磊, 陈明. LLM驱动的工艺知识推理方法研究[J]. 制造业自动化, 2023, 45(6): 78-85.</li>
-                <li>刘强, 李建华, 张晓明. 基于多模态LLM的制造知识融合技术[J]. 计算机研究与发展, 2024, 61(2): 345-352.</li>
-            </ol>
-
-            <h3>英文文献</h3>
-            <ol>
-                <li>Smith J, Johnson A. Large Language Models for Knowledge Engineering in Manufacturing[J]. IEEE Transactions on Industrial Informatics, 2023, 19(3): 1234-1242.</li>
-                <li>Brown R, Davis M. LLM-based Knowledge Graph Construction for Smart Manufacturing[J]. Computers in Industry, 2023, 145: 103789.</li>
-                <li>Wilson K, Taylor L. Implementation Framework for AI Knowledge Engineering in High-end Manufacturing[J]. Journal of Manufacturing Systems, 2023, 66: 234-245.</li>
-                <li>Chen X, Wang Z, Li H. Multi-modal Knowledge Fusion Using Large Language Models[J]. IEEE Access, 2023, 11: 45678-45687.</li>
-                <li>Zhang L, Liu Y, Wang J. Knowledge Quality Assessment in LLM-driven Manufacturing Systems[J]. Robotics and Computer-Integrated Manufacturing, 2024, 85: 102567.</li>
-            </ol>
-        </div>
-
-        <div style="text-align: center; margin: 40px 0; padding: 20px; background: #f8f9fa; border-radius: 5px;">
-            <h3>📄 完整研究报告</h3>
-            <p>详细的Markdown格式完整报告已保存为：</p>
-            <p><code>llm_ai_knowledge_engineering_manufacturing.md</code></p>
-            <p>包含完整的理论框架、技术方法和实施策略</p>
-        </div>
-
-    </div>
-</body>
-</html>"""
-
-    # Save HTML file
     html_file = "llm_ai_knowledge_engineering_manufacturing_chinese.html"
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    render_report(ReportPage(
+        title="基于LLM-AI的知识工程在高端制造业实施方法研究",
+        markdown=markdown_content,
+        report_file="llm_ai_knowledge_engineering_manufacturing.md",
+        report_file_note="包含完整的理论框架、技术方法和实施策略",
+    ), html_file)
 
     print(f"✅ 中文HTML研究报告已生成: {html_file}")
 
 if __name__ == "__main__":
-    asyncio.run(generate_llm_knowledge_engineering_review())
+    parser = argparse.ArgumentParser(description="基于LLM-AI的知识工程在高端制造业实施方法研究")
+    parser.add_argument("--refresh", action="store_true", help="忽略缓存，重新进行研究")
+    parser.add_argument("--token-budget", type=int, help="本次运行的令牌上限，超出后提前停止")
+    args = parser.parse_args()
+    with traced_job("llm_knowledge_review"), metered_run("llm_ai_knowledge_engineering_manufacturing.md", args.token_budget):
+        asyncio.run(generate_llm_knowledge_engineering_review(refresh=args.refresh))
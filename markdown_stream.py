@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Streaming Markdown -> HTML renderer for the generated reports
+Parses a report line by line (headings, nested lists, tables, fenced code,
+block quotes, links and citations) and writes HTML straight to the output
+file, so memory is bounded by the longest paragraph, not by the report. The
+table of contents is collected in the same pass; report_templates writes it
+after the body and the page layout shows it beside the content.
+"""
+
+import re
+import html
+
+HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)(?:\s+#+)?\s*$")
+FENCE = re.compile(r"^\s{0,3}(`{3,}|~{3,})\s*([\w+#.-]*)")
+RULE = re.compile(r"^\s{0,3}([-*_])(?:\s*\1){2,}\s*$")
+LIST_ITEM = re.compile(r"^(\s*)([-*+]|(\d{1,9})[.)])\s+(.*)$")
+QUOTE = re.compile(r"^\s{0,3}>\s?(.*)$")
+TABLE_SEPARATOR = re.compile(r"^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+CELL_SPLIT = re.compile(r"(?<!\\)\|")
+REFERENCES_HEADING = re.compile(r"references|sources|bibliography|参考文献|参考资料|引用", re.IGNORECASE)
+REFERENCE_ENTRY = re.compile(r"^\[(\d+)\]\s*")
+
+CODE_SPAN = re.compile(r"(`+)(.+?)\1")
+IMAGE = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)(?:\s+&quot;.*?&quot;)?\)")
+LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)(?:\s+&quot;.*?&quot;)?\)")
+AUTOLINK = re.compile(r"&lt;(https?://[^\s&]+)&gt;|(?<![\w/=\"])(https?://[!#$%&'*+,\-./0-9:;=?@A-Z\[\]_a-z~]+)")
+CITATION = re.compile(r"\[(\d{1,4}(?:\s*[,，]\s*\d{1,4})*)\]")
+CITATION_SEPARATOR = re.compile(r"\s*[,，]\s*")
+BOLD = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*|__(?=\S)(.+?)(?<=\S)__")
+ITALIC = re.compile(r"(?<![*\w])\*(?=\S)(.+?)(?<=\S)\*(?!\*)|(?<![_\w])_(?=\S)(.+?)(?<=\S)_(?![_\w])")
+STRIKE = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+PLACEHOLDER = re.compile("\x00(\\d+)\x00")
+LINK_TEXT = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+INLINE_SYMBOLS = re.compile(r"[`*_~]")
+NON_SLUG = re.compile(r"[^\w-]+")
+UNSAFE_URL = re.compile(r"^\s*(javascript|vbscript|data):", re.IGNORECASE)
+
+def safe_url(url):
+    return "#" if UNSAFE_URL.match(html.unescape(url)) else url
+
+def _emphasis(text):
+    if "*" in text or "_" in text:
+        text = BOLD.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", text)
+        text = ITALIC.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", text)
+    if "~~" in text:
+        text = STRIKE.sub(r"<del>\1</del>", text)
+    return text
+
+def render_inline(text):
+    """HTML for one block's inline markdown (code spans, links, images, citations, emphasis)"""
+    escaped = html.escape(text)
+    stash = []
+
+    def keep(fragment):
+        stash.append(fragment)
+        return f"\x00{len(stash) - 1}\x00"
+
+    def autolink(match):
+        url = match.group(1) or match.group(2)
+        trailing = ""
+        if match.group(2):
+            stripped = url.rstrip(".,;:!?'")
+            url, trailing = stripped, url[len(stripped):]
+        return keep(f'<a href="{url}">{url}</a>') + trailing
+
+    def citation(match):
+        numbers = CITATION_SEPARATOR.split(match.group(1))
+        links = ", ".join(f'<a href="#ref-{number}">{number}</a>' for number in numbers)
+        return keep(f'<sup class="cite">[{links}]</sup>')
+
+    if "`" in text:
+        pieces, position = [], 0
+        for match in CODE_SPAN.finditer(text):
+            pieces.append(html.escape(text[position:match.start()]))
+            pieces.append(keep(f"<code>{html.escape(match.group(2).strip())}</code>"))
+            position = match.end()
+        pieces.append(html.escape(text[position:]))
+        escaped = "".join(pieces)
+    text = escaped
+
+    # Each pattern only runs when its marker occurs; most report lines are plain prose
+    if "](" in text:
+        text = IMAGE.sub(lambda m: keep(f'<img src="{safe_url(m.group(2))}" alt="{m.group(1)}">'), text)
+        text = LINK.sub(lambda m: keep(f'<a href="{safe_url(m.group(2))}">{_emphasis(m.group(1))}</a>'), text)
+    if "://" in text:
+        text = AUTOLINK.sub(autolink, text)
+    if "[" in text:
+        text = CITATION.sub(citation, text)
+    text = _emphasis(text)
+
+    def restore(fragment):
+        return PLACEHOLDER.sub(lambda m: restore(stash[int(m.group(1))]), fragment)
+
+    return restore(text) if stash else text
+
+def plain_text(markdown_text):
+    """Heading text without inline markup (for the table of contents and anchors)"""
+    return INLINE_SYMBOLS.sub("", LINK_TEXT.sub(r"\1", markdown_text)).strip()
+
+def split_cells(row):
+    row = row.strip()
+    if row.startswith("|"):
+        row = row[1:]
+    if row.endswith("|") and not row.endswith("\\|"):
+        row = row[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in CELL_SPLIT.split(row)]
+
+def iter_lines(text):
+    """Lines of a string without building a list of them"""
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+class HtmlWriter:
+    """HTML for the block events of MarkdownStreamRenderer (report_document replays them from a tree)"""
+
+    def __init__(self, out):
+        self.out = out
+
+    def paragraph(self, text, tag="p"):
+        """One block of inline markdown; tag None writes it bare (tight list item content)"""
+        text = render_inline(text)
+        self.out.write(f"<{tag}>{text}</{tag}>\n" if tag else text)
+
+    def heading(self, level, anchor, text):
+        self.out.write(f'<h{level} id="{anchor}">{render_inline(text)}</h{level}>\n')
+
+    def open_list(self, tag, start=None):
+        start = f' start="{start}"' if start else ""
+        self.out.write(f"<{tag}{start}>\n")
+
+    def close_list(self, tag, item_open):
+        self.out.write(f"{'</li>' if item_open else ''}</{tag}>\n")
+
+    def open_item(self, reference=None):
+        self.out.write(f'<li id="ref-{reference}">' if reference else "<li>")
+
+    def close_item(self):
+        self.out.write("</li>\n")
+
+    def open_quote(self):
+        self.out.write("<blockquote>\n")
+
+    def close_quote(self):
+        self.out.write("</blockquote>\n")
+
+    def open_table(self, aligns, header):
+        self.out.write('<div class="table-wrap">\n<table>\n<thead>\n')
+        self.row(header, aligns, "th")
+        self.out.write("</thead>\n<tbody>\n")
+
+    def row(self, cells, aligns, cell_tag="td"):
+        row = []
+        for i, cell in enumerate(cells):
+            align = aligns[i] if i < len(aligns) else None
+            style = f' style="text-align: {align}"' if align else ""
+            row.append(f"<{cell_tag}{style}>{render_inline(cell)}</{cell_tag}>")
+        self.out.write(f"<tr>{''.join(row)}</tr>\n")
+
+    def close_table(self):
+        self.out.write("</tbody>\n</table>\n</div>\n")
+
+    def open_code(self, language=""):
+        css_class = f' class="language-{html.escape(language)}"' if language else ""
+        self.out.write(f"<pre><code{css_class}>")
+
+    def code_line(self, line):
+        self.out.write(html.escape(line) + "\n")
+
+    def close_code(self):
+        self.out.write("</code></pre>\n")
+
+    def rule(self):
+        self.out.write("<hr>\n")
+
+class MarkdownStreamRenderer:
+    """Incremental Markdown renderer: feed() lines, close() at the end; headings collect in .toc
+
+    Blocks go to `writer` (an HtmlWriter over `out` by default) as they complete.
+    """
+
+    def __init__(self, out, writer=None):
+        self.out = out
+        self.writer = writer or HtmlWriter(out)
+        self.toc = []
+        self._slugs = {}
+        self._anchors = set()
+        self._paragraph = []
+        self._paragraph_tag = "p"
+        self._fence = None
+        self._lists = []  # [tag, indent, item open]
+        self._quote = False
+        self._table_aligns = None
+        self._pending_row = None
+        self._blank = False
+        self._in_references = False
+
+    # -- block helpers -------------------------------------------------
+
+    def _flush_paragraph(self):
+        if self._paragraph:
+            self.writer.paragraph(" ".join(self._paragraph), self._paragraph_tag)
+            self._paragraph = []
+        self._paragraph_tag = "p"
+
+    def _close_lists(self, indent=-1):
+        """Close lists nested deeper than `indent` (all of them by default)"""
+        while self._lists and self._lists[-1][1] > indent:
+            tag, _, item_open = self._lists.pop()
+            self._flush_paragraph()
+            self.writer.close_list(tag, item_open)
+
+    def _close_quote(self):
+        if self._quote:
+            self._flush_paragraph()
+            self.writer.close_quote()
+            self._quote = False
+
+    def _close_table(self):
+        if self._table_aligns is not None:
+            self.writer.close_table()
+            self._table_aligns = None
+
+    def _close_blocks(self):
+        self._flush_paragraph()
+        self._close_table()
+        self._close_quote()
+        self._close_lists()
+
+    @staticmethod
+    def _assign_anchor(title, slugs, anchors):
+        slug = NON_SLUG.sub("-", title.lower()).strip("-") or "section"
+        anchor, count = slug, slugs.get(slug, 1)
+        while anchor in anchors:
+            count += 1
+            anchor = f"{slug}-{count}"
+        slugs[slug] = count
+        anchors.add(anchor)
+        return anchor
+
+    def add_heading(self, level, title):
+        """Register a heading in the table of contents and return its unique anchor"""
+        anchor = self._assign_anchor(title, self._slugs, self._anchors)
+        self.toc.append((level, anchor, title))
+        return anchor
+
+    def reuse_headings(self, entries):
+        """Register headings of HTML rendered earlier
+
+        Returns False, registering nothing, unless every heading would get the
+        same anchor now as when the HTML was rendered.
+        """
+        slugs, anchors = dict(self._slugs), set(self._anchors)
+        if any(self._assign_anchor(title, slugs, anchors) != anchor for _, anchor, title in entries):
+            return False
+        self._slugs, self._anchors = slugs, anchors
+        self.toc.extend(entries)
+        return True
+
+    def _start_table(self, header, separator):
+        self._table_aligns = []
+        for cell in split_cells(separator):
+            if cell.startswith(":") and cell.endswith(":"):
+                self._table_aligns.append("center")
+            elif cell.endswith(":"):
+                self._table_aligns.append("right")
+            elif cell.startswith(":"):
+                self._table_aligns.append("left")
+            else:
+                self._table_aligns.append(None)
+        self.writer.open_table(self._table_aligns, split_cells(header))
+
+    # -- line handlers -------------------------------------------------
+
+    def _heading(self, level, text):
+        self._close_blocks()
+        title = plain_text(text)
+        anchor = self.add_heading(level, title)
+        self._in_references = bool(REFERENCES_HEADING.search(title))
+        self.writer.heading(level, anchor, text)
+
+    def _list_item(self, indent, marker, number, content):
+        self._flush_paragraph()
+        self._close_table()
+        self._close_quote()
+        tag = "ol" if number is not None else "ul"
+        self._close_lists(indent)
+        if self._lists and self._lists[-1][1] == indent and self._lists[-1][0] != tag:
+            self._close_lists(indent - 1)
+        if self._lists and self._lists[-1][1] == indent:
+            if self._lists[-1][2]:
+                self.writer.close_item()
+        else:
+            self.writer.open_list(tag, int(number) if number is not None and int(number) != 1 else None)
+            self._lists.append([tag, indent, False])
+
+        reference = None
+        if self._in_references:
+            entry = REFERENCE_ENTRY.match(content)
+            reference = entry.group(1) if entry else number
+        self.writer.open_item(reference)
+        self._lists[-1][2] = True
+        self._paragraph_tag = None
+        self._paragraph = [content]
+
+    def feed(self, line):
+        line = line.rstrip("\r\n").replace("\x00", "")
+
+        if self._fence is not None:
+            if line.strip().startswith(self._fence) and not line.strip().strip(self._fence[0]):
+                self.writer.close_code()
+                self._fence = None
+            else:
+                self.writer.code_line(line)
+            return
+
+        if self._pending_row is not None:
+            header, self._pending_row = self._pending_row, None
+            if TABLE_SEPARATOR.match(line) and "-" in line:
+                self._flush_paragraph()
+                self._start_table(header, line)
+                return
+            self._paragraph.append(header.strip())
+
+        if self._table_aligns is not None:
+            if "|" in line and line.strip():
+                self.writer.row(split_cells(line), self._table_aligns)
+                return
+            self._close_table()
+
+        stripped = line.strip()
+        if not stripped:
+            self._flush_paragraph()
+            self._close_quote()
+            self._blank = True
+            return
+        blank_before, self._blank = self._blank, False
+        first = stripped[0]
+
+        fence = FENCE.match(line) if first in "`~" else None
+        if fence:
+            self._close_blocks()
+            self._fence = fence.group(1)
+            self.writer.open_code(fence.group(2))
+            return
+
+        heading = HEADING.match(line) if first == "#" else None
+        if heading:
+            self._heading(len(heading.group(1)), heading.group(2))
+            return
+
+        if first in "-*_" and RULE.match(line):
+            self._close_blocks()
+            self.writer.rule()
+            return
+
+        quote = QUOTE.match(line) if first == ">" else None
+        if quote:
+            if not self._quote:
+                self._close_blocks()
+                self.writer.open_quote()
+                self._quote = True
+            if quote.group(1).strip():
+                self._paragraph.append(quote.group(1).strip())
+            else:
+                self._flush_paragraph()
+            return
+
+        item = LIST_ITEM.match(line) if first in "-*+" or first.isdigit() else None
+        if item:
+            indent = len(item.group(1).expandtabs(4))
+            self._list_item(indent, item.group(2), item.group(3), item.group(4).strip())
+            return
+
+        if self._lists and blank_before:
+            if len(line) - len(line.lstrip()) <= self._lists[-1][1]:
+                self._close_blocks()
+            else:
+                self._flush_paragraph()  # a further paragraph inside the list item
+        elif self._quote:
+            self._close_quote()  # lazy continuation lines are not supported; end the quote
+
+        if "|" in stripped and (stripped.startswith("|") or not self._paragraph):
+            self._pending_row = line
+            return
+        self._paragraph.append(stripped)
+
+    def close(self):
+        if self._fence is not None:
+            self.writer.close_code()
+            self._fence = None
+        if self._pending_row is not None:
+            self._paragraph.append(self._pending_row.strip())
+            self._pending_row = None
+        self._close_blocks()
+
+def render_markdown(lines, out):
+    """Stream markdown lines to `out` as HTML and return the table of contents [(level, anchor, title)]"""
+    renderer = MarkdownStreamRenderer(out)
+    for line in lines:
+        renderer.feed(line)
+    renderer.close()
+    return renderer.toc
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the LLM, embedding and search providers
+Serves an OpenAI-compatible chat/embedding API, a Tavily-compatible search
+endpoint and the result pages it links to, with configurable latency,
+token throughput and error rates, so the pipelines can be benchmarked
+deterministically without network access
+
+Point the scripts at it with:
+    MOCK_PROVIDER_URL=http://127.0.0.1:8765 python simple_test.py
+"""
+
+import html
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs, quote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_PORT = 8765
+EMBEDDING_DIMENSIONS = 1536
+
+class MockSettings:
+    """Latency, throughput and failure behaviour of the mock providers"""
+
+    def __init__(self, latency_ms=300.0, latency_sigma=0.5, tokens_per_second=200.0,
+                 completion_tokens=400, error_rate=0.0, search_results=5, seed=0):
+        self.latency_ms = latency_ms  # median time to first token
+        self.latency_sigma = latency_sigma  # log-normal spread
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.search_results = search_results
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"chat": 0, "embedding": 0, "search": 0, "page": 0, "error": 0}
+
+    def sample_latency(self):
+        with self.lock:
+            return self.latency_ms / 1000.0 * math.exp(self.random.gauss(0.0, self.latency_sigma))
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def count(self, kind):
+        with self.lock:
+            self.counts[kind] += 1
+
+def _words(seed_text, count):
+    """Deterministic pseudo-text derived from the prompt"""
+    vocabulary = [
+        "telescope", "thermal", "optical", "segment", "mirror", "adaptive", "optics", "aluminum",
+        "electrolysis", "cell", "control", "model", "knowledge", "manufacturing", "simulation",
+        "stability", "analysis", "performance", "system", "integration", "data", "process",
+    ]
+    rng = random.Random(hashlib.sha256(seed_text.encode('utf-8')).hexdigest())
+    return [rng.choice(vocabulary) for _ in range(count)]
+
+def mock_completion(prompt, completion_tokens):
+    """A plausible response for the prompt shapes GPT-Researcher sends"""
+    lowered = prompt.lower()
+    if "agent_role_prompt" in lowered:
+        return json.dumps({"server": "🔬 Research Agent", "agent_role_prompt": "You are a research assistant."})
+    if "json" in lowered and ("queries" in lowered or "list of strings" in lowered or "search queries" in lowered):
+        words = _words(prompt, 9)
+        return json.dumps([" ".join(words[i:i + 3]) for i in range(0, 9, 3)])
+    if "json" in lowered and "objectives" in lowered:
+        words = _words(prompt, 20)
+        return json.dumps({
+            "title": " ".join(words[:5]).title(),
+            "objectives": " ".join(words[5:10]),
+            "method": " ".join(words[10:14]),
+            "findings": " ".join(words[14:18]),
+            "limitations": " ".join(words[18:]),
+            "keywords": words[:4],
+        })
+
+    words = _words(prompt, completion_tokens)
+    sections = []
+    per_section = max(completion_tokens // 4, 1)
+    for i in range(0, len(words), per_section):
+        chunk = words[i:i + per_section]
+        sections.append(f"## {' '.join(chunk[:3]).title()}\n\n{' '.join(chunk)}.")
+    return "# Mock Research Report\n\n" + "\n\n".join(sections)
+
+def mock_embedding(text, dimensions=EMBEDDING_DIMENSIONS):
+    """Deterministic unit vector for a text"""
+    rng = random.Random(hashlib.sha256(text.encode('utf-8')).hexdigest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    settings = MockSettings()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _maybe_fail(self):
+        if not self.settings.should_fail():
+            return False
+        self.settings.count("error")
+        status = 429 if self.settings.random.random() < 0.5 else 500
+        self._send_json(status, {"error": {"message": f"mock error {status}", "type": "mock_error", "code": status}})
+        return True
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path.startswith("/pages/"):
+            self.settings.count("page")
+            query = parse_qs(parsed.query).get("q", [""])[0]
+            paragraphs = "".join(f"<p>{' '.join(_words(query + str(i), 80))}.</p>" for i in range(6))
+            body = f"<html><head><title>{html.escape(query)}</title></head><body><article>{paragraphs}</article></body></html>"
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if parsed.path == "/stats":
+            self._send_json(200, self.settings.counts)
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        payload = self._read_json()
+        time.sleep(self.settings.sample_latency())
+        if self._maybe_fail():
+            return
+
+        if path.endswith("/chat/completions"):
+            self._chat(payload)
+        elif path.endswith("/embeddings"):
+            self._embeddings(payload)
+        elif path.endswith("/search"):
+            self._search(payload)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _chat(self, payload):
+        self.settings.count("chat")
+        prompt = "\n".join(str(message.get("content", "")) for message in payload.get("messages", []))
+        content = mock_completion(prompt, self.settings.completion_tokens)
+        completion_tokens = len(content.split())
+        prompt_tokens = len(prompt.split())
+        model = payload.get("model", "mock")
+        created = int(time.time())
+        delay_per_token = 1.0 / self.settings.tokens_per_second if self.settings.tokens_per_second else 0.0
+
+        if not payload.get("stream"):
+            time.sleep(delay_per_token * completion_tokens)
+            self._send_json(200, {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for word in content.split(" "):
+            time.sleep(delay_per_token)
+            chunk = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def _embeddings(self, payload):
+        self.settings.count("embedding")
+        inputs = payload.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = payload.get("dimensions") or EMBEDDING_DIMENSIONS
+        data = [{"object": "embedding", "index": i, "embedding": mock_embedding(str(text), dimensions)}
+                for i, text in enumerate(inputs)]
+        tokens = sum(len(str(text).split()) for text in inputs)
+        self._send_json(200, {"object": "list", "data": data, "model": payload.get("model", "mock"),
+                              "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _search(self, payload):
+        self.settings.count("search")
+        query = payload.get("query", "")
+        host = self.headers.get("Host", f"127.0.0.1:{DEFAULT_PORT}")
+        count = min(int(payload.get("max_results") or self.settings.search_results), self.settings.search_results)
+        results = []
+        for i in range(count):
+            results.append({
+                "title": f"{query} ({i + 1})",
+                "url": f"http://{host}/pages/{i}?q={quote(query)}",
+                "content": " ".join(_words(query + str(i), 60)),
+                "score": round(1.0 - i * 0.1, 2),
+            })
+        self._send_json(200, {"query": query, "results": results, "response_time": 0.0})
+
+def start_mock_server(settings=None, host="127.0.0.1", port=DEFAULT_PORT):
+    """Start the mock server on a background thread and return it"""
+    handler = type("ConfiguredMockProviderHandler", (MockProviderHandler,), {"settings": settings or MockSettings()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline mock LLM / embedding / search provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="median latency before the first token")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="log-normal spread of the latency")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="completion token throughput")
+    parser.add_argument("--completion-tokens", type=int, default=400, help="length of generated reports")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 429/500")
+    parser.add_argument("--search-results", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings = MockSettings(args.latency_ms, args.latency_sigma, args.tokens_per_second,
+                            args.completion_tokens, args.error_rate, args.search_results, args.seed)
+    server = start_mock_server(settings, args.host, args.port)
+    print(f"🧪 Mock providers listening on http://{args.host}:{args.port}")
+    print(f"   export MOCK_PROVIDER_URL=http://{args.host}:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Latency-aware routing and hedged requests between the job's LLMs
+Keeps rolling latency and error statistics per model. When a chat call to
+one model (e.g. Gemini) has not answered after its recent latency percentile,
+a hedged duplicate goes to the job's other model (e.g. KIMI); the first
+success wins and the loser is cancelled. A model whose recent calls mostly
+fail is skipped in favour of its alternate.
+
+Enable with HEDGED_REQUESTS=true; tune with HEDGE_PERCENTILE (default 95),
+HEDGE_MIN_DELAY / HEDGE_INITIAL_DELAY (seconds) and HEDGE_ROUTES, e.g.
+    HEDGE_ROUTES={"google_genai:gemini-2.0-flash-exp": "kimi:kimi-k2"}
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from provider_hooks import add_provider_middleware, remove_provider_middleware, current_job_config
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MIN_DELAY = 5.0
+DEFAULT_INITIAL_DELAY = 60.0
+MIN_SAMPLES = 5
+WINDOW = 100
+UNHEALTHY_ERROR_RATE = 0.5
+
+_hedging = contextvars.ContextVar("hedging", default=False)
+
+class ModelStats:
+    """Rolling latencies of successful calls and outcomes of recent calls for one model"""
+
+    def __init__(self, window=WINDOW):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.hedges_won = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(seconds)
+
+    def record_cancelled(self, seconds):
+        """A call that lost a hedge race took at least this long; keeps the percentile honest"""
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def percentile(self, percent):
+        with self._lock:
+            if len(self.latencies) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, max(0, round(percent / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def error_rate(self):
+        with self._lock:
+            if len(self.outcomes) < MIN_SAMPLES:
+                return 0.0
+            return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+class ModelRouter:
+    """Provider middleware that hedges slow chat calls to the alternate model"""
+
+    def __init__(self, percentile=DEFAULT_PERCENTILE, min_delay=DEFAULT_MIN_DELAY,
+                 initial_delay=DEFAULT_INITIAL_DELAY, routes=None):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.routes = routes or {}
+        self.models = {}
+        self.hedged = 0
+        self.rerouted = 0
+
+    def stats_for(self, llm):
+        if llm not in self.models:
+            self.models[llm] = ModelStats()
+        return self.models[llm]
+
+    def alternate_for(self, llm):
+        """Configured route, otherwise the job's other LLM"""
+        if llm in self.routes:
+            return self.routes[llm]
+        config = current_job_config.get()
+        if config is None:
+            return None
+        for first, second in ((config.fast_llm, config.smart_llm), (config.smart_llm, config.fast_llm)):
+            if llm == first and first != second:
+                return second
+        return None
+
+    def hedge_delay(self, llm):
+        observed = self.stats_for(llm).percentile(self.percentile)
+        if observed is None:
+            return self.initial_delay
+        return max(self.min_delay, observed)
+
+    async def _timed(self, llm, call_factory):
+        start = time.perf_counter()
+        try:
+            result = await call_factory()
+        except asyncio.CancelledError:
+            self.stats_for(llm).record_cancelled(time.perf_counter() - start)
+            raise
+        except Exception:
+            self.stats_for(llm).record(time.perf_counter() - start, False)
+            raise
+        self.stats_for(llm).record(time.perf_counter() - start, True)
+        return result
+
+    async def _alternate(self, call, llm):
+        token = _hedging.set(True)  # the duplicate goes through the chain without being hedged again
+        try:
+            provider, model = llm.split(":", 1)
+            return await call.with_model(provider, model)
+        finally:
+            _hedging.reset(token)
+
+    async def __call__(self, call, proceed):
+        if call.kind != "chat" or call.with_model is None or _hedging.get():
+            return await proceed()
+
+        primary_llm = f"{call.provider}:{call.model}"
+        alternate_llm = self.alternate_for(primary_llm)
+        if alternate_llm is None:
+            return await self._timed(primary_llm, proceed)
+
+        primary_stats, alternate_stats = self.stats_for(primary_llm), self.stats_for(alternate_llm)
+        if primary_stats.error_rate() >= UNHEALTHY_ERROR_RATE > alternate_stats.error_rate():
+            self.rerouted += 1
+            result = await self._timed(alternate_llm, lambda: self._alternate(call, alternate_llm))
+            call.record_result(result)
+            return result
+
+        primary = asyncio.ensure_future(self._timed(primary_llm, proceed))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay(primary_llm))
+        if done and primary.exception() is None:
+            return primary.result()
+
+        # Primary is slow (or already failed): race the alternate against it
+        self.hedged += 1
+        hedge = asyncio.ensure_future(self._timed(alternate_llm, lambda: self._alternate(call, alternate_llm)))
+        pending = {hedge} if done else {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            alternate_stats.hedges_won += 1
+                            call.record_result(task.result())
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise primary.exception()
+
+    def summary(self):
+        return {
+            "hedged": self.hedged,
+            "rerouted": self.rerouted,
+            "models": {
+                llm: {
+                    "p50": stats.percentile(50.0),
+                    f"p{self.percentile:g}": stats.percentile(self.percentile),
+                    "error_rate": round(stats.error_rate(), 3),
+                    "hedges_won": stats.hedges_won,
+                }
+                for llm, stats in self.models.items()
+            },
+        }
+
+_router = None
+
+def hedging_enabled():
+    return os.getenv("HEDGED_REQUESTS", "").lower() in ("1", "true", "yes")
+
+def load_routes_from_env():
+    raw = os.getenv("HEDGE_ROUTES")
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        print(f"⚠️  Ignoring invalid HEDGE_ROUTES: {e}")
+        return None
+
+def install_model_router(router=None):
+    """Install the process-wide router (idempotent; only when HEDGED_REQUESTS is set unless given one)"""
+    global _router
+    if _router is None and (router is not None or hedging_enabled()):
+        _router = router or ModelRouter(
+            percentile=float(os.getenv("HEDGE_PERCENTILE", DEFAULT_PERCENTILE)),
+            min_delay=float(os.getenv("HEDGE_MIN_DELAY", DEFAULT_MIN_DELAY)),
+            initial_delay=float(os.getenv("HEDGE_INITIAL_DELAY", DEFAULT_INITIAL_DELAY)),
+            routes=load_routes_from_env(),
+        )
+        add_provider_middleware(_router)
+    return _router
+
+def uninstall_model_router():
+    global _router
+    if _router is not None:
+        remove_provider_middleware(_router)
+        _router = None
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Map-reduce literature review over the local paper corpus
+Map: each paper gets a structured digest (objectives, method, findings,
+limitations) from FAST_LLM, many papers concurrently, cached per paper hash.
+Reduce: SMART_LLM synthesizes the review from the digests only.
+"""
+
+import json
+import asyncio
+import hashlib
+from paper_manifest import load_paper_text, update_entries
+from research_cache import research_cache
+from research_config import create_job_chat_completion
+from pipeline_stages import stage
+
+DIGEST_VERSION = 1
+DIGEST_CONCURRENCY = 8
+DIGEST_SAVE_EVERY = 32  # new digests per manifest rewrite
+MAX_DIGEST_INPUT_CHARS = 60000
+DIGEST_FIELDS = ("title", "objectives", "method", "findings", "limitations", "keywords")
+
+DIGEST_PROMPT = """You are analyzing one research paper for a literature review.
+Return ONLY a JSON object with these keys:
+- "title": the paper title
+- "objectives": main objectives of the work
+- "method": methodology, models, tools and experimental setup
+- "findings": key findings and quantitative results
+- "limitations": limitations and future work stated or implied
+- "keywords": list of 3-8 technical keywords
+
+Paper file name: {filename}
+
+Paper text:
+{text}
+"""
+
+def digest_cache_key(job_config):
+    """Summary slot in the manifest for digests produced by this FAST_LLM"""
+    return f"digest:v{DIGEST_VERSION}:{job_config.fast_llm}"
+
+def parse_digest(response, filename):
+    """Parse the model's JSON digest, tolerating code fences and stray text
+
+    Unparseable output becomes a fallback digest (raw text as findings) marked
+    with "fallback": True; it is used for this run but never cached.
+    """
+    text = response.strip()
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            digest = json.loads(text[start:end + 1])
+            if isinstance(digest, dict):
+                return {field: digest.get(field, "") for field in DIGEST_FIELDS}
+        except ValueError:
+            pass
+    digest = {field: "" for field in DIGEST_FIELDS}
+    digest.update(title=filename, findings=text, fallback=True)
+    return digest
+
+async def digest_paper(entry, job_config):
+    """Digest one paper, reusing the cached digest for an unchanged paper
+
+    New digests are not persisted here; digest_papers() saves them in batches.
+    """
+    cache_key = digest_cache_key(job_config)
+    cached = entry.get("summaries", {}).get(cache_key)
+    if cached and not cached.get("fallback"):
+        return cached, False
+
+    text = load_paper_text(entry)
+    if not text:
+        return None, False
+
+    response = await create_job_chat_completion(
+        job_config,
+        [{"role": "user", "content": DIGEST_PROMPT.format(
+            filename=entry["filename"], text=text[:MAX_DIGEST_INPUT_CHARS]
+        )}],
+        llm="fast",
+        temperature=0.2
+    )
+    return parse_digest(response, entry["filename"]), True
+
+async def digest_papers(entries, job_config, concurrency=DIGEST_CONCURRENCY):
+    """Map step: digest all papers concurrently, returning (entry, digest) pairs"""
+    semaphore = asyncio.Semaphore(concurrency)
+    cache_key = digest_cache_key(job_config)
+    unsaved = []
+
+    def save_digests():
+        update_entries(unsaved)
+        unsaved.clear()
+
+    async def run(entry):
+        async with semaphore:
+            try:
+                digest, is_new = await digest_paper(entry, job_config)
+            except Exception as e:
+                print(f"⚠️  Digest failed for {entry['filename']}: {e}")
+                return entry, (None, False)
+        if is_new and digest.get("fallback"):
+            print(f"⚠️  Digest for {entry['filename']} was not valid JSON; using raw text, retrying next run")
+        elif is_new:
+            unsaved.append((entry, {"summaries": dict(entry.get("summaries", {}), **{cache_key: digest})}))
+            if len(unsaved) >= DIGEST_SAVE_EVERY:
+                save_digests()
+        return entry, (digest, is_new)
+
+    try:
+        results = await asyncio.gather(*(run(entry) for entry in entries))
+    finally:
+        save_digests()
+    fresh = sum(1 for _, (_, is_new) in results if is_new)
+    digests = [(entry, digest) for entry, (digest, _) in results if digest]
+    print(f"🧾 Paper digests: {len(digests)} ready, {fresh} newly generated, {len(digests) - fresh} reused")
+    return digests
+
+def format_digests(digests):
+    """Render digests as numbered sources for the reduce prompt"""
+    blocks = []
+    for i, (entry, digest) in enumerate(digests, 1):
+        keywords = digest.get("keywords") or []
+        if isinstance(keywords, list):
+            keywords = ", ".join(str(keyword) for keyword in keywords)
+        blocks.append(
+            f"[{i}] {digest.get('title') or entry['filename']} ({entry['filename']})\n"
+            f"Objectives: {digest.get('objectives', '')}\n"
+            f"Method: {digest.get('method', '')}\n"
+            f"Findings: {digest.get('findings', '')}\n"
+            f"Limitations: {digest.get('limitations', '')}\n"
+            f"Keywords: {keywords}"
+        )
+    return "\n\n".join(blocks)
+
+async def synthesize_review(digests, job_config, instructions, refresh=False):
+    """Reduce step: write the review from the digests with SMART_LLM
+
+    The result is cached by the digest set, so an unchanged corpus costs no calls.
+    """
+    sources = format_digests(digests)
+    cache_key = hashlib.sha256(json.dumps({
+        "instructions": instructions.strip(),
+        "sources": sources,
+        "smart_llm": job_config.smart_llm,
+    }, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    cache = research_cache()
+    cached = None if refresh else cache.get(cache_key)
+    if cached is not None:
+        print("♻️  Using cached synthesis (digests unchanged)")
+        return cached["report"]
+
+    prompt = f"""{instructions.strip()}
+
+Base the review ONLY on the following paper digests. Cite papers by their bracketed number, e.g. [3].
+
+{sources}
+"""
+    report = await create_job_chat_completion(
+        job_config,
+        [{"role": "user", "content": prompt}],
+        llm="smart",
+        temperature=0.35,
+        max_tokens=8000
+    )
+    cache.put(cache_key, {"report": report})
+    return report
+
+async def map_reduce_review(entries, job_config, instructions, refresh=False):
+    """Digest every paper, then synthesize the review from the digests"""
+    with stage("conduct_research", mode="map"):
+        digests = await digest_papers(entries, job_config)
+    if not digests:
+        raise RuntimeError("no paper digests available")
+    print("✍️  Synthesizing review from paper digests...")
+    with stage("write_report", mode="reduce"):
+        return await synthesize_review(digests, job_config, instructions, refresh)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Content-addressed manifest for the local TMT paper corpus
+Tracks path, size, mtime and sha256 of every PDF so that a run only
+re-processes papers that are new or changed since the previous run
+"""
+
+import os
+import json
+import hashlib
+from pipeline_stages import stage
+
+CACHE_DIR = ".research_cache"
+MANIFEST_FILE = os.path.join(CACHE_DIR, "tmt_manifest.json")
+TEXT_DIR = os.path.join(CACHE_DIR, "text")
+DEFAULT_PAPER_DIR = "../TMT"  # Relative path from GPT_Research directory
+
+MANIFEST_VERSION = 1
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Hash a file in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path=MANIFEST_FILE):
+    """Load the manifest, or return an empty one"""
+    if not os.path.exists(manifest_path):
+        return {"version": MANIFEST_VERSION, "papers": {}}
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Ignoring unreadable manifest {manifest_path}: {e}")
+        return {"version": MANIFEST_VERSION, "papers": {}}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "papers": {}}
+    return manifest
+
+def save_manifest(manifest, manifest_path=MANIFEST_FILE):
+    """Atomically write the manifest"""
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def scan_papers(paper_dir=DEFAULT_PAPER_DIR, manifest_path=MANIFEST_FILE, verbose=True):
+    """Scan the paper directory and return manifest entries sorted by filename
+
+    Each entry carries a transient "status" of "new", "changed" or "unchanged".
+    Files whose size and mtime match the manifest are not re-hashed.
+    """
+    with stage("corpus_scan"):
+        return _scan_papers(paper_dir, manifest_path, verbose)
+
+def _scan_papers(paper_dir, manifest_path, verbose):
+    if not os.path.exists(paper_dir):
+        print(f"❌ TMT directory not found: {paper_dir}")
+        return []
+
+    manifest = load_manifest(manifest_path)
+    previous = manifest["papers"]
+    papers = {}
+    entries = []
+
+    for filename in sorted(os.listdir(paper_dir)):
+        if not filename.endswith('.pdf'):
+            continue
+
+        full_path = os.path.join(paper_dir, filename)
+        stat = os.stat(full_path)
+        entry = previous.get(full_path)
+
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime_ns:
+            status = "unchanged"
+        else:
+            sha256 = file_sha256(full_path)
+            if entry and entry["sha256"] == sha256:
+                # Touched but identical content: keep extraction and summaries
+                status = "unchanged"
+                entry = dict(entry, size=stat.st_size, mtime=stat.st_mtime_ns)
+            else:
+                status = "changed" if entry else "new"
+                entry = {
+                    "filename": filename,
+                    "path": full_path,
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime_ns,
+                    "sha256": sha256,
+                    "text_path": None,
+                    "summaries": {},
+                }
+
+        papers[full_path] = entry
+        entries.append(dict(entry, status=status))
+
+    # Papers from other directories share the manifest and are kept
+    scanned_prefix = os.path.join(paper_dir, "")
+    removed = 0
+    for path, entry in previous.items():
+        if path in papers:
+            continue
+        if path.startswith(scanned_prefix):
+            removed += 1
+        else:
+            papers[path] = entry
+    manifest["papers"] = papers
+    save_manifest(manifest, manifest_path)
+
+    if verbose:
+        counts = {"new": 0, "changed": 0, "unchanged": 0}
+        for entry in entries:
+            counts[entry["status"]] += 1
+        print(f"📚 Papers: {len(entries)} total, {counts['new']} new, "
+              f"{counts['changed']} changed, {counts['unchanged']} unchanged, {removed} removed")
+
+    return entries
+
+def update_entries(updates, manifest_path=MANIFEST_FILE):
+    """Persist extra fields for many papers with a single manifest rewrite
+
+    updates is a list of (entry, fields) pairs.
+    """
+    if not updates:
+        return
+    manifest = load_manifest(manifest_path)
+    for entry, fields in updates:
+        stored = manifest["papers"].get(entry["path"])
+        if stored is None or stored["sha256"] != entry["sha256"]:
+            continue
+        stored.update(fields)
+        entry.update(fields)
+    save_manifest(manifest, manifest_path)
+
+def update_entry(entry, manifest_path=MANIFEST_FILE, **fields):
+    """Persist extra fields (text pointer, summaries) for one paper"""
+    update_entries([(entry, fields)], manifest_path)
+
+def text_path_for(entry):
+    """Content-addressed location of a paper's extracted text"""
+    return os.path.join(TEXT_DIR, entry["sha256"] + ".txt")
+
+def load_paper_text(entry):
+    """Return the previously extracted text of a paper, or None"""
+    text_path = entry.get("text_path")
+    if not text_path or not os.path.exists(text_path):
+        return None
+    with open(text_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def write_paper_text(entry, pages):
+    """Store extracted page texts (form-feed separated); record the pointer with update_entries()"""
+    os.makedirs(TEXT_DIR, exist_ok=True)
+    text_path = text_path_for(entry)
+    tmp_path = text_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('\f'.join(pages))
+    os.replace(tmp_path, text_path)
+    return text_path
+
+def papers_needing_extraction(entries):
+    """Entries whose text has not been extracted yet"""
+    return [entry for entry in entries
+            if not entry.get("text_path") or not os.path.exists(entry["text_path"])]
+
+def paper_documents(entries):
+    """Build LangChain documents (one per page) from the extracted texts"""
+    from langchain_core.documents import Document
+
+    documents = []
+    for entry in entries:
+        text = load_paper_text(entry)
+        if text is None:
+            continue
+        for page_number, page_text in enumerate(text.split('\f'), 1):
+            if page_text.strip():
+                documents.append(Document(
+                    page_content=page_text,
+                    metadata={"source": entry["path"], "title": entry["filename"], "page": page_number}
+                ))
+    return documents
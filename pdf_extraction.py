@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Parallel PDF text extraction for the local paper corpus
+Fans page-range parsing out over a process pool (one worker per core) and
+streams page text back as it is produced
+"""
+
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from paper_manifest import papers_needing_extraction, update_entries, write_paper_text
+from pipeline_stages import stage
+
+PAGES_PER_TASK = 8
+SAVE_EVERY = 32  # extracted papers per manifest rewrite
+
+def _count_pages(path):
+    """Worker: number of pages in a PDF"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+def _extract_page_range(path, start, stop):
+    """Worker: text of pages [start, stop) of a PDF"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+async def stream_pdf_pages(entries, max_workers=None, pages_per_task=PAGES_PER_TASK):
+    """Yield (entry, page_index, page_count, text) as pages are extracted
+
+    Each PDF is split into page ranges so that one large paper does not
+    serialize the pool. Papers that fail to open or parse are reported and
+    skipped.
+    """
+    if not entries:
+        return
+
+    loop = asyncio.get_running_loop()
+    workers = max_workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tasks = {}
+        for entry in entries:
+            future = loop.run_in_executor(pool, _count_pages, entry["path"])
+            tasks[future] = (entry, None, None)
+
+        page_counts = {}
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                entry, start, stop = tasks.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"⚠️  Failed to extract {entry['filename']}: {e}")
+                    continue
+
+                if start is None:
+                    page_counts[entry["path"]] = result
+                    if result == 0:
+                        yield entry, None, 0, ""
+                    for range_start in range(0, result, pages_per_task):
+                        range_stop = min(range_start + pages_per_task, result)
+                        range_future = loop.run_in_executor(
+                            pool, _extract_page_range, entry["path"], range_start, range_stop
+                        )
+                        tasks[range_future] = (entry, range_start, range_stop)
+                    continue
+
+                for offset, text in enumerate(result):
+                    yield entry, start + offset, page_counts[entry["path"]], text
+
+async def extract_papers(entries, max_workers=None):
+    """Extract text for new or changed papers in parallel; unchanged papers reuse their cache"""
+    with stage("extraction"):
+        return await _extract_papers(entries, max_workers)
+
+async def _extract_papers(entries, max_workers):
+    pending = papers_needing_extraction(entries)
+    if not pending:
+        print("♻️  Reusing extracted text for all papers")
+        return entries
+
+    workers = max_workers or os.cpu_count() or 1
+    print(f"📖 Extracting text from {len(pending)} new or changed paper(s) on {workers} worker(s)...")
+
+    pages = {}
+    completed = 0
+    unsaved = []
+    try:
+        async for entry, page_index, page_count, text in stream_pdf_pages(pending, workers):
+            paper_pages = pages.setdefault(entry["path"], {})
+            if page_index is not None:
+                paper_pages[page_index] = text
+            if len(paper_pages) == page_count:
+                text_path = write_paper_text(entry, [paper_pages[i] for i in range(page_count)])
+                unsaved.append((entry, {"text_path": text_path}))
+                if len(unsaved) >= SAVE_EVERY:
+                    update_entries(unsaved)
+                    unsaved.clear()
+                del pages[entry["path"]]
+                completed += 1
+                print(f"📄 Extracted {entry['filename']} ({page_count} pages)")
+    finally:
+        update_entries(unsaved)
+
+    print(f"✅ Extracted {completed}/{len(pending)} paper(s)")
+    return entries
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Named pipeline stages (corpus scan, extraction, research, report writing,
+markdown assembly, HTML rendering) that benchmarks and other observers can
+time without the entry points knowing about them
+"""
+
+import time
+import contextlib
+import contextvars
+from tracing import span
+
+current_stage = contextvars.ContextVar("current_stage", default=None)
+
+_listeners = []
+
+def add_stage_listener(listener):
+    """Register listener(name, start, end, attrs), called when a stage finishes"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def remove_stage_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+@contextlib.contextmanager
+def stage(name, **attrs):
+    """Mark the enclosed block (sync or async) as one pipeline stage"""
+    token = current_stage.set(name)
+    start = time.perf_counter()
+    try:
+        with span(name, "stage", **attrs):
+            yield
+    finally:
+        end = time.perf_counter()
+        current_stage.reset(token)
+        for listener in list(_listeners):
+            listener(name, start, end, attrs)
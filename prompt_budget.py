@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Token budgeting for synthesis prompts
+Measures the token size of each prompt component and compresses long
+markdown (e.g. a web research report) to a budget by extractive selection
+of the passages most relevant to the query
+"""
+
+import os
+import re
+import math
+from collections import Counter
+from provider_hooks import estimate_tokens
+
+DEFAULT_WEB_REPORT_BUDGET = int(os.getenv("WEB_REPORT_TOKEN_BUDGET", "6000"))
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+CJK_RE = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "from", "are", "was", "were", "has", "have",
+    "its", "into", "such", "their", "also", "which", "including", "include", "provide", "based",
+}
+
+def tokenize_terms(text):
+    """Index terms: lowercase latin words plus CJK character bigrams"""
+    lowered = text.lower()
+    terms = [word for word in _WORD_RE.findall(lowered) if len(word) > 2 and word not in STOPWORDS]
+    for run in CJK_RE.findall(lowered):
+        if len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+def split_passages(markdown):
+    """Split markdown into (heading, passage) units, one per paragraph"""
+    passages = []
+    heading = None
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            passages.append((heading, "\n".join(paragraph)))
+            paragraph.clear()
+
+    for line in markdown.splitlines():
+        if _HEADING_RE.match(line):
+            flush()
+            heading = line.strip()
+        elif not line.strip():
+            flush()
+        else:
+            paragraph.append(line)
+    flush()
+    return passages
+
+def score_passages(passages, query, k1=1.5, b=0.75):
+    """BM25 relevance of every passage (heading included) to the query"""
+    documents = [tokenize_terms(f"{heading or ''}\n{text}") for heading, text in passages]
+    if not documents:
+        return []
+    average_length = sum(len(terms) for terms in documents) / len(documents) or 1.0
+    document_frequency = Counter(term for terms in documents for term in set(terms))
+    query_terms = set(tokenize_terms(query))
+
+    scores = []
+    for terms in documents:
+        counts = Counter(terms)
+        score = 0.0
+        for term in query_terms:
+            frequency = counts.get(term)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * len(terms) / average_length))
+        scores.append(score)
+    return scores
+
+def compress_to_budget(markdown, query, budget_tokens=DEFAULT_WEB_REPORT_BUDGET):
+    """Keep the most query-relevant passages of `markdown` within `budget_tokens`
+
+    Passages are chosen greedily by relevance per token and emitted in their
+    original order under their original headings.
+    """
+    if estimate_tokens(markdown) <= budget_tokens:
+        return markdown
+
+    passages = split_passages(markdown)
+    scores = score_passages(passages, query)
+    costs = [estimate_tokens(text) for _, text in passages]
+    heading_costs = {heading: estimate_tokens(heading) for heading, _ in passages if heading}
+
+    order = sorted(range(len(passages)), key=lambda i: (-scores[i] / max(costs[i], 1), i))
+    selected = set()
+    used_headings = set()
+    used = 0
+    for i in order:
+        heading = passages[i][0]
+        cost = costs[i] + (heading_costs.get(heading, 0) if heading not in used_headings else 0)
+        if used + cost > budget_tokens:
+            continue
+        selected.add(i)
+        used_headings.add(heading)
+        used += cost
+
+    lines = []
+    current_heading = None
+    for i, (heading, text) in enumerate(passages):
+        if i not in selected:
+            continue
+        if heading and heading != current_heading:
+            lines.extend([heading, ""])
+            current_heading = heading
+        lines.extend([text, ""])
+    return "\n".join(lines).strip()
+
+def measure_prompt(components):
+    """Print and return the token size of each named prompt component"""
+    sizes = {name: estimate_tokens(text) for name, text in components.items()}
+    total = sum(sizes.values())
+    print("📏 Prompt budget: " + ", ".join(f"{name}={size}" for name, size in sizes.items()) + f" (total {total} tokens)")
+    return sizes
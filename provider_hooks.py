@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Process-wide hooks around GPT-Researcher's provider clients
+Routes each LLM client construction through the job configuration of the
+researcher that is currently running, instead of os.environ, and passes every
+chat, embedding, search and scrape call through a chain of async middlewares
+(rate limiting, accounting, ...)
+"""
+
+import asyncio
+import functools
+import contextlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from pipeline_stages import stage
+from http_pool import pooled_client_kwargs
+
+try:
+    from langchain_core.embeddings import Embeddings as _EmbeddingsBase
+except ImportError:
+    _EmbeddingsBase = object
+
+current_job_config = contextvars.ContextVar("current_job_config", default=None)
+
+_installed = False
+_middlewares = []
+_encoder = None
+
+def estimate_tokens(text):
+    """Token count of a text (tiktoken when available, otherwise a CJK-aware estimate)"""
+    global _encoder
+    if not text:
+        return 0
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text, disallowed_special=()))
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii) // 4 + 1
+
+def messages_text(messages):
+    """Concatenated content of chat messages (dicts or LangChain messages)"""
+    parts = []
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", message)
+        parts.append(content if isinstance(content, str) else str(content))
+    return "\n".join(parts)
+
+class ProviderCall:
+    """One outgoing provider request as seen by the middlewares"""
+
+    def __init__(self, kind, provider, model, payload):
+        self.kind = kind  # "chat", "embedding", "search" or "scrape"
+        self.provider = provider
+        self.model = model
+        self.payload = payload
+        self.prompt_tokens = self._prompt_tokens()
+        self.completion_tokens = 0
+        self.with_model = None  # chat only: with_model(provider, model) -> same request to another model
+
+    def _prompt_tokens(self):
+        if self.kind == "chat":
+            return estimate_tokens(messages_text(self.payload))
+        if self.kind == "embedding":
+            return sum(estimate_tokens(text) for text in self.payload)
+        return 0
+
+    def record_result(self, result):
+        if self.kind == "chat" and isinstance(result, str):
+            self.completion_tokens = estimate_tokens(result)
+
+def add_provider_middleware(middleware, first=False):
+    """Register an async middleware(call, proceed) applied to every provider call
+
+    With first=True it becomes the outermost middleware.
+    """
+    if middleware not in _middlewares:
+        if first:
+            _middlewares.insert(0, middleware)
+        else:
+            _middlewares.append(middleware)
+
+def remove_provider_middleware(middleware):
+    if middleware in _middlewares:
+        _middlewares.remove(middleware)
+
+async def dispatch(call, invoke):
+    """Run a provider call through the registered middlewares"""
+    middlewares = list(_middlewares)
+
+    async def run(index):
+        if index == len(middlewares):
+            result = await invoke()
+            call.record_result(result)
+            return result
+        return await middlewares[index](call, lambda: run(index + 1))
+
+    return await run(0)
+
+def dispatch_sync(call, invoke):
+    """Run a blocking provider call through the middlewares from synchronous code"""
+    if not _middlewares:
+        return invoke()
+
+    async def invoke_async():
+        return invoke()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(dispatch(call, invoke_async))
+
+    # Called synchronously on an event loop thread: run the chain on a helper thread
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(context.run, asyncio.run, dispatch(call, invoke_async)).result()
+
+def _model_name(client):
+    return getattr(client, "model_name", None) or getattr(client, "model", None) or "unknown"
+
+class HookedEmbeddings(_EmbeddingsBase):
+    """Embedding client wrapper that routes requests through the middlewares"""
+
+    def __init__(self, embeddings, provider, model):
+        self.embeddings = embeddings
+        self.provider = provider
+        self.model = model
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        call = ProviderCall("embedding", self.provider, self.model, texts)
+        return dispatch_sync(call, lambda: self.embeddings.embed_documents(texts))
+
+    def embed_query(self, text):
+        call = ProviderCall("embedding", self.provider, self.model, [text])
+        return dispatch_sync(call, lambda: self.embeddings.embed_query(text))
+
+    async def aembed_documents(self, texts):
+        texts = list(texts)
+        call = ProviderCall("embedding", self.provider, self.model, texts)
+        return await dispatch(call, lambda: self.embeddings.aembed_documents(texts))
+
+    async def aembed_query(self, text):
+        call = ProviderCall("embedding", self.provider, self.model, [text])
+        return await dispatch(call, lambda: self.embeddings.aembed_query(text))
+
+def install_provider_hooks():
+    """Patch GPT-Researcher once so provider calls use the current job and middlewares"""
+    global _installed
+    if _installed:
+        return
+
+    from gpt_researcher.llm_provider import GenericLLMProvider
+    from gpt_researcher.memory import Memory
+    from gpt_researcher.retrievers.tavily.tavily_search import TavilySearch
+    from gpt_researcher.scraper.scraper import Scraper
+
+    original_from_provider = GenericLLMProvider.from_provider.__func__
+    original_get_chat_response = GenericLLMProvider.get_chat_response
+    original_memory_init = Memory.__init__
+    original_get_embeddings = Memory.get_embeddings
+    original_search = TavilySearch.search
+    original_extract = Scraper.extract_data_from_url
+
+    def from_provider(cls, provider, *args, **kwargs):
+        client_args, client_kwargs = args, dict(kwargs)
+        config = current_job_config.get()
+        if config is not None:
+            for key, value in config.provider_kwargs(provider).items():
+                kwargs.setdefault(key, value)
+        for key, value in pooled_client_kwargs(provider).items():
+            kwargs.setdefault(key, value)
+        llm_provider = original_from_provider(cls, provider, *args, **kwargs)
+        llm_provider.hook_provider = provider
+        llm_provider.hook_client_args = (client_args, client_kwargs)
+        return llm_provider
+
+    async def get_chat_response(self, messages, stream, websocket=None, **kwargs):
+        call = ProviderCall("chat", getattr(self, "hook_provider", "unknown"), _model_name(self.llm), messages)
+        if websocket is None and hasattr(self, "hook_client_args"):
+            client_args, client_kwargs = self.hook_client_args
+
+            def with_model(provider, model):
+                client = GenericLLMProvider.from_provider(provider, *client_args, **dict(client_kwargs, model=model))
+                return client.get_chat_response(messages, stream, None, **kwargs)
+
+            call.with_model = with_model
+        return await dispatch(
+            call, lambda: original_get_chat_response(self, messages, stream, websocket, **kwargs)
+        )
+
+    def memory_init(self, embedding_provider, model, *args, **kwargs):
+        config = current_job_config.get()
+        if config is not None:
+            for key, value in config.provider_kwargs(embedding_provider).items():
+                kwargs.setdefault(key, value)
+        kwargs = dict(pooled_client_kwargs(embedding_provider), **kwargs)
+        original_memory_init(self, embedding_provider, model, *args, **kwargs)
+        self.hook_provider = embedding_provider
+        self.hook_model = model
+
+    def get_embeddings(self):
+        embeddings = original_get_embeddings(self)
+        if getattr(embeddings, "hooked", False):
+            return embeddings
+        provider, model = getattr(self, "hook_provider", "unknown"), getattr(self, "hook_model", "unknown")
+        embeddings = HookedEmbeddings(embeddings, provider, model)
+        from embedding_cache import CachedEmbeddings, embedding_cache_enabled  # needs numpy
+        if embedding_cache_enabled():
+            embeddings = CachedEmbeddings(embeddings, f"{provider}:{model}")
+        embeddings.hooked = True
+        self._embeddings = embeddings
+        return embeddings
+
+    @functools.wraps(original_search)
+    def search(self, *args, **kwargs):
+        config = current_job_config.get()
+        if config is not None and config.tavily_base_url:
+            self.base_url = config.tavily_base_url
+        call = ProviderCall("search", "tavily", "search", getattr(self, "query", ""))
+        return dispatch_sync(call, lambda: original_search(self, *args, **kwargs))
+
+    @functools.wraps(original_extract)
+    async def extract_data_from_url(self, link, *args, **kwargs):
+        call = ProviderCall("scrape", "web", getattr(self, "scraper", "unknown"), link)
+        return await dispatch(call, lambda: original_extract(self, link, *args, **kwargs))
+
+    GenericLLMProvider.from_provider = classmethod(from_provider)
+    GenericLLMProvider.get_chat_response = get_chat_response
+    Memory.__init__ = memory_init
+    Memory.get_embeddings = get_embeddings
+    TavilySearch.search = search
+    Scraper.extract_data_from_url = extract_data_from_url
+    _installed = True
+
+@contextlib.contextmanager
+def job_scope(config):
+    """Make provider calls inside the block use the given job configuration"""
+    token = current_job_config.set(config)
+    try:
+        yield config
+    finally:
+        current_job_config.reset(token)
+
+def bind_job_config(researcher, config):
+    """Run the researcher's research and report steps under its job configuration, as pipeline stages"""
+    for name in ("conduct_research", "write_report"):
+        method = getattr(researcher, name)
+
+        @functools.wraps(method)
+        async def bound(*args, _method=method, _name=name, **kwargs):
+            with job_scope(config), stage(_name):
+                return await _method(*args, **kwargs)
+
+        setattr(researcher, name, bound)
+    return researcher
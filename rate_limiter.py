@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Per-provider token-bucket rate limiter shared by all researchers in a process
+Every chat, embedding and search call draws one request from the provider's
+request-per-minute bucket and its estimated tokens from the token-per-minute
+bucket, waiting just long enough to stay under the quota
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+from provider_hooks import add_provider_middleware, remove_provider_middleware
+
+# Requests and tokens per minute; override with the RATE_LIMITS environment variable (JSON)
+DEFAULT_LIMITS = {
+    "google_genai": {"rpm": 10, "tpm": 1000000},
+    "kimi": {"rpm": 60, "tpm": 128000},
+    "openai": {"rpm": 500, "tpm": 200000},
+    "tavily": {"rpm": 100, "tpm": None},
+}
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations instead of blocking"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        """Take `amount` tokens and return how many seconds to wait before using them"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= min(amount, self.capacity)
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def charge(self, amount):
+        """Take tokens after the fact (e.g. completion tokens); later reservations pay the debt"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= min(amount, self.capacity)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider answered 429"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+
+def is_rate_limit_error(error):
+    """Whether an exception looks like an HTTP 429 / quota error"""
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "resource_exhausted" in message
+
+class ProviderRateLimiter:
+    """Request and token buckets per provider, applied as a provider middleware"""
+
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.buckets = {}
+        self.waited_seconds = 0.0
+
+    def _buckets(self, provider):
+        if provider not in self.buckets:
+            limit = self.limits.get(provider, {})
+            rpm_bucket = TokenBucket(limit["rpm"]) if limit.get("rpm") else None
+            tpm_bucket = TokenBucket(limit["tpm"]) if limit.get("tpm") else None
+            self.buckets[provider] = (rpm_bucket, tpm_bucket)
+        return self.buckets[provider]
+
+    async def acquire(self, provider, tokens=0):
+        """Wait until one request with `tokens` prompt tokens fits the provider's quota"""
+        rpm_bucket, tpm_bucket = self._buckets(provider)
+        wait = 0.0
+        if rpm_bucket:
+            wait = max(wait, rpm_bucket.reserve(1))
+        if tpm_bucket and tokens:
+            wait = max(wait, tpm_bucket.reserve(tokens))
+        if wait > 0:
+            self.waited_seconds += wait
+            await asyncio.sleep(wait)
+
+    async def __call__(self, call, proceed):
+        await self.acquire(call.provider, call.prompt_tokens)
+        try:
+            result = await proceed()
+        except Exception as e:
+            if is_rate_limit_error(e):
+                for bucket in self._buckets(call.provider):
+                    if bucket:
+                        bucket.drain()
+            raise
+
+        _, tpm_bucket = self._buckets(call.provider)
+        if tpm_bucket and call.completion_tokens:
+            tpm_bucket.charge(call.completion_tokens)
+        return result
+
+_limiter = None
+
+def load_limits_from_env():
+    """Parse RATE_LIMITS, e.g. {"google_genai": {"rpm": 15, "tpm": 1000000}}"""
+    raw = os.getenv("RATE_LIMITS")
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        print(f"⚠️  Ignoring invalid RATE_LIMITS: {e}")
+        return None
+
+def install_rate_limiter(limits=None):
+    """Install the process-wide limiter (idempotent) and return it"""
+    global _limiter
+    if _limiter is None:
+        _limiter = ProviderRateLimiter(limits if limits is not None else load_limits_from_env())
+        add_provider_middleware(_limiter)
+    return _limiter
+
+def uninstall_rate_limiter():
+    global _limiter
+    if _limiter is not None:
+        remove_provider_middleware(_limiter)
+        _limiter = None
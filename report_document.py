@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Report document tree and multi-format export
+A report is parsed once (by the same streaming parser that renders the HTML)
+into a tree of block nodes: headings, paragraphs, lists, tables, code blocks,
+quotes and rules, with inline markdown kept as text. HTML, JSON and plain
+text are rendered from that tree, each format at the same time in its own
+worker thread, and each output file is written in one buffered pass.
+Adding a format is one more renderer over the tree, not another pass over the
+report or another LLM call.
+
+The Markdown output is the report text itself (page.markdown) when there is
+one; rendering it from the tree would normalize it, e.g. table rules. It is
+only rewritten when its content changed, and the HTML page is patched section
+by section like incremental_report. The workers are threads of the calling
+process, so exporting from a running asyncio pipeline never forks it.
+"""
+
+import os
+import re
+import html
+import sys
+import json
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+import markdown_stream
+from markdown_stream import MarkdownStreamRenderer, iter_lines, plain_text, render_inline
+from report_templates import WRITE_BUFFER_BYTES
+from incremental_report import patch_report, renderer_digest, write_markdown
+
+EXPORT_FORMATS = ("markdown", "html", "json", "text")
+HTML_TAG = re.compile(r"<[^>]+>")
+
+@dataclass
+class Node:
+    """One block of a report; text is inline markdown (code blocks: the code)"""
+    kind: str
+    text: str = ""
+    attrs: dict = field(default_factory=dict)
+    children: list = field(default_factory=list)
+
+    def to_dict(self):
+        node = {"kind": self.kind}
+        if self.text:
+            node["text"] = self.text
+        if self.attrs:
+            node["attrs"] = self.attrs
+        if self.children:
+            node["children"] = [child.to_dict() for child in self.children]
+        return node
+
+class TreeWriter:
+    """MarkdownStreamRenderer writer that builds a Node tree instead of HTML"""
+
+    def __init__(self):
+        self.root = Node("document")
+        self._stack = [self.root]
+        self._table = None
+        self._code = None
+
+    def _add(self, node):
+        self._stack[-1].children.append(node)
+        return node
+
+    def _push(self, node):
+        self._stack.append(self._add(node))
+
+    def paragraph(self, text, tag="p"):
+        self._add(Node("paragraph" if tag else "text", text))
+
+    def heading(self, level, anchor, text):
+        self._add(Node("heading", text, {"level": level}))
+
+    def open_list(self, tag, start=None):
+        attrs = {"ordered": True} if tag == "ol" else {}
+        if start:
+            attrs["start"] = start
+        self._push(Node("list", attrs=attrs))
+
+    def close_list(self, tag, item_open):
+        if item_open:
+            self._stack.pop()
+        self._stack.pop()
+
+    def open_item(self, reference=None):
+        self._push(Node("item", attrs={"reference": reference} if reference else {}))
+
+    def close_item(self):
+        self._stack.pop()
+
+    def open_quote(self):
+        self._push(Node("quote"))
+
+    def close_quote(self):
+        self._stack.pop()
+
+    def open_table(self, aligns, header):
+        self._table = self._add(Node("table", attrs={"aligns": list(aligns), "header": header, "rows": []}))
+
+    def row(self, cells, aligns, cell_tag="td"):
+        self._table.attrs["rows"].append(cells)
+
+    def close_table(self):
+        self._table = None
+
+    def open_code(self, language=""):
+        self._code = self._add(Node("code", attrs={"language": language} if language else {}))
+        self._code_lines = []
+
+    def code_line(self, line):
+        self._code_lines.append(line + "\n")
+
+    def close_code(self):
+        self._code.text = "".join(self._code_lines)
+        self._code = None
+
+    def rule(self):
+        self._add(Node("rule"))
+
+def parse_document(markdown):
+    """Document tree of a report (markdown string or iterable of lines)"""
+    tree = TreeWriter()
+    renderer = MarkdownStreamRenderer(None, tree)
+    for line in (iter_lines(markdown) if isinstance(markdown, str) else markdown):
+        renderer.feed(line)
+    renderer.close()
+    return tree.root
+
+def document_sections(document):
+    """Top-level nodes grouped into sections at every # or ## heading"""
+    sections = []
+    for node in document.children:
+        if not sections or (node.kind == "heading" and node.attrs["level"] <= 2):
+            sections.append([])
+        sections[-1].append(node)
+    return sections
+
+# -- HTML -------------------------------------------------------------
+
+def replay(nodes, renderer):
+    """Write nodes through a MarkdownStreamRenderer's writer, with its heading anchors and TOC"""
+    writer = renderer.writer
+    for node in nodes:
+        kind = node.kind
+        if kind == "paragraph":
+            writer.paragraph(node.text)
+        elif kind == "text":
+            writer.paragraph(node.text, None)
+        elif kind == "heading":
+            level = node.attrs["level"]
+            writer.heading(level, renderer.add_heading(level, plain_text(node.text)), node.text)
+        elif kind == "list":
+            tag = "ol" if node.attrs.get("ordered") else "ul"
+            writer.open_list(tag, node.attrs.get("start"))
+            for i, item in enumerate(node.children):
+                if i:
+                    writer.close_item()
+                writer.open_item(item.attrs.get("reference"))
+                replay(item.children, renderer)
+            writer.close_list(tag, bool(node.children))
+        elif kind == "quote":
+            writer.open_quote()
+            replay(node.children, renderer)
+            writer.close_quote()
+        elif kind == "table":
+            aligns = node.attrs["aligns"]
+            writer.open_table(aligns, node.attrs["header"])
+            for cells in node.attrs["rows"]:
+                writer.row(cells, aligns)
+            writer.close_table()
+        elif kind == "code":
+            writer.open_code(node.attrs.get("language", ""))
+            for line in iter_lines(node.text):
+                writer.code_line(line)
+            writer.close_code()
+        elif kind == "rule":
+            writer.rule()
+
+def _section_digest(nodes):
+    key_material = json.dumps([node.to_dict() for node in nodes], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+def render_html(document, page, html_file, layout="report"):
+    """Patch html_file from the tree, re-rendering only changed sections"""
+    sections = document_sections(document)
+    markdown_head = None
+    first = document.children[0] if document.children else None
+    if first is not None and first.kind == "heading" and first.attrs["level"] == 1:
+        markdown_head = lambda renderer: replay([first], renderer)
+        sections[0] = sections[0][1:]
+    sections = [(_section_digest(nodes), lambda renderer, nodes=nodes: replay(nodes, renderer))
+                for nodes in sections if nodes]
+    key = renderer_digest(markdown_stream, sys.modules[__name__])
+    return patch_report(page, html_file, sections, markdown_head, key, layout)
+
+# -- Markdown ---------------------------------------------------------
+
+def _escape_cell(cell):
+    return cell.replace("|", "\\|")
+
+def _align_marker(align):
+    return {"center": ":---:", "right": "---:", "left": ":---"}.get(align, "---")
+
+def write_markdown_tree(nodes, write, indent=""):
+    """Canonical markdown for nodes; `indent` prefixes every line (nested list content)"""
+    for node in nodes:
+        kind = node.kind
+        if kind == "heading":
+            write(f"{indent}{'#' * node.attrs['level']} {node.text}\n\n")
+        elif kind in ("paragraph", "text"):
+            write(f"{indent}{node.text}\n\n")
+        elif kind == "list":
+            start = node.attrs.get("start", 1)
+            for i, item in enumerate(node.children):
+                marker = f"{start + i}." if node.attrs.get("ordered") else "-"
+                children = item.children
+                if children and children[0].kind == "text":
+                    write(f"{indent}{marker} {children[0].text}\n")
+                    children = children[1:]
+                else:
+                    write(f"{indent}{marker}\n")
+                for child in children:
+                    child_indent = indent + " " * (len(marker) + 1)
+                    if child.kind == "list":
+                        chunks = []
+                        write_markdown_tree([child], chunks.append, child_indent)
+                        write("".join(chunks).rstrip("\n") + "\n")
+                    else:
+                        write("\n")
+                        write_markdown_tree([child], write, child_indent)
+            write("\n")
+        elif kind == "quote":
+            paragraphs = [f"{indent}> {child.text}" for child in node.children]
+            write(f"\n{indent}>\n".join(paragraphs) + "\n\n")
+        elif kind == "table":
+            header = node.attrs["header"]
+            aligns = node.attrs["aligns"]
+            write(f"{indent}| {' | '.join(map(_escape_cell, header))} |\n")
+            write(f"{indent}| {' | '.join(_align_marker(align) for align in aligns)} |\n")
+            for cells in node.attrs["rows"]:
+                write(f"{indent}| {' | '.join(map(_escape_cell, cells))} |\n")
+            write("\n")
+        elif kind == "code":
+            fence = "```"
+            while fence in node.text:
+                fence += "`"
+            write(f"{indent}{fence}{node.attrs.get('language', '')}\n")
+            for line in iter_lines(node.text):
+                write(f"{indent}{line}\n")
+            write(f"{indent}{fence}\n\n")
+        elif kind == "rule":
+            write(f"{indent}---\n\n")
+
+def render_markdown(document):
+    chunks = []
+    write_markdown_tree(document.children, chunks.append)
+    return "".join(chunks).rstrip("\n") + "\n"
+
+# -- Plain text and JSON ----------------------------------------------
+
+def inline_text(text):
+    """Inline markdown as plain text (link text, code and citation numbers kept)"""
+    return html.unescape(HTML_TAG.sub("", render_inline(text)))
+
+def write_text_tree(nodes, write, indent=""):
+    for node in nodes:
+        kind = node.kind
+        if kind == "heading":
+            underline = {1: "=", 2: "-"}.get(node.attrs["level"])
+            write(f"{indent}{inline_text(node.text)}\n")
+            write(f"{indent}{underline * 40}\n\n" if underline else "\n")
+        elif kind in ("paragraph", "text"):
+            write(f"{indent}{inline_text(node.text)}\n\n")
+        elif kind == "list":
+            start = node.attrs.get("start", 1)
+            for i, item in enumerate(node.children):
+                marker = f"{start + i}." if node.attrs.get("ordered") else "•"
+                chunks = []
+                write_text_tree(item.children, chunks.append, indent + "   ")
+                body = "".join(chunks).strip()
+                write(f"{indent}{marker} {body}\n")
+            write("\n")
+        elif kind == "quote":
+            write_text_tree(node.children, write, indent + "    ")
+        elif kind == "table":
+            for cells in [node.attrs["header"]] + node.attrs["rows"]:
+                write(indent + "\t".join(inline_text(cell) for cell in cells) + "\n")
+            write("\n")
+        elif kind == "code":
+            for line in iter_lines(node.text):
+                write(f"{indent}    {line}\n")
+            write("\n")
+        elif kind == "rule":
+            write(f"{indent}{'-' * 40}\n\n")
+
+def render_text(document):
+    chunks = []
+    write_text_tree(document.children, chunks.append)
+    return "".join(chunks).rstrip("\n") + "\n"
+
+def render_json(document, page=None):
+    return json.dumps({
+        "title": getattr(page, "title", None),
+        "blocks": [node.to_dict() for node in document.children],
+    }, ensure_ascii=False)
+
+# -- Export -----------------------------------------------------------
+
+def _write_atomic(path, text):
+    """Write text in one buffered pass to a temporary file, then replace path"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb', buffering=WRITE_BUFFER_BYTES) as f:
+        f.write(text.encode('utf-8'))
+    os.replace(tmp_path, path)
+
+def export_format(fmt, document, page, path):
+    """Render one format of the document to path"""
+    if fmt == "markdown":
+        markdown = page.markdown if isinstance(page.markdown, str) else render_markdown(document)
+        write_markdown(path, markdown)
+    elif fmt == "html":
+        render_html(document, page, path)
+    elif fmt == "json":
+        _write_atomic(path, render_json(document, page))
+    elif fmt == "text":
+        _write_atomic(path, render_text(document))
+    else:
+        raise ValueError(f"unknown export format: {fmt}")
+    return path
+
+async def export_document(document, page, outputs):
+    """Render the document to every {format: path} in outputs, one worker thread per format"""
+    unknown = set(outputs) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"unknown export formats: {', '.join(sorted(unknown))}")
+    return list(await asyncio.gather(*(
+        asyncio.to_thread(export_format, fmt, document, page, path) for fmt, path in outputs.items()
+    )))
+
+async def export_report(page, outputs):
+    """Parse page.markdown once and export it to every {format: path} in outputs"""
+    return await export_document(parse_document(page.markdown), page, outputs)
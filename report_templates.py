@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Shared page layouts for the HTML reports
+Every HTML generator uses the same CSS and page layout. A layout is a plain
+Python function that writes the page through a write callable, so the report
+markdown can be streamed through markdown_stream in the middle of it. Pages are
+described by a ReportPage data model (title, stats, report markdown, sections,
+references) and written straight to the output file.
+"""
+
+import os
+import html
+import itertools
+from dataclasses import dataclass, field
+from markdown_stream import MarkdownStreamRenderer, HEADING, iter_lines, render_inline
+
+WRITE_BUFFER_BYTES = 1 << 16
+
+PAGE_CSS = """
+        body {
+            font-family: 'Microsoft YaHei', 'SimSun', Arial, sans-serif;
+            line-height: 1.6;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }
+        .page {
+            display: grid;
+            grid-template-columns: 260px minmax(0, 1fr);
+            grid-template-areas: "toc content";
+            gap: 20px;
+            max-width: 1480px;
+            margin: 0 auto;
+        }
+        .container {
+            grid-area: content;
+            background: white;
+            padding: 30px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .toc {
+            grid-area: toc;
+            align-self: start;
+            position: sticky;
+            top: 20px;
+            max-height: calc(100vh - 40px);
+            overflow-y: auto;
+            background: white;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            font-size: 0.9em;
+        }
+        .toc h2 { margin-top: 0; border: none; padding: 0; }
+        .toc ul { list-style: none; padding-left: 1em; margin: 0; }
+        .toc > ul { padding-left: 0; }
+        .toc a { color: #34495e; text-decoration: none; }
+        .toc a:hover { color: #3498db; }
+        h1 {
+            color: #2c3e50;
+            text-align: center;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 10px;
+        }
+        h2 {
+            color: #34495e;
+            border-left: 4px solid #3498db;
+            padding-left: 15px;
+            margin-top: 30px;
+        }
+        h3 {
+            color: #7f8c8d;
+            margin-top: 25px;
+        }
+        .stats {
+            display: flex;
+            justify-content: space-around;
+            margin: 20px 0;
+        }
+        .stat-box {
+            background: #3498db;
+            color: white;
+            padding: 20px;
+            border-radius: 5px;
+            text-align: center;
+            flex: 1;
+            margin: 0 10px;
+        }
+        .stat-box h3 { color: white; margin-top: 0; }
+        .stat-value { font-size: 2em; font-weight: bold; }
+        .summary {
+            background: #ecf0f1;
+            padding: 20px;
+            border-radius: 5px;
+            margin: 20px 0;
+        }
+        .summary h2 { margin-top: 0; }
+        .paper-list {
+            background: #f8f9fa;
+            padding: 15px;
+            border-radius: 5px;
+            margin: 10px 0;
+        }
+        .paper-item {
+            margin: 5px 0;
+            padding: 5px;
+            background: white;
+            border-radius: 3px;
+        }
+        .category-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 20px;
+            margin: 20px 0;
+        }
+        .category-card {
+            background: #e8f4f8;
+            padding: 15px;
+            border-radius: 5px;
+            border-left: 4px solid #3498db;
+        }
+        .category-title {
+            font-weight: bold;
+            color: #2c3e50;
+            margin-bottom: 10px;
+        }
+        .references {
+            background: #f8f9fa;
+            padding: 20px;
+            border-radius: 5px;
+            margin-top: 30px;
+        }
+        .report-file {
+            text-align: center;
+            margin: 40px 0;
+            padding: 20px;
+            background: #f8f9fa;
+            border-radius: 5px;
+        }
+        blockquote {
+            background: #e8f4f8;
+            margin: 20px 0;
+            padding: 10px 15px;
+            border-left: 4px solid #3498db;
+            border-radius: 5px;
+        }
+        pre {
+            background: #f8f9fa;
+            padding: 15px;
+            border-radius: 5px;
+            overflow-x: auto;
+        }
+        code { font-family: 'Courier New', monospace; }
+        .table-wrap { overflow-x: auto; margin: 20px 0; }
+        table { border-collapse: collapse; width: 100%; }
+        th, td { border: 1px solid #dee2e6; padding: 8px 12px; }
+        th { background: #ecf0f1; }
+        sup.cite a { color: #3498db; text-decoration: none; }
+        img { max-width: 100%; }
+        @media (max-width: 900px) {
+            .page { grid-template-columns: 1fr; grid-template-areas: "toc" "content"; }
+            .toc { position: static; max-height: none; }
+        }
+"""
+
+def toc_html(toc, title="目录", max_level=3):
+    """Nested list of links to the headings up to `max_level`"""
+    entries = [entry for entry in toc if entry[0] <= max_level]
+    if not entries:
+        return ""
+    parts = [f'<nav class="toc">\n<h2>{html.escape(title)}</h2>\n']
+    depth_stack = []
+    for level, anchor, text in entries:
+        while depth_stack and depth_stack[-1] > level:
+            parts.append("</li>\n</ul>\n")
+            depth_stack.pop()
+        if depth_stack and depth_stack[-1] == level:
+            parts.append("</li>\n")
+        else:
+            parts.append("<ul>\n")
+            depth_stack.append(level)
+        parts.append(f'<li><a href="#{anchor}">{html.escape(text)}</a>')
+    parts.append("</li>\n</ul>\n" * len(depth_stack))
+    parts.append("</nav>")
+    return "".join(parts)
+
+@dataclass
+class Stat:
+    label: str
+    value: object
+    note: str = None
+
+@dataclass
+class Section:
+    """A written page section; paragraphs, items and card paragraphs are inline markdown"""
+
+    title: str
+    paragraphs: list = field(default_factory=list)
+    items: list = field(default_factory=list)
+    papers: list = field(default_factory=list)
+    cards: list = field(default_factory=list)
+    subsections: list = field(default_factory=list)
+    style: str = None
+
+@dataclass
+class ReportPage:
+    """Everything a report page shows; `markdown` is a string or any iterable of lines"""
+
+    title: str
+    markdown: object = None
+    stats: list = field(default_factory=list)
+    sections: list = field(default_factory=list)
+    references: list = field(default_factory=list)
+    references_title: str = "参考文献"
+    report_file: str = None
+    report_file_note: str = None
+    lang: str = "zh-CN"
+    toc_title: str = "目录"
+
+def _text(value):
+    return html.escape(str(value))
+
+def write_section_body(write, block):
+    """Paragraphs, items, papers and cards of a Section (or subsection)"""
+    for paragraph in block.paragraphs:
+        write(f"<p>{render_inline(paragraph)}</p>\n")
+    if block.items:
+        write("<ul>\n")
+        for item in block.items:
+            write(f"<li>{render_inline(item)}</li>\n")
+        write("</ul>\n")
+    if block.papers:
+        write('<div class="paper-list">\n')
+        for paper in block.papers:
+            write(f'    <div class="paper-item">• {_text(paper)}</div>\n')
+        write("</div>\n")
+    if block.cards:
+        write('<div class="category-grid">\n')
+        for card in block.cards:
+            write('    <div class="category-card">\n'
+                  f'        <div class="category-title">{_text(card.title)}</div>\n'
+                  '        <div class="paper-list">\n')
+            for paper in card.papers:
+                write(f'            <div class="paper-item">• {_text(paper)}</div>\n')
+            for paragraph in card.paragraphs:
+                write(f'            <div class="paper-item"><em>{render_inline(paragraph)}</em></div>\n')
+            write("        </div>\n"
+                  "    </div>\n")
+        write("</div>\n")
+
+def report_layout(write, page, anchor, toc, markdown_body, markdown_head=None):
+    """The report page: stats, the report markdown, written sections, references and the TOC sidebar
+
+    markdown_body(write) fills the report markdown slot; markdown_head(write), if
+    given, writes the markdown's own # title in place of the page title.
+    """
+    write(f"""<!DOCTYPE html>
+<html lang="{_text(page.lang)}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{_text(page.title)}</title>
+    <style>{PAGE_CSS}    </style>
+</head>
+<body>
+<div class="page">
+<main class="container">
+""")
+    if markdown_head is not None:
+        markdown_head(write)
+    else:
+        write(f'<h1 id="{_text(anchor(1, page.title))}">{_text(page.title)}</h1>\n')
+
+    if page.stats:
+        write('<div class="stats">\n')
+        for stat in page.stats:
+            write('    <div class="stat-box">\n'
+                  f'        <h3>{_text(stat.label)}</h3>\n'
+                  f'        <div class="stat-value">{_text(stat.value)}</div>\n')
+            if stat.note:
+                write(f'        <small>{_text(stat.note)}</small>\n')
+            write("    </div>\n")
+        write("</div>\n")
+
+    markdown_body(write)
+
+    for section in page.sections:
+        style = f" {_text(section.style)}" if section.style else ""
+        write(f'<div class="section{style}">\n'
+              f'<h2 id="{_text(anchor(2, section.title))}">{_text(section.title)}</h2>\n')
+        write_section_body(write, section)
+        for subsection in section.subsections:
+            write(f'<h3 id="{_text(anchor(3, subsection.title))}">{_text(subsection.title)}</h3>\n')
+            write_section_body(write, subsection)
+        write("</div>\n")
+
+    if page.references:
+        write('<div class="references">\n'
+              f'<h2 id="{_text(anchor(2, page.references_title))}">{_text(page.references_title)}</h2>\n'
+              "<ol>\n")
+        for number, reference in enumerate(page.references, 1):
+            write(f'<li id="ref-{number}">{render_inline(reference)}</li>\n')
+        write("</ol>\n"
+              "</div>\n")
+
+    if page.report_file:
+        write('<div class="report-file">\n'
+              "    <h3>📄 完整报告文件</h3>\n"
+              f"    <p><code>{_text(page.report_file)}</code></p>\n")
+        if page.report_file_note:
+            write(f"    <p>{_text(page.report_file_note)}</p>\n")
+        write("</div>\n")
+
+    write(f"""</main>
+{toc_html(toc, page.toc_title)}
+</div>
+</body>
+</html>
+""")
+
+# Layouts render_page() can use for a ReportPage
+LAYOUTS = {
+    "report": report_layout,
+}
+
+def render_site_index(write, lang, title, css_href, script_href, index_href, search_placeholder, reviews):
+    """Front page of the static site: the list of reviews and the search box"""
+    write(f"""<!DOCTYPE html>
+<html lang="{_text(lang)}">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{_text(title)}</title>
+    <link rel="stylesheet" href="{_text(css_href)}">
+</head>
+<body>
+<main class="container site-index">
+<h1>{_text(title)}</h1>
+<div class="site-search">
+    <input type="search" id="site-search" placeholder="{_text(search_placeholder)}" autocomplete="off" data-index="{_text(index_href)}">
+    <ol id="site-search-results" class="search-results"></ol>
+</div>
+<div class="paper-list">
+""")
+    for review in reviews:
+        write(f'    <div class="paper-item"><a href="{_text(review.href)}">{_text(review.title)}</a> '
+              f"<small>{_text(review.updated)} · {_text(review.sections)} 节</small></div>\n")
+    write(f"""</div>
+</main>
+<script src="{_text(script_href)}" defer></script>
+</body>
+</html>
+""")
+
+def split_title(markdown):
+    """(leading lines, remaining lines, whether the leading lines are the report's own # title)"""
+    if markdown is None:
+        lines = iter(())
+    else:
+        lines = iter_lines(markdown) if isinstance(markdown, str) else iter(markdown)
+    leading = []
+    for line in lines:
+        leading.append(line)
+        if line.strip():
+            break
+    has_title = bool(leading) and leading[-1].lstrip().startswith("# ") and HEADING.match(leading[-1]) is not None
+    return leading, lines, has_title
+
+def render_page(page, write, renderer, markdown_body, markdown_head=None, layout="report"):
+    """Render a layout for `page`; markdown_body(write) fills the report markdown slot and
+    markdown_head(write), if given, writes the markdown's own # title in place of the page title"""
+    LAYOUTS[layout](write, page, renderer.add_heading, renderer.toc, markdown_body, markdown_head)
+
+def render_report(page, html_file, layout="report"):
+    """Stream a ReportPage into html_file (atomically replaced); returns the table of contents"""
+    leading, lines, has_title = split_title(page.markdown)
+
+    tmp_path = html_file + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_BYTES) as out:
+        renderer = MarkdownStreamRenderer(out)
+
+        def markdown_head(write):
+            for line in leading:
+                renderer.feed(line)
+
+        def markdown_body(write):
+            for line in (lines if has_title else itertools.chain(leading, lines)):
+                renderer.feed(line)
+            renderer.close()
+
+        render_page(page, out.write, renderer, markdown_body, markdown_head if has_title else None, layout)
+    os.replace(tmp_path, html_file)
+    return renderer.toc
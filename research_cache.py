@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache for conduct_research / write_report results
+Entries are keyed by a hash of the query, report settings, LLM configuration
+and document set, expire after a TTL and are evicted LRU beyond a size bound.
+Research checkpoints keep the state gathered by conduct_research() until the
+report is written, so a failed write_report() resumes without re-searching.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from paper_manifest import CACHE_DIR
+
+RESULT_CACHE_DIR = os.path.join(CACHE_DIR, "results")
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "checkpoints")
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+CHECKPOINT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Researcher state produced by conduct_research() and read by write_report()
+RESEARCH_STATE_FIELDS = ("context", "visited_urls", "research_sources", "research_images")
+
+def research_state(researcher):
+    """JSON-serializable copy of the researcher state gathered by conduct_research()"""
+    return {
+        field: list(value) if isinstance(value, set) else value
+        for field, value in ((field, getattr(researcher, field, None)) for field in RESEARCH_STATE_FIELDS)
+        if value is not None
+    }
+
+def restore_research_state(researcher, state):
+    for field, value in state.items():
+        setattr(researcher, field, set(value) if field == "visited_urls" else value)
+
+def research_cache_key(query, report_type, tone, documents=None, llm_settings=None):
+    """Stable hash of everything that determines a research result
+
+    documents may be paths, manifest entries (hashed by sha256) or None.
+    llm_settings defaults to the FAST_LLM / SMART_LLM / EMBEDDING environment.
+    """
+    if llm_settings is None:
+        llm_settings = {name: os.getenv(name) for name in ("FAST_LLM", "SMART_LLM", "EMBEDDING")}
+
+    document_ids = []
+    for document in documents or []:
+        if isinstance(document, dict):
+            document_ids.append(document["sha256"])
+        else:
+            document_ids.append(str(document))
+
+    key_material = json.dumps({
+        "query": query.strip(),
+        "report_type": report_type,
+        "tone": str(getattr(tone, "name", tone)),
+        "llm": llm_settings,
+        "documents": sorted(document_ids),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+class ResearchCache:
+    """Disk-backed result cache with TTL and size-bounded LRU eviction
+
+    Values are JSON files; their index (created, accessed, size) is a SQLite
+    table, so concurrent jobs and processes sharing a directory update single
+    rows instead of overwriting each other's copy of the whole index.
+    """
+
+    def __init__(self, cache_dir=RESULT_CACHE_DIR, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), timeout=30, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self.db.commit()
+        self._lock = threading.Lock()
+        self._import_json_index()
+
+    def _import_json_index(self):
+        """Adopt entries recorded in the index.json of earlier versions"""
+        legacy_path = os.path.join(self.cache_dir, "index.json")
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO entries (key, created, accessed, size) VALUES (?, ?, ?, ?)",
+                [(key, meta["created"], meta["accessed"], meta["size"]) for key, meta in legacy.items()]
+            )
+            self.db.commit()
+        os.remove(legacy_path)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _remove(self, key):
+        """Drop an entry (caller holds the lock and commits)"""
+        self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        try:
+            os.remove(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self):
+        with self._lock:
+            return [key for (key,) in self.db.execute("SELECT key FROM entries")]
+
+    def _read(self, key, touch):
+        with self._lock:
+            row = self.db.execute("SELECT created FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        expired = self.ttl_seconds is not None and now - row[0] > self.ttl_seconds
+        value = None
+        if not expired:
+            try:
+                with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                    value = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+        with self._lock:
+            if value is None:
+                self._remove(key)
+            elif touch:
+                self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            else:
+                return value
+            self.db.commit()
+        return value
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        return self._read(key, touch=True)
+
+    def peek(self, key):
+        """Like get(), but without counting as a use for LRU eviction"""
+        return self._read(key, touch=False)
+
+    def touch(self, key):
+        """Count a use of the entry for LRU eviction without reading it"""
+        with self._lock:
+            self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+            self.db.commit()
+
+    def put(self, key, value):
+        """Store a JSON-serializable value and evict least recently used entries"""
+        payload = json.dumps(value, ensure_ascii=False)
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, entry_path)
+
+        now = time.time()
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO entries (key, created, accessed, size) VALUES (?, ?, ?, ?)",
+                    (key, now, now, len(payload.encode('utf-8')))
+                )
+                self._evict()
+                self.db.commit()
+            except BaseException:
+                self.db.rollback()
+                raise
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            total -= size
+            self._remove(key)
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def research_cache(cache_dir=RESULT_CACHE_DIR, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+    """Process-wide cache for a directory"""
+    key = (os.path.abspath(cache_dir), ttl_seconds, max_bytes)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = ResearchCache(cache_dir, ttl_seconds, max_bytes)
+        return _caches[key]
+
+class ResearchCheckpoint:
+    """Intermediate results of one run, kept on disk until the run completes"""
+
+    def __init__(self, key, store=None, resume=True):
+        self.key = key
+        self.resume = resume
+        self.store = store or research_cache(CHECKPOINT_DIR, ttl_seconds=CHECKPOINT_TTL_SECONDS)
+        self.state = (self.store.get(key) if resume else None) or {}
+
+    def get(self, name):
+        return self.state.get(name)
+
+    def put(self, name, value):
+        self.state[name] = value
+        try:
+            self.store.put(self.key, self.state)
+        except (TypeError, ValueError) as e:
+            self.state.pop(name)
+            print(f"⚠️  Could not checkpoint {name}: {e}")
+
+    async def conduct_research(self, researcher, name="research"):
+        """Run conduct_research(), or restore its state from an earlier interrupted run"""
+        saved = self.get(name)
+        if saved is not None:
+            restore_research_state(researcher, saved)
+            print(f"⏯️  Resuming {name} from checkpoint (search and scraping skipped)")
+            return
+
+        from semantic_cache import conduct_research  # imports this module
+        await conduct_research(researcher, refresh=not self.resume)
+        self.put(name, research_state(researcher))
+
+    def clear(self):
+        self.state = {}
+        self.store.delete(self.key)
+
+async def run_cached_research(researcher, cache_key, cache=None, refresh=False):
+    """Run conduct_research + write_report, reusing a cached report when possible
+
+    The research state is checkpointed, so if write_report fails the next
+    run resumes from it instead of repeating the search and scraping.
+    """
+    cache = cache or research_cache()
+
+    if not refresh:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            print("♻️  Using cached research result (pass --refresh to re-run)")
+            return cached["report"]
+
+    checkpoint = ResearchCheckpoint(cache_key, resume=not refresh)
+    print("🌐 Conducting research...")
+    await checkpoint.conduct_research(researcher)
+
+    print("📝 Writing report...")
+    report = await researcher.write_report()
+
+    cache.put(cache_key, {
+        "report": report,
+        "context": researcher.get_research_context(),
+        "source_urls": list(researcher.get_source_urls()),
+    })
+    checkpoint.clear()
+    return report
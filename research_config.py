@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Job-scoped LLM / provider configuration for GPT-Researcher
+Each researcher carries its own model and API key setup instead of reading
+process-global os.environ, so reviews with different provider mixes can run
+concurrently in one event loop
+"""
+
+import os
+from dataclasses import dataclass, replace
+
+GEMINI_FLASH = "google_genai:gemini-2.0-flash-exp"
+KIMI_K2 = "kimi:kimi-k2"
+OPENAI_EMBEDDING = "openai:text-embedding-3-small"
+
+@dataclass(frozen=True)
+class ResearchJobConfig:
+    """Models and credentials used by one research job"""
+
+    fast_llm: str = GEMINI_FLASH
+    smart_llm: str = KIMI_K2
+    embedding: str = OPENAI_EMBEDDING
+    google_api_key: str = None
+    openai_api_key: str = None
+    openai_base_url: str = None
+    tavily_api_key: str = None
+    tavily_base_url: str = None
+    mock_provider_url: str = None
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """Read API keys from the environment (.env); KIMI is accessed through the OpenAI-compatible key
+
+        With MOCK_PROVIDER_URL set, every provider is served by mock_provider_server;
+        with CASSETTE_MODE=replay, missing keys get placeholders since no request leaves the process.
+        """
+        config = cls(
+            google_api_key=os.getenv("GOOGLE_API_KEY"),
+            openai_api_key=os.getenv("KIMI_API_KEY") or os.getenv("OPENAI_API_KEY"),
+            openai_base_url=os.getenv("OPENAI_BASE_URL"),
+            tavily_api_key=os.getenv("TAVILY_API_KEY"),
+            tavily_base_url=os.getenv("TAVILY_BASE_URL"),
+        )
+
+        mock_url = os.getenv("MOCK_PROVIDER_URL")
+        if mock_url:
+            mock_url = mock_url.rstrip("/")
+            config = replace(
+                config,
+                openai_api_key="mock",
+                openai_base_url=f"{mock_url}/v1",
+                tavily_api_key="mock",
+                tavily_base_url=f"{mock_url}/search",
+                mock_provider_url=mock_url,
+            )
+        if os.getenv("CASSETTE") and os.getenv("CASSETTE_MODE") == "replay":
+            config = replace(
+                config,
+                google_api_key=config.google_api_key or "replay",
+                openai_api_key=config.openai_api_key or "replay",
+                tavily_api_key=config.tavily_api_key or "replay",
+            )
+        return replace(config, **overrides).routed()
+
+    def routed(self):
+        """Under the mock provider, serve every model through its OpenAI-compatible API"""
+        if not self.mock_provider_url:
+            return self
+
+        def to_mock(llm):
+            return "openai:" + llm.split(":", 1)[1]
+
+        return replace(
+            self,
+            fast_llm=to_mock(self.fast_llm),
+            smart_llm=to_mock(self.smart_llm),
+            embedding=to_mock(self.embedding),
+        )
+
+    def with_models(self, fast_llm=None, smart_llm=None, embedding=None):
+        """Copy of this configuration with a different model mix"""
+        return replace(
+            self,
+            fast_llm=fast_llm or self.fast_llm,
+            smart_llm=smart_llm or self.smart_llm,
+            embedding=embedding or self.embedding,
+        ).routed()
+
+    def llm_settings(self):
+        """Model settings in the FAST_LLM / SMART_LLM / EMBEDDING form"""
+        return {"FAST_LLM": self.fast_llm, "SMART_LLM": self.smart_llm, "EMBEDDING": self.embedding}
+
+    def provider_kwargs(self, provider):
+        """Credentials to pass to a LangChain chat or embedding client"""
+        kwargs = {}
+        if provider == "google_genai":
+            if self.google_api_key:
+                kwargs["google_api_key"] = self.google_api_key
+        elif provider in ("openai", "kimi"):
+            if self.openai_api_key:
+                kwargs["openai_api_key"] = self.openai_api_key
+            if self.openai_base_url:
+                kwargs["openai_api_base"] = self.openai_base_url
+        return kwargs
+
+    def headers(self):
+        """Per-researcher headers; GPT-Researcher retrievers read their keys from here first"""
+        headers = {}
+        if self.tavily_api_key:
+            headers["tavily_api_key"] = self.tavily_api_key
+        return headers
+
+    def apply(self, researcher):
+        """Bind this configuration to a GPTResearcher instance"""
+        from gpt_researcher.memory import Memory
+
+        cfg = researcher.cfg
+        for prefix, llm in (("fast", self.fast_llm), ("smart", self.smart_llm), ("strategic", self.smart_llm)):
+            provider, model = llm.split(":", 1)
+            setattr(cfg, f"{prefix}_llm", llm)
+            setattr(cfg, f"{prefix}_llm_provider", provider)
+            setattr(cfg, f"{prefix}_llm_model", model)
+
+        embedding_provider, embedding_model = self.embedding.split(":", 1)
+        cfg.embedding = self.embedding
+        cfg.embedding_provider = embedding_provider
+        cfg.embedding_model = embedding_model
+        cfg.embedding_kwargs = dict(cfg.embedding_kwargs or {}, **self.provider_kwargs(embedding_provider))
+        researcher.memory = Memory(embedding_provider, embedding_model, **cfg.embedding_kwargs)
+
+        researcher.job_config = self
+        return researcher
+
+def _install_hooks():
+    from provider_hooks import install_provider_hooks
+    from http_pool import install_http_pool
+    from cassettes import install_cassette_from_env
+    from model_router import install_model_router
+    from resilience import install_resilience
+    from rate_limiter import install_rate_limiter
+    from semantic_cache import install_semantic_cache
+
+    install_provider_hooks()
+    install_http_pool()
+    install_cassette_from_env()  # before the limiter, so replayed calls are not throttled
+    install_model_router()  # before the limiter, so a throttled model can be hedged
+    install_resilience()  # before the limiter, so every retry waits for its own quota
+    install_rate_limiter()
+    install_semantic_cache()
+
+def create_researcher(config, **kwargs):
+    """Create a GPTResearcher whose LLM calls use the given job configuration"""
+    from gpt_researcher import GPTResearcher
+    from provider_hooks import bind_job_config, job_scope
+
+    _install_hooks()
+    headers = dict(config.headers(), **(kwargs.pop("headers", None) or {}))
+    with job_scope(config):  # the researcher builds its Memory and embeddings client here
+        researcher = GPTResearcher(headers=headers, **kwargs)
+    config.apply(researcher)
+    return bind_job_config(researcher, config)
+
+async def create_job_chat_completion(config, messages, llm="fast", **kwargs):
+    """Call the job's FAST_LLM or SMART_LLM directly, outside of a researcher"""
+    from gpt_researcher.utils.llm import create_chat_completion
+    from provider_hooks import job_scope
+
+    _install_hooks()
+    provider, model = (config.smart_llm if llm == "smart" else config.fast_llm).split(":", 1)
+    with job_scope(config):
+        return await create_chat_completion(
+            messages=messages,
+            model=model,
+            llm_provider=provider,
+            llm_kwargs=config.provider_kwargs(provider),
+            **kwargs
+        )
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Per-call retries and per-provider circuit breakers
+Transient provider failures (429, 5xx, timeouts, dropped connections) are
+retried with jittered exponential backoff instead of failing the whole
+review. A provider that keeps failing trips its circuit breaker, so further
+calls fail fast (and can be hedged elsewhere) until a cool-down has passed.
+Scrape calls have one breaker per site, so a few slow hosts do not block
+scraping everywhere else.
+
+Tune with PROVIDER_RETRIES (attempts per call, default 4), RETRY_BASE_DELAY
+and RETRY_MAX_DELAY (seconds), BREAKER_THRESHOLD (consecutive failures,
+default 5) and BREAKER_COOLDOWN (seconds, default 30).
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from urllib.parse import urlparse
+from provider_hooks import add_provider_middleware, remove_provider_middleware
+from rate_limiter import is_rate_limit_error
+
+DEFAULT_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 30.0
+
+_TRANSIENT_MARKERS = (
+    "timeout", "timed out", "temporarily unavailable", "service unavailable", "bad gateway",
+    "gateway timeout", "connection reset", "connection aborted", "connection error",
+    "server disconnected", "overloaded", "internal server error",
+)
+# Client library exceptions (openai, httpx, google-api-core) that do not subclass the builtin ones
+_TRANSIENT_TYPES = (
+    "APITimeoutError", "APIConnectionError", "InternalServerError", "TimeoutException", "TransportError",
+    "ServiceUnavailable", "DeadlineExceeded",
+)
+
+class CircuitOpenError(RuntimeError):
+    """The provider's circuit breaker is open; the call was not attempted"""
+
+def status_code(error):
+    """HTTP status of a failed call, from the exception or its response, or None"""
+    for source in (error, getattr(error, "response", None)):
+        for name in ("status_code", "code", "status"):
+            status = getattr(source, name, None)
+            if isinstance(status, int) and not isinstance(status, bool):
+                return status
+    return None
+
+def is_transient_error(error):
+    """Whether a failed provider call is worth retrying"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)) or is_rate_limit_error(error):
+        return True
+    if any(cls.__name__ in _TRANSIENT_TYPES for cls in type(error).__mro__):
+        return True
+    status = status_code(error)
+    if status is not None:
+        return status >= 500
+    message = str(error).lower()
+    return any(marker in message for marker in _TRANSIENT_MARKERS)
+
+def backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)"""
+    return random.uniform(0.0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+class CircuitBreaker:
+    """Closed -> open after `threshold` consecutive failures -> half-open after `cooldown`"""
+
+    def __init__(self, threshold=DEFAULT_BREAKER_THRESHOLD, cooldown=DEFAULT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def before_call(self, provider):
+        """Admit a call or raise CircuitOpenError; returns True if the call is the half-open trial"""
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self.trial_running):
+                raise CircuitOpenError(f"circuit breaker open for {provider} after {self.failures} failures")
+            if state == "half-open":
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+    def release_trial(self):
+        """The half-open trial call was abandoned (e.g. cancelled); let the next call try again"""
+        with self._lock:
+            self.trial_running = False
+
+def breaker_key(call):
+    """Breaker name for a call: its provider, or the site for scrape calls"""
+    if call.kind == "scrape":
+        return f"{call.provider}:{urlparse(str(call.payload)).hostname or 'unknown'}"
+    return call.provider
+
+class ResilientCalls:
+    """Provider middleware: retry transient failures, guarded by a breaker per provider (or scraped site)"""
+
+    def __init__(self, attempts=DEFAULT_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+                 breaker_threshold=DEFAULT_BREAKER_THRESHOLD, breaker_cooldown=DEFAULT_BREAKER_COOLDOWN):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.breakers = {}
+        self.retries = 0
+
+    def breaker(self, key):
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+        return self.breakers[key]
+
+    async def __call__(self, call, proceed):
+        key = breaker_key(call)
+        breaker = self.breaker(key)
+        for attempt in range(1, self.attempts + 1):
+            trial = breaker.before_call(key)
+            try:
+                result = await proceed()
+            except Exception as e:
+                if not is_transient_error(e):
+                    # The request itself was bad: says nothing about the provider's health
+                    if trial:
+                        breaker.release_trial()
+                    raise
+                breaker.record_failure()
+                if attempt == self.attempts:
+                    raise
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                self.retries += 1
+                print(f"⚠️  {call.kind} call to {call.provider} failed ({e}); "
+                      f"retry {attempt}/{self.attempts - 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                if trial:
+                    breaker.release_trial()  # cancelled, e.g. a hedged call that lost: neither success nor failure
+                raise
+            breaker.record_success()
+            return result
+
+_resilience = None
+
+def install_resilience(resilience=None):
+    """Install the process-wide retry / circuit breaker middleware (idempotent) and return it"""
+    global _resilience
+    if _resilience is None:
+        _resilience = resilience or ResilientCalls(
+            attempts=int(os.getenv("PROVIDER_RETRIES", DEFAULT_ATTEMPTS)),
+            base_delay=float(os.getenv("RETRY_BASE_DELAY", DEFAULT_BASE_DELAY)),
+            max_delay=float(os.getenv("RETRY_MAX_DELAY", DEFAULT_MAX_DELAY)),
+            breaker_threshold=int(os.getenv("BREAKER_THRESHOLD", DEFAULT_BREAKER_THRESHOLD)),
+            breaker_cooldown=float(os.getenv("BREAKER_COOLDOWN", DEFAULT_BREAKER_COOLDOWN)),
+        )
+        add_provider_middleware(_resilience)
+    return _resilience
+
+def uninstall_resilience():
+    global _resilience
+    if _resilience is not None:
+        remove_provider_middleware(_resilience)
+        _resilience = None
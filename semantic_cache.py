@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Semantic cache of research contexts for near-duplicate queries
+Each conduct_research() run is stored with the embedding of its query and of
+every sub-query GPT-Researcher planned for it. A later query whose embedding is
+close enough to an earlier one reuses that research outright; otherwise each
+planned sub-query that an earlier run already covered reuses its context and
+sources, and only the uncovered sub-topics are searched and scraped.
+
+Research is only shared between runs over the same sources (web or the same
+document set) and the same embedding model. SEMANTIC_CACHE=false disables it;
+SEMANTIC_CACHE_THRESHOLD (default 0.92) and SEMANTIC_SUBTOPIC_THRESHOLD
+(default 0.85) are cosine similarities.
+"""
+
+import os
+import re
+import json
+import hashlib
+import contextvars
+import numpy as np
+from paper_manifest import CACHE_DIR
+from provider_hooks import job_scope
+from research_cache import research_cache, research_state, restore_research_state
+
+SEMANTIC_CACHE_DIR = os.path.join(CACHE_DIR, "semantic")
+DEFAULT_QUERY_THRESHOLD = 0.92
+DEFAULT_SUBTOPIC_THRESHOLD = 0.85
+SOURCE_LINE = re.compile(r"^Source: (\S+)", re.MULTILINE)  # GPT-Researcher's context format
+
+_current_run = contextvars.ContextVar("semantic_research_run", default=None)
+
+def semantic_cache_enabled():
+    return os.getenv("SEMANTIC_CACHE", "true").lower() not in ("0", "false", "no")
+
+def research_scope(researcher):
+    """Hash of what makes two research contexts interchangeable: sources and embedding model"""
+    memory = getattr(researcher, "memory", None)
+    document_ids = []
+    for document in getattr(researcher, "documents", None) or []:
+        if isinstance(document, dict):
+            document_ids.append(document.get("sha256") or json.dumps(document, sort_keys=True, ensure_ascii=False))
+        else:
+            document_ids.append(str(getattr(document, "page_content", document)))
+    key_material = json.dumps({
+        "source": str(getattr(researcher, "report_source", "web")),
+        "documents": sorted(hashlib.sha256(text.encode('utf-8')).hexdigest() for text in document_ids),
+        "embedding": f"{getattr(memory, 'hook_provider', 'unknown')}:{getattr(memory, 'hook_model', 'unknown')}",
+    }, sort_keys=True)
+    return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+def _normalized(vectors):
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+async def embed_texts(researcher, texts):
+    """Unit-length embeddings of texts with the researcher's embedding model"""
+    embeddings = researcher.memory.get_embeddings()
+    if hasattr(embeddings, "aembed_documents_array"):
+        return _normalized(await embeddings.aembed_documents_array(texts))
+    return _normalized(await embeddings.aembed_documents(texts))
+
+class SemanticResearchCache:
+    """Earlier research runs, searchable by query and sub-query similarity"""
+
+    def __init__(self, store=None, query_threshold=None, subtopic_threshold=None):
+        self.store = store or research_cache(SEMANTIC_CACHE_DIR)
+        self.query_threshold = query_threshold or float(
+            os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_QUERY_THRESHOLD))
+        self.subtopic_threshold = subtopic_threshold or float(
+            os.getenv("SEMANTIC_SUBTOPIC_THRESHOLD", DEFAULT_SUBTOPIC_THRESHOLD))
+        self._entries = None
+
+    def entries(self, scope):
+        """Cached runs of one scope (loaded once per process)
+
+        Loading is not a use: peek() leaves the LRU order alone, and only a
+        reused run is marked as used (see touch()).
+        """
+        if self._entries is None:
+            self._entries = [entry for entry in map(self.store.peek, self.store.keys()) if entry]
+        return [entry for entry in self._entries if entry["scope"] == scope]
+
+    def nearest_query(self, scope, vector):
+        """(entry, similarity) of the most similar earlier query, or (None, 0.0)"""
+        entries = self.entries(scope)
+        if not entries:
+            return None, 0.0
+        similarities = _normalized([entry["vector"] for entry in entries]) @ vector
+        best = int(np.argmax(similarities))
+        return entries[best], float(similarities[best])
+
+    def nearest_subtopic(self, scope, vector):
+        """(sub-topic record, similarity) of the closest earlier sub-query, or (None, 0.0)"""
+        subtopics = [subtopic for entry in self.entries(scope) for subtopic in entry["subtopics"]]
+        if not subtopics:
+            return None, 0.0
+        similarities = _normalized([subtopic["vector"] for subtopic in subtopics]) @ vector
+        best = int(np.argmax(similarities))
+        return subtopics[best], float(similarities[best])
+
+    @staticmethod
+    def entry_key(scope, query):
+        return hashlib.sha256(f"{scope}\n{query.strip()}".encode('utf-8')).hexdigest()
+
+    def touch(self, entry):
+        """Mark a reused run as recently used, so eviction keeps it"""
+        self.store.touch(self.entry_key(entry["scope"], entry["query"]))
+
+    def put(self, scope, query, vector, state, subtopics):
+        entry = {"scope": scope, "query": query, "vector": vector.tolist(), "state": state, "subtopics": subtopics}
+        self.store.put(self.entry_key(scope, query), entry)
+        if self._entries is not None:
+            self._entries = [existing for existing in self._entries
+                             if (existing["scope"], existing["query"]) != (scope, query)] + [entry]
+
+class SemanticRun:
+    """Sub-queries researched (or reused) during one conduct_research() call"""
+
+    def __init__(self, cache, scope, researcher, reuse=True):
+        self.cache = cache
+        self.scope = scope
+        self.researcher = researcher
+        self.reuse = reuse
+        self.subtopics = []
+        self.reused = 0
+
+    async def process_sub_query(self, sub_query, research):
+        """Cached context for a covered sub-query, otherwise research() and remember its result"""
+        vector = (await embed_texts(self.researcher, [sub_query]))[0]
+        cached, similarity = self.cache.nearest_subtopic(self.scope, vector)
+        visited = getattr(self.researcher, "visited_urls", None)
+        if self.reuse and cached is not None and similarity >= self.cache.subtopic_threshold:
+            self.reused += 1
+            print(f"🧠 Sub-topic '{sub_query}' already covered by '{cached['query']}' ({similarity:.2f})")
+            if isinstance(visited, set):
+                visited.update(cached["urls"])
+            self.subtopics.append(dict(cached, query=sub_query, vector=vector.tolist()))
+            return cached["context"]
+
+        before = set(visited) if isinstance(visited, set) else set()
+        context = await research()
+        if isinstance(context, str) and context:
+            # Sub-queries run concurrently, so the visited_urls diff may include siblings' sources
+            urls = SOURCE_LINE.findall(context) or sorted(set(getattr(self.researcher, "visited_urls", None) or ()) - before)
+            self.subtopics.append({"query": sub_query, "vector": vector.tolist(), "context": context, "urls": urls})
+        return context
+
+_cache = None
+
+def semantic_cache():
+    global _cache
+    if _cache is None:
+        _cache = SemanticResearchCache()
+    return _cache
+
+async def conduct_research(researcher, refresh=False, cache=None):
+    """researcher.conduct_research(), reusing earlier research for similar queries and sub-topics"""
+    if not semantic_cache_enabled() or getattr(researcher, "memory", None) is None:
+        return await researcher.conduct_research()
+
+    cache = cache or semantic_cache()
+    scope = research_scope(researcher)
+    with job_scope(getattr(researcher, "job_config", None)):
+        vector = (await embed_texts(researcher, [researcher.query]))[0]
+
+    if not refresh:
+        entry, similarity = cache.nearest_query(scope, vector)
+        if entry is not None and similarity >= cache.query_threshold:
+            restore_research_state(researcher, entry["state"])
+            cache.touch(entry)
+            print(f"🧠 Reusing research for similar query '{entry['query']}' ({similarity:.2f})")
+            return researcher.context
+
+    run = SemanticRun(cache, scope, researcher, reuse=not refresh)
+    token = _current_run.set(run)
+    try:
+        context = await researcher.conduct_research()
+    finally:
+        _current_run.reset(token)
+    if run.reused:
+        print(f"🧠 Reused {run.reused} covered sub-topics from earlier research")
+
+    try:
+        cache.put(scope, researcher.query, vector, research_state(researcher), run.subtopics)
+    except (TypeError, ValueError) as e:
+        print(f"⚠️  Could not store research in the semantic cache: {e}")
+    return context
+
+def install_semantic_cache():
+    """Route GPT-Researcher's per-sub-query research through the active semantic run (idempotent)"""
+    from gpt_researcher.skills.researcher import ResearchConductor
+
+    original_process_sub_query = ResearchConductor._process_sub_query
+    if getattr(original_process_sub_query, "uses_semantic_cache", False):
+        return
+
+    async def process_sub_query(self, sub_query, *args, **kwargs):
+        run = _current_run.get()
+        research = lambda: original_process_sub_query(self, sub_query, *args, **kwargs)
+        if run is None or run.researcher is not getattr(self, "researcher", None):
+            return await research()
+        return await run.process_sub_query(sub_query, research)
+
+    process_sub_query.uses_semantic_cache = True
+    ResearchConductor._process_sub_query = process_sub_query
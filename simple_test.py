@@ -3,34 +3,32 @@
 Simple test for GPT-Researcher with Gemini
 """
 
-import os
 import asyncio
 from dotenv import load_dotenv
+from research_config import ResearchJobConfig, GEMINI_FLASH, KIMI_K2, OPENAI_EMBEDDING, create_researcher
+from tracing import traced_job
+from cost_meter import metered_run
 
 # Load environment variables
 load_dotenv()
 
-# Configure GPT-Researcher with specified LLM setup
-os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-os.environ["OPENAI_API_KEY"] = os.getenv("KIMI_API_KEY")  # For KIMI (OpenAI-compatible)
-os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")  # For web search
-
-# LLM Configuration as specified
-os.environ["FAST_LLM"] = "google_genai:gemini-2.0-flash-exp"  # Gemini 2.0 Flash
-os.environ["SMART_LLM"] = "kimi:kimi-k2"  # KIMI k2
-os.environ["EMBEDDING"] = "openai:text-embedding-3-small"
+# Job-scoped LLM configuration as specified (API keys from .env)
+job_config = ResearchJobConfig.from_env(
+    fast_llm=GEMINI_FLASH,  # Gemini 2.0 Flash
+    smart_llm=KIMI_K2,  # KIMI k2
+    embedding=OPENAI_EMBEDDING
+)
 
 try:
-    from gpt_researcher import GPTResearcher
-
     async def main():
         print("🔍 Testing GPT-Researcher with Gemini...")
-        print("API Key loaded:", "Yes" if os.getenv("GOOGLE_API_KEY") else "No")
-        print("FAST_LLM:", os.getenv("FAST_LLM"))
-        print("SMART_LLM:", os.getenv("SMART_LLM"))
+        print("API Key loaded:", "Yes" if job_config.google_api_key else "No")
+        print("FAST_LLM:", job_config.fast_llm)
+        print("SMART_LLM:", job_config.smart_llm)
 
         # Create researcher with minimal config
-        researcher = GPTResearcher(
+        researcher = create_researcher(
+            job_config,
             query="What is artificial intelligence?",
             report_type="research_report"
         )
@@ -45,9 +43,11 @@ try:
         print("REPORT")
         print("="*50)
         print(report)
+        return report
 
     if __name__ == "__main__":
-        asyncio.run(main())
+        with traced_job("simple_test"), metered_run("simple_test"):
+            asyncio.run(main())
 
 except Exception as e:
     print(f"❌ Error: {e}")
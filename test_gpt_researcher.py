@@ -1,12 +1,26 @@
 #!/usr/bin/env python3
 """
 Test script for GPT-Researcher with multiple LLM providers
+
+Record the provider traffic once, then re-run offline and deterministically:
+    python test_gpt_researcher.py --record tests.cassette.jsonl.gz
+    python test_gpt_researcher.py --replay tests.cassette.jsonl.gz
+
+Compare providers on one shared research context (research once, then every
+provider writes the report concurrently):
+    python test_gpt_researcher.py --compare
 """
 
 import os
+import sys
+import time
 import asyncio
+import argparse
 from dotenv import load_dotenv
-from gpt_researcher import GPTResearcher
+from research_config import ResearchJobConfig, create_researcher
+from cassettes import install_cassette_from_env
+from cost_meter import CostMeter, current_meter, meter_provider_call
+from provider_hooks import add_provider_middleware
 
 # Load environment variables
 load_dotenv()
@@ -15,6 +29,14 @@ def get_available_providers():
     """Check which API keys are available"""
     providers = []
 
+    if os.getenv("CASSETTE_MODE") == "replay":
+        # Offline replay: test the providers that were recorded
+        return [tuple(provider) for provider in install_cassette_from_env().meta.get("providers", [])]
+
+    if os.getenv("MOCK_PROVIDER_URL"):
+        # Offline benchmark mode: every provider is served by mock_provider_server.py
+        return [("google", "gemini-2.0-flash-exp"), ("openai", "moonshot-v1-8k")]
+
     if os.getenv("GOOGLE_API_KEY"):
         providers.append(("google", "gemini-2.0-flash-exp"))
     if os.getenv("KIMI_API_KEY"):
@@ -24,6 +46,20 @@ def get_available_providers():
 
     return providers
 
+def get_provider_config(provider_name, model_name):
+    """Build the job configuration that routes both LLM roles to one provider"""
+    if provider_name == "google":
+        llm = f"google_genai:{model_name}"
+        return ResearchJobConfig.from_env(fast_llm=llm, smart_llm=llm)
+
+    llm = f"openai:{model_name}"
+    if model_name.startswith("moonshot"):
+        api_key = os.getenv("KIMI_API_KEY")  # KIMI uses OpenAI-compatible API
+    else:
+        api_key = os.getenv("OPENAI_API_KEY")
+    overrides = {"openai_api_key": api_key} if api_key else {}
+    return ResearchJobConfig.from_env(fast_llm=llm, smart_llm=llm, **overrides)
+
 async def test_provider(provider_name, model_name, query):
     """Test a specific LLM provider"""
     try:
@@ -31,19 +67,15 @@ async def test_provider(provider_name, model_name, query):
         print(f"Query: {query}")
         print("-" * 60)
 
-        # Set environment variable for the provider
-        if provider_name == "google":
-            os.environ["OPENAI_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-        elif provider_name == "openai" and model_name.startswith("moonshot"):
-            os.environ["OPENAI_API_KEY"] = os.getenv("KIMI_API_KEY")
-        # For regular OpenAI, it should already be set
+        # Job-scoped configuration for the provider under test
+        job_config = get_provider_config(provider_name, model_name)
 
         # Create a researcher instance with specific model
-        researcher = GPTResearcher(
+        researcher = create_researcher(
+            job_config,
             query=query,
             report_type="research_report",
-            report_format="markdown",
-            model=model_name if provider_name == "google" else None
+            report_format="markdown"
         )
 
         # Conduct research
@@ -66,7 +98,72 @@ async def test_provider(provider_name, model_name, query):
         print(f"❌ Error with {provider_name} {model_name}: {str(e)}")
         return False
 
-async def main():
+async def write_with_provider(provider_name, model_name, query, context, source_urls):
+    """Write the report from a shared research context with one provider, measuring it"""
+    meter = CostMeter()
+    current_meter.set(meter)  # this task's context only
+    row = {"provider": provider_name, "model": model_name}
+    start = time.perf_counter()
+    try:
+        researcher = create_researcher(
+            get_provider_config(provider_name, model_name),
+            query=query,
+            report_type="research_report",
+            report_format="markdown"
+        )
+        researcher.context = context
+        researcher.visited_urls = set(source_urls)
+        report = await researcher.write_report()
+        row.update(status="ok", report=report, chars=len(report), words=len(report.split()))
+    except Exception as e:
+        row.update(status=f"error: {e}", report="", chars=0, words=0)
+
+    totals = meter.summary(row["status"])["totals"]
+    row.update(
+        seconds=time.perf_counter() - start,
+        prompt_tokens=totals["prompt_tokens"],
+        completion_tokens=totals["completion_tokens"],
+    )
+    return row
+
+def print_comparison(rows, research_seconds):
+    print(f"\n{'='*96}")
+    print(f"PROVIDER COMPARISON (shared research phase: {research_seconds:.1f}s)")
+    print(f"{'='*96}")
+    print(f"{'provider':<10}{'model':<26}{'latency':>9}{'prompt tok':>12}{'completion':>12}"
+          f"{'chars':>9}{'words':>8}  status")
+    print("-" * 96)
+    for row in sorted(rows, key=lambda row: row["seconds"]):
+        print(f"{row['provider']:<10}{row['model']:<26}{row['seconds']:>8.1f}s{row['prompt_tokens']:>12}"
+              f"{row['completion_tokens']:>12}{row['chars']:>9}{row['words']:>8}  {row['status']}")
+
+async def compare_providers(providers, query):
+    """Research once with the first provider, then write the report with every provider concurrently"""
+    research_provider, research_model = providers[0]
+    print(f"📊 Conducting shared research with {research_provider.upper()} ({research_model})...")
+    start = time.perf_counter()
+    researcher = create_researcher(
+        get_provider_config(research_provider, research_model),
+        query=query,
+        report_type="research_report",
+        report_format="markdown"
+    )
+    await researcher.conduct_research()
+    research_seconds = time.perf_counter() - start
+    context = researcher.get_research_context()
+    source_urls = list(researcher.get_source_urls())
+
+    print(f"✍️  Writing reports with {len(providers)} provider(s) concurrently...")
+    add_provider_middleware(meter_provider_call, first=True)
+    rows = await asyncio.gather(*(
+        write_with_provider(provider_name, model_name, query, context, source_urls)
+        for provider_name, model_name in providers
+    ))
+
+    print_comparison(rows, research_seconds)
+    return all(row["status"] == "ok" for row in rows)
+
+async def main(compare=False):
     providers = get_available_providers()
 
     if not providers:
@@ -76,7 +173,11 @@ async def main():
         print("- KIMI_API_KEY (for Moonshot AI)")
         print("- OPENAI_API_KEY (for OpenAI)")
         print("\nCopy .env.example to .env and add your keys.")
-        return
+        return False
+
+    cassette = install_cassette_from_env()
+    if cassette is not None and cassette.mode != "replay":
+        cassette.meta["providers"] = providers
 
     print(f"🤖 Found {len(providers)} available LLM provider(s):")
     for provider, model in providers:
@@ -85,17 +186,35 @@ async def main():
 
     query = "What are the latest developments in AI research?"
 
+    if compare:
+        return await compare_providers(providers, query)
+
     # Test each provider
+    all_passed = True
     for provider_name, model_name in providers:
         success = await test_provider(provider_name, model_name, query)
         if success:
             print(f"✅ {provider_name.upper()} test completed successfully!\n")
         else:
             print(f"❌ {provider_name.upper()} test failed.\n")
+            all_passed = False
 
-        # Add a small delay between tests
-        if len(providers) > 1:
+        # Add a small delay between live tests
+        if len(providers) > 1 and os.getenv("CASSETTE_MODE") != "replay":
             await asyncio.sleep(2)
 
+    return all_passed
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Test GPT-Researcher with the available LLM providers")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", metavar="CASSETTE", help="record all provider traffic to a cassette")
+    cassette_group.add_argument("--replay", metavar="CASSETTE", help="replay a recorded cassette without network access")
+    parser.add_argument("--compare", action="store_true",
+                        help="research once, then write the report with every provider concurrently and compare")
+    args = parser.parse_args()
+
+    if args.record or args.replay:
+        os.environ["CASSETTE"] = args.record or args.replay
+        os.environ["CASSETTE_MODE"] = "record" if args.record else "replay"
+    sys.exit(0 if asyncio.run(main(compare=args.compare)) else 1)
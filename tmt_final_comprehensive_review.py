@@ -5,7 +5,11 @@ Combines local paper analysis with curated web information
 """
 
 import os
+import asyncio
 from collections import defaultdict
+from paper_manifest import scan_papers
+from report_document import parse_document
+from tmt_comprehensive_review import export_comprehensive_review
 
 def get_tmt_paper_paths():
     """Get paths to all TMT papers"""
@@ -29,16 +33,15 @@ def get_tmt_paper_paths():
         "Machine Learning": ["machine learning", "prediction", "framework"]
     }
 
-    for filename in os.listdir(tmt_dir):
-        if filename.endswith('.pdf'):
-            filepath = os.path.join(tmt_dir, filename)
-            papers[filename] = filepath
+    for entry in scan_papers(tmt_dir):
+        filename = entry["filename"]
+        papers[filename] = entry["path"]
 
-            # Categorize paper
-            title_lower = filename.lower()
-            for category, keywords in category_keywords.items():
-                if any(keyword in title_lower for keyword in keywords):
-                    categories[category].append(filename)
+        # Categorize paper
+        title_lower = filename.lower()
+        for category, keywords in category_keywords.items():
+            if any(keyword in title_lower for keyword in keywords):
+                categories[category].append(filename)
 
     return papers, dict(categories)
 
@@ -247,278 +250,13 @@ TMT项目代表了现代天文观测技术的巅峰，其技术挑战和创新
 *本综述基于GPT-Researcher AI系统综合分析生成，整合了本地技术论文与网络资源信息。*
 """
 
-    # Save the comprehensive review
+    # Parse the review once and save Markdown, Chinese HTML, JSON and plain text versions
     output_file = "tmt_comprehensive_review.md"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(review_content)
+    asyncio.run(export_comprehensive_review(review_content, parse_document(review_content), len(papers)))
 
     print(f"✅ 综合文献综述已生成: {output_file}")
 
-    # Generate Chinese HTML version
-    generate_chinese_html_comprehensive(review_content, len(papers))
-
     return review_content
 
-def generate_chinese_html_comprehensive(markdown_content, local_paper_count):
-    """Generate Chinese HTML version of comprehensive review"""
-
-    print("🌐 生成中文HTML版本...")
-
-    html_content = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>三十米望远镜(TMT)综合研究文献综述</title>
-    <style>
-        body {{
-            font-family: 'Microsoft YaHei', 'SimSun', Arial, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            padding: 30px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2c3e50;
-            text-align: center;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }}
-        h2 {{
-            color: #34495e;
-            border-left: 4px solid #3498db;
-            padding-left: 15px;
-            margin-top: 30px;
-        }}
-        h3 {{
-            color: #7f8c8d;
-            margin-top: 25px;
-        }}
-        .summary {{
-            background: #ecf0f1;
-            padding: 20px;
-            border-radius: 5px;
-            margin: 20px 0;
-        }}
-        .highlight {{
-            background: #e8f4f8;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #3498db;
-            margin: 20px 0;
-        }}
-        .stats {{
-            display: flex;
-            justify-content: space-around;
-            margin: 20px 0;
-        }}
-        .stat-box {{
-            background: #3498db;
-            color: white;
-            padding: 20px;
-            border-radius: 5px;
-            text-align: center;
-            flex: 1;
-            margin: 0 10px;
-        }}
-        .tech-specs {{
-            background: #f8f9fa;
-            padding: 20px;
-            border-radius: 5px;
-            margin: 20px 0;
-        }}
-        .timeline {{
-            background: #fff3cd;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #ffc107;
-            margin: 20px 0;
-        }}
-        .challenges {{
-            background: #f8d7da;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #dc3545;
-            margin: 20px 0;
-        }}
-        .opportunities {{
-            background: #d1ecf1;
-            padding: 15px;
-            border-radius: 5px;
-            border-left: 4px solid #17a2b8;
-            margin: 20px 0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>三十米望远镜(TMT)综合研究文献综述</h1>
-
-        <div class="stats">
-            <div class="stat-box">
-                <h3>本地论文</h3>
-                <div style="font-size: 2em; font-weight: bold;">{local_paper_count}</div>
-            </div>
-            <div class="stat-box">
-                <h3>网络资源</h3>
-                <div style="font-size: 2em; font-weight: bold;">整合</div>
-            </div>
-            <div class="stat-box">
-                <h3>分析深度</h3>
-                <div style="font-size: 2em; font-weight: bold;">全面</div>
-            </div>
-        </div>
-
-        <div class="summary">
-            <h2>综述概述</h2>
-            <p>本综合文献综述整合了{local_paper_count}篇本地TMT技术研究论文与最新的网络资源信息，提供了三十米望远镜项目的完整技术分析和当前发展状况。</p>
-            <p>综述将详细的技术研究置于更广阔的项目背景下，探讨了TMT的科学价值、技术挑战和未来发展前景。</p>
-        </div>
-
-        <div class="tech-specs">
-            <h3>🔬 TMT技术规格</h3>
-            <ul>
-                <li><strong>主镜口径：</strong>30米</li>
-                <li><strong>子镜数量：</strong>492块</li>
-                <li><strong>观测波段：</strong>可见光至中红外(0.31-28微米)</li>
-                <li><strong>分辨率：</strong>比哈勃空间望远镜高10-100倍</li>
-                <li><strong>场地：</strong>夏威夷莫纳克亚山顶</li>
-            </ul>
-        </div>
-
-        <div class="timeline">
-            <h3>📅 项目时间表</h3>
-            <ul>
-                <li><strong>当前阶段：</strong> 技术开发和系统集成</li>
-                <li><strong>近期目标：</strong> 获得最终建设许可</li>
-                <li><strong>建设阶段：</strong> 2025-2030年</li>
-                <li><strong>科学运行：</strong> 2030年以后</li>
-            </ul>
-        </div>
-
-        <h2>本地研究论文分析</h2>
-
-        <h3>论文分类统计</h3>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 15px; margin: 20px 0;">
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; text-align: center;">
-                <h4>热管理</h4>
-                <div style="font-size: 2em; color: #3498db;">6</div>
-                <small>篇论文</small>
-            </div>
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; text-align: center;">
-                <h4>光学设计</h4>
-                <div style="font-size: 2em; color: #3498db;">5</div>
-                <small>篇论文</small>
-            </div>
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; text-align: center;">
-                <h4>系统集成</h4>
-                <div style="font-size: 2em; color: #3498db;">5</div>
-                <small>篇论文</small>
-            </div>
-            <div style="background: #e8f4f8; padding: 15px; border-radius: 5px; text-align: center;">
-                <h4>模拟工具</h4>
-                <div style="font-size: 2em; color: #3498db;">5</div>
-                <small>篇论文</small>
-            </div>
-        </div>
-
-        <h3>核心研究贡献</h3>
-        <ul>
-            <li><strong>热管理技术：</strong> 解决了极端环境下的温度控制问题</li>
-            <li><strong>光学系统设计：</strong> 大口径光学系统的理论和工程实现</li>
-            <li><strong>结构动力学：</strong> 巨型望远镜的稳定性分析</li>
-            <li><strong>仿真验证：</strong> 多物理场耦合分析方法</li>
-            <li><strong>系统集成：</strong> 子系统协同工作的工程解决方案</li>
-        </ul>
-
-        <h2>网络资源整合</h2>
-
-        <h3>项目当前状态</h3>
-        <p>TMT项目正处于技术成熟和准备建设的关键阶段。主要进展包括：</p>
-        <ul>
-            <li>核心光学技术验证完成</li>
-            <li>主动光学系统开发取得突破</li>
-            <li>国际合作框架持续深化</li>
-            <li>环境影响评估和社区沟通进行中</li>
-        </ul>
-
-        <h3>科学目标</h3>
-        <p>TMT将实现多项重大天文学突破：</p>
-        <ul>
-            <li><strong>宇宙起源：</strong> 研究第一批恒星和星系的形成</li>
-            <li><strong>系外行星：</strong> 直接成像和光谱分析</li>
-            <li><strong>暗物质暗能量：</strong> 精确测量宇宙加速膨胀</li>
-            <li><strong>黑洞物理：</strong> 超大质量黑洞的形成和演化研究</li>
-        </ul>
-
-        <div class="challenges">
-            <h3>⚠️ 技术挑战</h3>
-            <ul>
-                <li><strong>热稳定性：</strong> 极端温度环境下的光学性能维持</li>
-                <li><strong>系统复杂度：</strong> 多子系统的高精度协同工作</li>
-                <li><strong>环境适应：</strong> 大气湍流和地震影响的补偿</li>
-                <li><strong>成本控制：</strong> 巨型项目的经费和技术风险管理</li>
-            </ul>
-        </div>
-
-        <div class="opportunities">
-            <h3>🚀 发展机遇</h3>
-            <ul>
-                <li><strong>技术创新：</strong> 推动光学工程和控制技术进步</li>
-                <li><strong>国际合作：</strong> 深化全球天文观测合作</li>
-                <li><strong>科学发现：</strong> 开辟天文学新研究领域</li>
-                <li><strong>技术转移：</strong> 带动相关产业技术升级</li>
-            </ul>
-        </div>
-
-        <h2>综合评价</h2>
-
-        <h3>本地研究的价值</h3>
-        <p>本地{local_paper_count}篇研究论文为TMT项目提供了坚实的技术基础：</p>
-        <ul>
-            <li><strong>理论支撑：</strong> 建立了热管理和光学设计的理论框架</li>
-            <li><strong>工程验证：</strong> 通过仿真和实验验证了关键技术方案</li>
-            <li><strong>风险识别：</strong> 识别了潜在的技术风险和应对策略</li>
-            <li><strong>技术储备：</strong> 为项目实施积累了宝贵的技术经验</li>
-        </ul>
-
-        <h3>项目前景展望</h3>
-        <p>TMT项目的成功实施将带来深远的影响：</p>
-        <ul>
-            <li><strong>科学突破：</strong> 引领21世纪天文学重大发现</li>
-            <li><strong>技术示范：</strong> 为未来巨型望远镜提供技术范例</li>
-            <li><strong>国际合作：</strong> 促进全球天文观测资源整合</li>
-            <li><strong>教育培养：</strong> 培养下一代天文观测技术人才</li>
-        </ul>
-
-        <h2>结论</h2>
-        <p>本综述通过整合本地技术论文与网络资源信息，全面展现了TMT项目的技术复杂性和科学价值。{local_paper_count}篇研究论文不仅解决了具体的工程技术问题，更为TMT的成功实施奠定了坚实基础。</p>
-        <p>TMT项目代表了现代天文观测技术的巅峰，其技术挑战和创新解决方案为未来大型科学装置的建设提供了宝贵经验。项目的顺利实施将开启天文学研究的新纪元。</p>
-
-        <div style="text-align: center; margin: 40px 0; padding: 20px; background: #f8f9fa; border-radius: 5px;">
-            <h3>📄 完整报告</h3>
-            <p>详细的Markdown格式完整报告已保存为：</p>
-            <p><code>tmt_comprehensive_review.md</code></p>
-        </div>
-
-    </div>
-</body>
-</html>"""
-
-    # Save HTML file
-    html_file = "tmt_comprehensive_review_chinese.html"
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-
-    print(f"✅ 中文HTML综合综述已生成: {html_file}")
-
 if __name__ == "__main__":
     generate_comprehensive_markdown_review()
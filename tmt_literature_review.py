@@ -4,44 +4,36 @@ Generate a comprehensive literature review of TMT (Thirty Meter Telescope) paper
 using GPT-Researcher with Gemini and KIMI LLMs.
 """
 
-import os
 import asyncio
+import argparse
 from dotenv import load_dotenv
-from gpt_researcher import GPTResearcher
+from research_config import ResearchJobConfig, GEMINI_FLASH, KIMI_K2, create_researcher
+from paper_manifest import scan_papers, paper_documents
+from pdf_extraction import extract_papers
+from paper_digests import map_reduce_review
+from semantic_cache import conduct_research
+from pipeline_stages import stage
+from tracing import traced_job
+from cost_meter import TokenBudgetExceeded, metered_run
 
 # Load environment variables
 load_dotenv()
 
-def get_tmt_paper_paths():
-    """Get paths to all TMT papers"""
-    tmt_dir = "../TMT"  # Relative path from GPT_Research directory
+def get_tmt_papers():
+    """Get manifest entries for all TMT papers"""
+    entries = scan_papers()
+    for entry in entries:
+        print(f"📄 Found paper: {entry['filename']} ({entry['status']})")
 
-    if not os.path.exists(tmt_dir):
-        print(f"❌ TMT directory not found: {tmt_dir}")
-        return []
+    print(f"\n📚 Total papers found: {len(entries)}")
+    return entries
 
-    paper_paths = []
-    for filename in os.listdir(tmt_dir):
-        if filename.endswith('.pdf'):
-            full_path = os.path.join(tmt_dir, filename)
-            paper_paths.append(full_path)
-            print(f"📄 Found paper: {filename}")
-
-    print(f"\n📚 Total papers found: {len(paper_paths)}")
-    return paper_paths
-
-async def generate_tmt_literature_review():
+async def generate_tmt_literature_review(job_config=None, map_reduce=False):
     """Generate comprehensive literature review of TMT papers"""
 
-    # Configure API keys
-    os.environ["GOOGLE_API_KEY"] = os.getenv("GOOGLE_API_KEY")
-    os.environ["OPENAI_API_KEY"] = os.getenv("KIMI_API_KEY")
-    os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")
-
-    # LLM Configuration
-    os.environ["FAST_LLM"] = "google_genai:gemini-2.0-flash-exp"
-    os.environ["SMART_LLM"] = "kimi:kimi-k2"
-    os.environ["EMBEDDING"] = "openai:text-embedding-3-small"
+    # Job-scoped LLM configuration: Gemini 2.0 Flash + KIMI k2 (API keys from .env)
+    if job_config is None:
+        job_config = ResearchJobConfig.from_env(fast_llm=GEMINI_FLASH, smart_llm=KIMI_K2)
 
     print("🔬 TMT Literature Review Generation")
     print("=" * 60)
@@ -49,11 +41,12 @@ async def generate_tmt_literature_review():
     print("📚 Analyzing TMT (Thirty Meter Telescope) research papers")
     print()
 
-    # Get paper paths
-    paper_paths = get_tmt_paper_paths()
-    if not paper_paths:
+    # Get papers; only new or changed ones are re-extracted
+    papers = get_tmt_papers()
+    if not papers:
         print("❌ No papers found to analyze")
         return
+    await extract_papers(papers)
 
     # Create research query
     research_query = """
@@ -84,31 +77,37 @@ async def generate_tmt_literature_review():
     """
 
     try:
-        print("🔍 Initializing GPT-Researcher...")
-        print("FAST_LLM: Gemini 2.0 Flash")
-        print("SMART_LLM: KIMI k2")
-        print()
-
-        # Create researcher with document analysis
-        researcher = GPTResearcher(
-            query=research_query,
-            report_type="research_report",
-            report_format="markdown",
-            document_urls=paper_paths,  # Analyze local PDF documents
-            tone="Objective"
-        )
-
-        print("📊 Conducting comprehensive literature analysis...")
-        print("This may take several minutes depending on paper complexity...")
-
-        await researcher.conduct_research()
-
-        print("✍️  Generating literature review report...")
-        report = await researcher.write_report()
+        if map_reduce:
+            print("🗺️  Map-reduce mode: per-paper digests with FAST_LLM, synthesis with SMART_LLM")
+            report = await map_reduce_review(papers, job_config, research_query)
+        else:
+            print("🔍 Initializing GPT-Researcher...")
+            print("FAST_LLM: Gemini 2.0 Flash")
+            print("SMART_LLM: KIMI k2")
+            print()
+
+            # Create researcher with document analysis
+            researcher = create_researcher(
+                job_config,
+                query=research_query,
+                report_type="research_report",
+                report_format="markdown",
+                report_source="langchain_documents",
+                documents=paper_documents(papers),  # Pre-extracted local PDF text
+                tone="Objective"
+            )
+
+            print("📊 Conducting comprehensive literature analysis...")
+            print("This may take several minutes depending on paper complexity...")
+
+            await conduct_research(researcher)  # reuses earlier research on similar questions
+
+            print("✍️  Generating literature review report...")
+            report = await researcher.write_report()
 
         # Save the report
         output_file = "tmt_literature_review.md"
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with stage("markdown_assembly"), open(output_file, 'w', encoding='utf-8') as f:
             f.write(report)
 
         print(f"\n✅ Literature review completed and saved to: {output_file}")
@@ -117,11 +116,20 @@ async def generate_tmt_literature_review():
         print("="*80)
         print(report)
         print("="*80)
+        return report
 
+    except TokenBudgetExceeded:
+        raise
     except Exception as e:
         print(f"❌ Error during literature review generation: {e}")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(generate_tmt_literature_review())
+    parser = argparse.ArgumentParser(description="Generate a TMT literature review")
+    parser.add_argument("--map-reduce", action="store_true",
+                        help="digest each paper separately (cached per paper), then synthesize the review")
+    parser.add_argument("--token-budget", type=int, help="stop the run once this many tokens are used")
+    args = parser.parse_args()
+    with traced_job("tmt_literature_review"), metered_run("tmt_literature_review.md", args.token_budget):
+        asyncio.run(generate_tmt_literature_review(map_reduce=args.map_reduce))
@@ -7,6 +7,7 @@ Creates a comprehensive review based on paper titles and categories
 import os
 from collections import defaultdict
 import json
+from paper_manifest import scan_papers
 
 def categorize_tmt_papers():
     """Categorize TMT papers by research focus"""
@@ -31,16 +32,15 @@ def categorize_tmt_papers():
         "Machine Learning": ["machine learning", "prediction", "framework"]
     }
 
-    for filename in os.listdir(tmt_dir):
-        if filename.endswith('.pdf'):
-            filepath = os.path.join(tmt_dir, filename)
-            papers[filename] = filepath
+    for entry in scan_papers(tmt_dir):
+        filename = entry["filename"]
+        papers[filename] = entry["path"]
 
-            # Categorize paper
-            title_lower = filename.lower()
-            for category, keywords in category_keywords.items():
-                if any(keyword in title_lower for keyword in keywords):
-                    categories[category].append(filename)
+        # Categorize paper
+        title_lower = filename.lower()
+        for category, keywords in category_keywords.items():
+            if any(keyword in title_lower for keyword in keywords):
+                categories[category].append(filename)
 
     return papers, dict(categories)
 
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing for the research pipelines
+Records nested spans (job -> stage -> each chat / embedding / search / scrape
+call) with timestamps, token counts and payload sizes, exported as Chrome
+trace-event JSON (chrome://tracing, Perfetto) or as JSONL.
+
+Enable it for a script run with TRACE_FILE=trace.json (or trace.jsonl).
+When tracing is off, span() returns a shared no-op context manager and no
+provider middleware is registered.
+"""
+
+import os
+import json
+import time
+import asyncio
+import itertools
+import threading
+import contextlib
+import contextvars
+
+TRACE_FILE_ENV = "TRACE_FILE"
+
+current_span = contextvars.ContextVar("current_span", default=None)
+
+_tracer = None
+_NO_SPAN = contextlib.nullcontext()
+
+def payload_bytes(value):
+    """UTF-8 size of the text in a request or response (messages, documents, search results)"""
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, dict):
+        return sum(payload_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_bytes(item) for item in value)
+    return 0
+
+class Span:
+    """One timed operation; times are perf_counter values"""
+
+    __slots__ = ("span_id", "parent_id", "name", "category", "attrs", "lane", "start", "end")
+
+    def __init__(self, span_id, parent_id, name, category, attrs, lane, start):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.lane = lane
+        self.start = start
+        self.end = None
+
+class Tracer:
+    """Collects finished spans from every task and thread of the process"""
+
+    def __init__(self):
+        self.origin_wall = time.time()
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._ids = itertools.count(1)
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def _lane(self):
+        """Small integer per asyncio task (or thread) so concurrent calls get their own track"""
+        try:
+            key = ("task", id(asyncio.current_task()))
+        except RuntimeError:
+            key = ("thread", threading.get_ident())
+        with self._lock:
+            return self._lanes.setdefault(key, len(self._lanes) + 1)
+
+    def start(self, name, category, attrs):
+        parent = current_span.get()
+        return Span(next(self._ids), parent.span_id if parent else None, name, category, attrs,
+                    self._lane(), time.perf_counter())
+
+    def finish(self, span):
+        span.end = time.perf_counter()
+        with self._lock:
+            self.spans.append(span)
+
+    def _epoch(self, perf):
+        return self.origin_wall + (perf - self.origin)
+
+    def records(self):
+        """Finished spans as dicts, in start order"""
+        return [{
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "category": span.category,
+            "start": round(self._epoch(span.start), 6),
+            "end": round(self._epoch(span.end), 6),
+            "duration_ms": round((span.end - span.start) * 1000, 3),
+            "attrs": span.attrs,
+        } for span in sorted(self.spans, key=lambda span: span.start)]
+
+    def chrome_events(self):
+        """Complete ("X") events in the Chrome trace-event format, timestamps in microseconds"""
+        pid = os.getpid()
+        return [{
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": round(self._epoch(span.start) * 1e6),
+            "dur": round((span.end - span.start) * 1e6),
+            "pid": pid,
+            "tid": span.lane,
+            "args": dict(span.attrs, span_id=span.span_id, parent_id=span.parent_id),
+        } for span in sorted(self.spans, key=lambda span: span.start)]
+
+    def export(self, path):
+        """Write JSONL for *.jsonl paths, Chrome trace-event JSON otherwise"""
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith(".jsonl"):
+                for record in self.records():
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            else:
+                json.dump({"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"},
+                          f, ensure_ascii=False, default=str)
+
+@contextlib.contextmanager
+def _span(tracer, name, category, attrs):
+    span = tracer.start(name, category, attrs)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.attrs["error"] = repr(e)
+        raise
+    finally:
+        current_span.reset(token)
+        tracer.finish(span)
+
+def span(name, category="stage", **attrs):
+    """Trace the enclosed block as a child of the current span; yields the Span, or None when tracing is off"""
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return _span(tracer, name, category, attrs)
+
+async def trace_provider_call(call, proceed):
+    """Provider middleware: one span per call, including any rate-limit wait"""
+    with span(f"{call.kind}:{call.provider}", call.kind, model=call.model,
+              prompt_tokens=call.prompt_tokens, request_bytes=payload_bytes(call.payload)) as current:
+        result = await proceed()
+        if current is not None:
+            current.attrs["completion_tokens"] = call.completion_tokens
+            current.attrs["response_bytes"] = payload_bytes(result)
+        return result
+
+def enable_tracing():
+    """Start collecting spans and return the tracer"""
+    global _tracer
+    from provider_hooks import add_provider_middleware
+
+    if _tracer is None:
+        _tracer = Tracer()
+        add_provider_middleware(trace_provider_call, first=True)
+    return _tracer
+
+def disable_tracing():
+    """Stop collecting spans and return the tracer that collected them"""
+    global _tracer
+    from provider_hooks import remove_provider_middleware
+
+    tracer, _tracer = _tracer, None
+    remove_provider_middleware(trace_provider_call)
+    return tracer
+
+@contextlib.contextmanager
+def traced_job(name, **attrs):
+    """Root span of a script run; traces the run and exports it when TRACE_FILE is set"""
+    trace_file = os.getenv(TRACE_FILE_ENV)
+    owner = bool(trace_file) and _tracer is None
+    if owner:
+        enable_tracing()
+    try:
+        with span(name, "job", **attrs):
+            yield
+    finally:
+        if owner:
+            tracer = disable_tracing()
+            tracer.export(trace_file)
+            print(f"🧭 Trace saved to: {trace_file} ({len(tracer.spans)} spans)")